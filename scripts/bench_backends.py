@@ -0,0 +1,82 @@
+"""
+scripts/bench_backends.py
+----------------------------------------
+Accuracy and latency of the zero-shot intent classifier per ML_BACKEND over a
+labeled corpus (one {"query": ..., "intent": ...} object per line).
+
+Accuracy is reported twice: top-1 label vs the expected intent, and the label
+actually used after ML_CONF_THRESHOLD (abstentions fall through to the rules in
+production, so they count as misses here). Backends that fail to load (missing
+onnxruntime, no exported model) are reported and skipped.
+
+    python scripts/bench_backends.py --backends pytorch quantized onnx
+    python scripts/bench_backends.py --corpus scripts/data/queries.jsonl --batch-size 8 --repeat 3
+"""
+
+import argparse
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+SRC = ROOT / "src"
+sys.path.insert(0, str(SRC.resolve()))
+
+from core import nlp_utils
+from core.nli_backends import BACKENDS, load_zero_shot
+
+
+def load_corpus(path):
+    with open(path, encoding="utf-8") as f:
+        rows = [json.loads(line) for line in f if line.strip()]
+    return [(r["query"], r["intent"]) for r in rows if r.get("intent")]
+
+
+def evaluate(classifier, corpus, batch_size, repeat):
+    queries = [q for q, _ in corpus]
+    latencies, results = [], []
+    for _ in range(repeat):
+        results = []
+        for i in range(0, len(queries), batch_size):
+            chunk = queries[i:i + batch_size]
+            t0 = time.perf_counter()
+            res = classifier(chunk, candidate_labels=nlp_utils.INTENTS, multi_label=False)
+            latencies.append((time.perf_counter() - t0) / len(chunk))
+            results.extend([res] if isinstance(res, dict) else res)
+    top1 = sum(r["labels"][0] == want for r, (_, want) in zip(results, corpus))
+    gated = sum(nlp_utils._top_label(r) == want for r, (_, want) in zip(results, corpus))
+    return top1 / len(corpus), gated / len(corpus), latencies
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--corpus", default=str(ROOT / "scripts" / "data" / "queries.jsonl"))
+    parser.add_argument("--backends", nargs="+", default=list(BACKENDS), choices=BACKENDS)
+    parser.add_argument("--batch-size", type=int, default=1)
+    parser.add_argument("--repeat", type=int, default=1)
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.corpus)
+    print(f"{len(corpus)} labeled queries, batch size {args.batch_size}, "
+          f"threshold {nlp_utils.ML_CONF_THRESHOLD}\n")
+    print(f"{'backend':<10} {'load s':>8} {'top-1':>7} {'gated':>7} {'p50 ms/q':>10} {'p95 ms/q':>10}")
+    for backend in args.backends:
+        t0 = time.perf_counter()
+        try:
+            classifier = load_zero_shot(backend)
+        except Exception as e:
+            print(f"{backend:<10} skipped: {type(e).__name__}: {e}")
+            continue
+        load_s = time.perf_counter() - t0
+        classifier(corpus[0][0], candidate_labels=nlp_utils.INTENTS)  # first-call allocations
+        top1, gated, lat = evaluate(classifier, corpus, args.batch_size, args.repeat)
+        lat.sort()
+        p50 = statistics.median(lat) * 1000
+        p95 = lat[max(0, int(len(lat) * 0.95) - 1)] * 1000
+        print(f"{backend:<10} {load_s:8.1f} {top1:7.1%} {gated:7.1%} {p50:10.1f} {p95:10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+scripts/bench_batching.py
+----------------------------------------
+Per-query vs micro-batched ML intent classification throughput.
+
+Uses a small local stub in place of bart-large-mnli so the comparison runs
+anywhere. The stub charges a fixed per-call overhead plus a per-sequence cost,
+which is the shape that makes batching pay off on CPU.
+
+    python scripts/bench_batching.py --requests 256 --concurrency 64
+"""
+
+import argparse
+import asyncio
+import sys
+import threading
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+SRC = ROOT / "src"
+sys.path.insert(0, str(SRC.resolve()))
+
+from core import nlp_utils
+from core.batching import MicroBatcher
+
+
+class StubZeroShot:
+    """Mimics the transformers zero-shot pipeline call signature."""
+
+    def __init__(self, call_overhead_ms: float, per_item_ms: float):
+        self.call_overhead = call_overhead_ms / 1000.0
+        self.per_item = per_item_ms / 1000.0
+        self.calls = 0
+        # a real forward pass already saturates the CPU, so calls do not overlap
+        self._lock = threading.Lock()
+
+    def __call__(self, sequences, candidate_labels, multi_label=False):
+        single = isinstance(sequences, str)
+        seqs = [sequences] if single else list(sequences)
+        with self._lock:
+            self.calls += 1
+            time.sleep(self.call_overhead + self.per_item * len(seqs))
+        out = []
+        for s in seqs:
+            # deterministic "prediction": first label sharing a word with the query
+            words = set(s.lower().split())
+            best = next((l for l in candidate_labels if words & set(l.split("_"))), candidate_labels[-1])
+            rest = [l for l in candidate_labels if l != best]
+            out.append({"sequence": s, "labels": [best] + rest, "scores": [0.9] + [0.1 / len(rest)] * len(rest)})
+        return out[0] if single else out
+
+
+QUERIES = [
+    "list all s3 buckets",
+    "list iam users",
+    "list dynamodb tables",
+    "list lambda functions in us-west-1",
+    "describe ec2 instances in us-east-1",
+    "create an s3 bucket named bench-bucket",
+]
+
+
+async def _run(label, call, n, concurrency):
+    sem = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def one(i):
+        async with sem:
+            t0 = time.perf_counter()
+            await call(QUERIES[i % len(QUERIES)])
+            latencies.append(time.perf_counter() - t0)
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(n)))
+    elapsed = time.perf_counter() - t0
+    latencies.sort()
+    p50 = latencies[len(latencies) // 2] * 1000
+    p95 = latencies[int(len(latencies) * 0.95) - 1] * 1000
+    print(f"{label:<12} {n / elapsed:10.1f} q/s   p50 {p50:8.1f} ms   p95 {p95:8.1f} ms")
+
+
+async def main_async(args):
+    stub = StubZeroShot(args.overhead_ms, args.per_item_ms)
+    nlp_utils._zero_shot_model.set(stub)
+    loop = asyncio.get_running_loop()
+
+    async def per_query(text):
+        return await loop.run_in_executor(None, nlp_utils._ml_intent, text)
+
+    print(f"stub model: {args.overhead_ms} ms/call + {args.per_item_ms} ms/item, "
+          f"{args.requests} requests @ concurrency {args.concurrency}\n")
+    stub.calls = 0
+    await _run("per-query", per_query, args.requests, args.concurrency)
+    per_query_calls = stub.calls
+
+    batcher = MicroBatcher(nlp_utils._ml_intent_batch, max_batch_size=args.max_batch,
+                           max_wait_ms=args.window_ms, name="bench")
+    stub.calls = 0
+    await _run("batched", batcher.submit, args.requests, args.concurrency)
+    print(f"\nmodel calls: per-query={per_query_calls} batched={stub.calls}")
+    print("batcher stats:", batcher.stats())
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=256)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--max-batch", type=int, default=nlp_utils.ML_BATCH_MAX_SIZE)
+    parser.add_argument("--window-ms", type=float, default=nlp_utils.ML_BATCH_WINDOW_MS)
+    parser.add_argument("--overhead-ms", type=float, default=40.0)
+    parser.add_argument("--per-item-ms", type=float, default=4.0)
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+scripts/bench_clients.py
+----------------------------------------
+Per-call cost of a fresh boto3 Session + client (the old _session_client) vs
+the pooled clients in core.aws_clients.
+
+By default responses come from botocore's Stubber, so no network or AWS account
+is needed and the numbers isolate session/client construction. Point
+--endpoint-url at a local moto server (`moto_server -p 5000`) to include real
+HTTP round trips, where the reused connection pool also pays off.
+
+    python scripts/bench_clients.py --calls 200
+    python scripts/bench_clients.py --calls 200 --endpoint-url http://127.0.0.1:5000
+"""
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+SRC = ROOT / "src"
+sys.path.insert(0, str(SRC.resolve()))
+
+# dummy credentials: the stubber/moto never checks them
+os.environ.setdefault("AWS_ACCESS_KEY_ID", "testing")
+os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "testing")
+
+import boto3
+from botocore.stub import Stubber
+
+from core.aws_clients import ClientRegistry
+
+REGION = "us-west-1"
+LIST_TABLES = {"TableNames": ["bench-a", "bench-b"]}
+
+
+def call(client, stub: bool):
+    if not stub:
+        return client.list_tables()
+    with Stubber(client) as stubber:
+        stubber.add_response("list_tables", LIST_TABLES, {})
+        return client.list_tables()
+
+
+def bench(get_client, calls: int, stub: bool):
+    latencies = []
+    for _ in range(calls):
+        t0 = time.perf_counter()
+        call(get_client(), stub)
+        latencies.append(time.perf_counter() - t0)
+    latencies.sort()
+    total = sum(latencies)
+    return total / calls * 1000, latencies[len(latencies) // 2] * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument("--endpoint-url", default=None, help="local moto server; stubbed responses when omitted")
+    args = parser.parse_args()
+
+    stub = args.endpoint_url is None
+    if not stub:
+        os.environ["AWS_ENDPOINT_URL"] = args.endpoint_url
+        ddb = boto3.client("dynamodb", region_name=REGION)
+        if "bench-a" not in ddb.list_tables()["TableNames"]:
+            ddb.create_table(
+                TableName="bench-a", BillingMode="PAY_PER_REQUEST",
+                AttributeDefinitions=[{"AttributeName": "Id", "AttributeType": "S"}],
+                KeySchema=[{"AttributeName": "Id", "KeyType": "HASH"}],
+            )
+
+    def per_call():
+        return boto3.Session().client("dynamodb", region_name=REGION)
+
+    registry = ClientRegistry()
+
+    def pooled():
+        return registry.get("dynamodb", REGION)
+
+    print(f"{args.calls} list_tables calls against {'botocore Stubber' if stub else args.endpoint_url}\n")
+    fresh_mean, fresh_p50 = bench(per_call, args.calls, stub)
+    pooled_mean, pooled_p50 = bench(pooled, args.calls, stub)
+    print(f"new session/call  mean {fresh_mean:8.2f} ms   p50 {fresh_p50:8.2f} ms")
+    print(f"pooled client     mean {pooled_mean:8.2f} ms   p50 {pooled_p50:8.2f} ms   "
+          f"({fresh_mean - pooled_mean:.2f} ms saved per call)")
+    print("registry stats:", registry.stats())
+
+
+if __name__ == "__main__":
+    main()
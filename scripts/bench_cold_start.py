@@ -0,0 +1,53 @@
+"""
+scripts/bench_cold_start.py
+----------------------------------------
+Cold-start cost of the active NLP engine: module import, model load, the first
+classification and a warm one, measured in a fresh process.
+
+    NLP_MODE=local python scripts/bench_cold_start.py
+    NLP_MODE=embedding python scripts/bench_cold_start.py --query "list my lambda functions"
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+SRC = ROOT / "src"
+sys.path.insert(0, str(SRC.resolve()))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--query", default="list my s3 buckets")
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    from core import nlp_utils
+    imported = time.perf_counter() - t0
+
+    model = nlp_utils._active_model()
+    t0 = time.perf_counter()
+    loaded = model.get() is not None
+    load_s = time.perf_counter() - t0
+    if not loaded:
+        print(f"{model.name} failed to load: {model.stats().get('last_error')}")
+        return
+
+    t0 = time.perf_counter()
+    nlp_utils._ml_intent(args.query)
+    first_s = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    nlp_utils._ml_intent(args.query)
+    warm_s = time.perf_counter() - t0
+
+    print(f"engine            {model.name}")
+    print(f"import nlp_utils  {imported * 1000:10.1f} ms")
+    print(f"model load        {load_s * 1000:10.1f} ms")
+    print(f"first inference   {first_s * 1000:10.1f} ms")
+    print(f"warm inference    {warm_s * 1000:10.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
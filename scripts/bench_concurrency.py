@@ -0,0 +1,136 @@
+"""
+scripts/bench_concurrency.py
+----------------------------------------
+Load test for the request path: the old handler shape (blocking parse +
+validation on the event loop) vs the staged path (parse_nlp_async +
+validate_command_safe_async).
+
+The model and boto3 are replaced by local stubs: classification burns a fixed
+amount of wall time per call and validation sleeps like a network round trip.
+Confident rule matches never reach the classifier, so QUERIES mixes them with
+weak matches that escalate to it.
+Requests arrive in bursts of `concurrency`; latency is measured from the burst
+start, so time spent waiting behind a blocked loop counts. For each level the
+script reports p50/p95 latency and the worst event-loop lag seen by a 10 ms
+heartbeat. With the staged path both stay flat until the stage pools
+(--validation-workers) are saturated.
+
+    python scripts/bench_concurrency.py --levels 1,8,32 --requests 128
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+SRC = ROOT / "src"
+sys.path.insert(0, str(SRC.resolve()))
+
+# measure the execution layer, not the result caches
+os.environ["NLP_CACHE_ENABLED"] = "false"
+os.environ["VALIDATION_CACHE_ENABLED"] = "false"
+if "--validation-workers" in sys.argv:
+    workers = sys.argv[sys.argv.index("--validation-workers") + 1]
+    os.environ["VALIDATION_WORKERS"] = os.environ["VALIDATION_MAX_CONCURRENCY"] = workers
+
+from core import aws_validator, nlp_utils
+from core.execution import execution_stats
+
+QUERIES = [
+    "list all s3 buckets",
+    "list iam users",
+    "list dynamodb tables",
+    "describe ec2 instances in us-east-1",
+    "create an s3 bucket named bench-bucket",
+    # weak or ambiguous rule matches: these escalate to the (stub) classifier
+    "list buckets and tables",
+    "what is deployed in us-west-2",
+    "give me an overview of my resources",
+    "show me what I have running",
+]
+
+
+class StubClassifier:
+    def __init__(self, ms: float):
+        self.seconds = ms / 1000.0
+
+    def __call__(self, sequences, candidate_labels, multi_label=False):
+        seqs = [sequences] if isinstance(sequences, str) else list(sequences)
+        time.sleep(self.seconds)
+        out = [{"sequence": s, "labels": list(candidate_labels), "scores": [0.0] * len(candidate_labels)}
+               for s in seqs]
+        return out[0] if isinstance(sequences, str) else out
+
+
+def stub_validate(ms: float):
+    def _validate(intent, entities, *args, **kwargs):
+        time.sleep(ms / 1000.0)
+        return {"intent": intent, "region": "us-west-1", "status": "valid", "reason": "stub", "detail": {}}
+    return _validate
+
+
+async def blocking_handler(query):
+    intent, entities = nlp_utils.parse_nlp(query)
+    return aws_validator.validate_command_safe(intent, entities)
+
+
+async def staged_handler(query):
+    intent, entities = await nlp_utils.parse_nlp_async(query)
+    return await aws_validator.validate_command_safe_async(intent, entities)
+
+
+async def heartbeat(stop: asyncio.Event, lags: list):
+    while not stop.is_set():
+        t0 = time.perf_counter()
+        await asyncio.sleep(0.01)
+        lags.append(time.perf_counter() - t0 - 0.01)
+
+
+async def run_level(handler, concurrency: int, n: int):
+    latencies, lags = [], []
+    stop = asyncio.Event()
+
+    async def one(i, arrived):
+        await handler(QUERIES[i % len(QUERIES)])
+        latencies.append(time.perf_counter() - arrived)
+
+    hb = asyncio.create_task(heartbeat(stop, lags))
+    for start in range(0, n, concurrency):
+        arrived = time.perf_counter()
+        await asyncio.gather(*(one(i, arrived) for i in range(start, min(n, start + concurrency))))
+    stop.set()
+    await hb
+    latencies.sort()
+    p50 = latencies[len(latencies) // 2] * 1000
+    p95 = latencies[max(0, int(len(latencies) * 0.95) - 1)] * 1000
+    return p50, p95, max(lags, default=0.0) * 1000
+
+
+async def main_async(args):
+    nlp_utils._zero_shot_model.set(StubClassifier(args.classify_ms))
+    aws_validator._validate = stub_validate(args.validate_ms)
+    print(f"stubs: classify {args.classify_ms} ms, validate {args.validate_ms} ms, {args.requests} requests/level\n")
+    print(f"{'handler':<10} {'conc':>5} {'p50 ms':>10} {'p95 ms':>10} {'loop lag ms':>12}")
+    for label, handler in (("blocking", blocking_handler), ("staged", staged_handler)):
+        for level in args.levels:
+            p50, p95, lag = await run_level(handler, level, args.requests)
+            print(f"{label:<10} {level:>5} {p50:10.1f} {p95:10.1f} {lag:12.1f}")
+    print("\nstage stats:", execution_stats())
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--levels", type=lambda s: [int(x) for x in s.split(",")], default=[1, 8, 32])
+    parser.add_argument("--requests", type=int, default=128)
+    parser.add_argument("--classify-ms", type=float, default=20.0)
+    parser.add_argument("--validate-ms", type=float, default=40.0)
+    parser.add_argument("--validation-workers", type=int, default=None,
+                        help="size of the validation stage (default: execution.validation in defaults.json)")
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+scripts/bench_haiku.py
+----------------------------------------
+Exercise the Haiku client layer (core.haiku_client) against a local mock of the
+Messages API: latency, injected failures and hangs, with concurrent identical
+and distinct queries. Shows upstream calls vs requests (single-flight),
+retries, timeouts and the circuit breaker falling back to "no label".
+
+    python scripts/bench_haiku.py --latency-ms 200 --concurrency 32
+    python scripts/bench_haiku.py --fail-rate 0.5
+    python scripts/bench_haiku.py --hang-ms 10000 --requests 20   # breaker opens
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+SRC = ROOT / "src"
+sys.path.insert(0, str(SRC.resolve()))
+
+
+class MockMessages(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, as the real API
+    latency, fail_rate, hang = 0.05, 0.0, 0.0
+    calls = 0
+    lock = threading.Lock()
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        with MockMessages.lock:
+            MockMessages.calls += 1
+        time.sleep(self.hang or self.latency)
+        if random.random() < self.fail_rate:
+            return self._send(529, {"type": "error", "error": {"type": "overloaded_error", "message": "overloaded"}})
+        text = body["messages"][0]["content"].lower()
+        label = "list_s3_buckets" if "bucket" in text else "list_dynamodb_tables" if "table" in text else "unknown"
+        self._send(200, {"id": "msg_mock", "type": "message", "role": "assistant", "model": body["model"],
+                         "content": [{"type": "text", "text": label}], "stop_reason": "end_turn",
+                         "stop_sequence": None, "usage": {"input_tokens": 1, "output_tokens": 1}})
+
+    def _send(self, status, payload):
+        raw = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(raw)))
+        self.end_headers()
+        self.wfile.write(raw)
+
+
+class QuietServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        pass  # clients hanging up on a stalled response are expected here
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--distinct", type=int, default=4, help="distinct queries among the requests")
+    parser.add_argument("--latency-ms", type=float, default=50)
+    parser.add_argument("--fail-rate", type=float, default=0.0)
+    parser.add_argument("--hang-ms", type=float, default=0.0)
+    parser.add_argument("--read-timeout", type=float, default=1.0)
+    args = parser.parse_args()
+
+    MockMessages.latency, MockMessages.fail_rate = args.latency_ms / 1000, args.fail_rate
+    MockMessages.hang = args.hang_ms / 1000
+    server = QuietServer(("127.0.0.1", 0), MockMessages)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    os.environ["HAIKU_READ_TIMEOUT"] = str(args.read_timeout)
+
+    from core import haiku_client
+    from core.exceptions import TierUnavailable
+    classifier = haiku_client.HaikuClassifier(["list_s3_buckets", "list_dynamodb_tables", "unknown"], api_key="mock",
+                                              base_url=f"http://127.0.0.1:{server.server_address[1]}")
+    queries = [f"list my buckets #{i % args.distinct}" if i % 2 else f"show tables #{i % args.distinct}"
+               for i in range(args.requests)]
+    latencies, labels = [], []
+
+    def one(q):
+        t0 = time.perf_counter()
+        try:
+            labels.append(classifier.classify(q))
+        except TierUnavailable:
+            labels.append(None)  # failed or rejected by the open breaker
+        latencies.append(time.perf_counter() - t0)
+
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(args.concurrency) as pool:
+        list(pool.map(one, queries))
+    elapsed = time.perf_counter() - t0
+    latencies.sort()
+    print(f"{args.requests} requests in {elapsed:.2f}s, upstream calls {MockMessages.calls}")
+    print(f"p50 {latencies[len(latencies) // 2] * 1000:.1f} ms   max {latencies[-1] * 1000:.1f} ms   "
+          f"answered {sum(1 for lbl in labels if lbl)}/{len(labels)}")
+    print("client stats:", classifier.stats())
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+scripts/bench_imports.py
+----------------------------------------
+Import-time check for the server entry points. Each module is imported in a
+fresh interpreter with `python -X importtime`; the script reports cumulative
+import time and whether any heavy dependency (boto3, botocore, transformers,
+torch, ...) was pulled in at import. Heavy modules must only load on the code
+path that needs them, so their presence is a regression.
+
+Exits non-zero when a forbidden module is imported or a module exceeds
+--budget-ms, so it can gate CI:
+
+    python scripts/bench_imports.py
+    python scripts/bench_imports.py --modules lambda_function --budget-ms 400 --repeat 5
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+SRC = ROOT / "src"
+
+DEFAULT_MODULES = ["lambda_function", "core.nlp_utils", "core.aws_validator", "core.command_generator",
+                   "http_adapter", "mcp_server"]
+FORBIDDEN = ["boto3", "botocore", "transformers", "torch", "onnxruntime", "numpy", "anthropic"]
+
+
+def import_profile(module: str):
+    """(cumulative µs for `module`, set of top-level packages imported), or None if it fails."""
+    env = {**os.environ, "PYTHONPATH": str(SRC)}
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                          capture_output=True, text=True, env=env, cwd=str(ROOT))
+    if proc.returncode != 0:
+        return None, proc.stderr.strip().splitlines()[-1]
+    total, loaded = 0, set()
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = [p.strip() for p in line[len("import time:"):].split("|")]
+        if not cumulative.isdigit():
+            continue  # header line
+        loaded.add(name.split(".")[0])
+        if name == module:
+            total = int(cumulative)
+    return total, loaded
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--modules", nargs="+", default=DEFAULT_MODULES)
+    parser.add_argument("--forbid", nargs="*", default=FORBIDDEN)
+    parser.add_argument("--budget-ms", type=float, default=None)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    failures = []
+    print(f"{'module':<26} {'median ms':>10}  heavy imports")
+    for module in args.modules:
+        runs, loaded = [], set()
+        for _ in range(args.repeat):
+            total, loaded = import_profile(module)
+            if total is None:
+                break
+            runs.append(total / 1000)
+        if not runs:
+            print(f"{module:<26} {'-':>10}  skipped: {loaded}")
+            continue
+        ms = statistics.median(runs)
+        heavy = sorted(loaded & set(args.forbid))
+        print(f"{module:<26} {ms:10.1f}  {', '.join(heavy) or '-'}")
+        if heavy:
+            failures.append(f"{module} imports {', '.join(heavy)}")
+        if args.budget_ms is not None and ms > args.budget_ms:
+            failures.append(f"{module} took {ms:.1f} ms (budget {args.budget_ms:g} ms)")
+
+    if failures:
+        print("\n" + "\n".join(failures))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,564 @@
+"""
+scripts/bench_load.py
+----------------------------------------
+End-to-end load benchmark. Replays query corpora against three targets:
+
+- `tool`: the generate_aws_cli MCP tool, called in process;
+- `http`: POST /generate on the HTTP adapter;
+- `stdio`: tools/call generate_aws_cli over the stdio MCP transport.
+
+AWS is stubbed at the botocore layer: every pooled client answers with canned
+responses after --aws-ms of simulated latency, so no credentials or network
+are needed. Pass --endpoint-url to use a local moto server instead. The
+zero-shot model is replaced by a stub that sleeps --classify-ms per batch and
+answers with the corpus label. `--classifier real` loads the configured backend
+instead (e.g. a small NLI_MODEL); `--classifier none` runs rules only.
+
+The http and stdio targets run this script in --serve mode in a subprocess with
+the same stubs. When the server exits it writes its per-stage timings and peak
+RSS to a file.
+
+Requests run closed-loop with --concurrency in flight. Each target reports:
+
+- p50/p95/p99 latency, end to end and per stage (mcp_stage_seconds and
+  mcp_nlp_tier_seconds);
+- throughput;
+- peak RSS of the serving process.
+
+--save-baseline writes the results as JSON. --baseline compares a run with
+saved results and exits 1 if any p95/p99 grew, or throughput fell, by more
+than --tolerance.
+
+    python scripts/bench_load.py --targets tool,http,stdio --concurrency 16 --requests 400
+    python scripts/bench_load.py --save-baseline bench-baseline.json
+    python scripts/bench_load.py --baseline bench-baseline.json --tolerance 0.25
+"""
+
+import argparse
+import asyncio
+import atexit
+import http.client
+import json
+import math
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+SRC = ROOT / "src"
+sys.path.insert(0, str(SRC.resolve()))
+
+DEFAULT_CORPUS = ROOT / "scripts" / "data" / "queries.jsonl"
+TARGETS = ("tool", "http", "stdio")
+
+# existence probes answered "not found", so create_* checks report the name as available
+NOT_FOUND = {
+    "HeadBucket": ("404", 404),
+    "DescribeTable": ("ResourceNotFoundException", 400),
+    "GetUser": ("NoSuchEntity", 404),
+    "GetQueueUrl": ("AWS.SimpleQueueService.NonExistentQueue", 400),
+}
+
+
+def load_corpus(paths):
+    """(query, intent or None) pairs from JSON lines with a `query` (or `text`) field."""
+    items = []
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                row = json.loads(line)
+                query = row.get("query") or row.get("text")
+                if query:
+                    items.append((query, row.get("intent")))
+    if not items:
+        raise SystemExit(f"no queries in {', '.join(map(str, paths))}")
+    return items
+
+
+def configure_env(args):
+    # must run before core modules read their settings at import
+    os.environ["TELEMETRY_ENABLED"] = "false"
+    os.environ["MODEL_WARMUP"] = "false"
+    if not args.cache:
+        os.environ["NLP_CACHE_ENABLED"] = "false"
+        os.environ["VALIDATION_CACHE_ENABLED"] = "false"
+    if args.classifier == "none":
+        os.environ["ENABLE_ML"] = "false"
+    os.environ.setdefault("AWS_ACCESS_KEY_ID", "testing")
+    os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "testing")
+    if args.endpoint_url:
+        os.environ["AWS_ENDPOINT_URL"] = args.endpoint_url
+
+
+class StubClassifier:
+    """Zero-shot pipeline stand-in: fixed cost per call, corpus label when known."""
+
+    def __init__(self, ms: float, labels: dict):
+        self.seconds = ms / 1000.0
+        self.labels = labels
+
+    def __call__(self, sequences, candidate_labels, multi_label=False):
+        seqs = [sequences] if isinstance(sequences, str) else list(sequences)
+        time.sleep(self.seconds)
+        out = []
+        for s in seqs:
+            label = self.labels.get(" ".join(s.split()).lower())
+            if label in candidate_labels:
+                rest = [c for c in candidate_labels if c != label]
+                out.append({"sequence": s, "labels": [label] + rest, "scores": [0.95] + [0.0] * len(rest)})
+            else:
+                out.append({"sequence": s, "labels": list(candidate_labels), "scores": [0.0] * len(candidate_labels)})
+        return out[0] if isinstance(sequences, str) else out
+
+
+def stub_aws(ms: float):
+    """Answer every call on pooled clients from canned responses."""
+    from botocore.awsrequest import AWSResponse
+    from core import aws_clients
+
+    def respond(model=None, **kwargs):
+        time.sleep(ms / 1000.0)
+        if model.name in NOT_FOUND:
+            code, status = NOT_FOUND[model.name]
+            return AWSResponse(None, status, {}, None), {
+                "Error": {"Code": code, "Message": "stub"}, "ResponseMetadata": {"HTTPStatusCode": status}}
+        return AWSResponse(None, 200, {}, None), {"ResponseMetadata": {"HTTPStatusCode": 200}}
+
+    registry, get = aws_clients._registry, aws_clients._registry.get
+    stubbed, lock = set(), threading.Lock()
+
+    def get_stubbed(service, region, profile=None):
+        client = get(service, region, profile)
+        with lock:
+            if id(client) not in stubbed:
+                client.meta.events.register("before-call", respond)
+                stubbed.add(id(client))
+        return client
+
+    registry.get = get_stubbed
+
+
+def record_stages() -> dict:
+    """Keep every (wall time, seconds) sample of the stage and tier histograms."""
+    from core.metrics import NLP_TIER_SECONDS, STAGE_SECONDS
+    samples = defaultdict(list)
+    for hist, prefix in ((STAGE_SECONDS, ""), (NLP_TIER_SECONDS, "tier:")):
+        def observe(seconds, *labels, _observe=hist.observe, _prefix=prefix):
+            samples[_prefix + "/".join(labels)].append((time.time(), seconds))
+            _observe(seconds, *labels)
+        hist.observe = observe
+    return samples
+
+
+def install_stubs(args, corpus) -> dict:
+    if not args.endpoint_url:
+        stub_aws(args.aws_ms)
+    if args.classifier == "stub":
+        from core import nlp_utils
+        labels = {" ".join(q.split()).lower(): i for q, i in corpus if i}
+        nlp_utils._zero_shot_model.set(StubClassifier(args.classify_ms, labels))
+    return record_stages()
+
+
+def peak_rss_mb():
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # KiB on Linux, bytes on macOS
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+# ---- serve mode (subprocess side of the http / stdio targets) ----
+
+def quiet_logs(args):
+    from loguru import logger
+    logger.remove()
+    logger.add(sys.stderr, level="DEBUG" if args.verbose else "ERROR")
+
+
+def serve(args, corpus):
+    samples = install_stubs(args, corpus)
+
+    def dump():
+        with open(args.stats_out, "w") as f:
+            json.dump({"samples": samples, "peak_rss_mb": peak_rss_mb()}, f)
+
+    atexit.register(dump)
+    quiet_logs(args)
+    import mcp_server
+    if args.serve == "http":
+        from http_adapter import app, run_http_app
+        run_http_app(app, port=args.port)
+    else:
+        asyncio.run(mcp_server.run_stdio())
+
+
+def serve_command(args, target, stats_out, port=None):
+    cmd = [sys.executable, str(Path(__file__).resolve()), "--serve", target, "--stats-out", stats_out,
+           "--classifier", args.classifier, "--classify-ms", str(args.classify_ms), "--aws-ms", str(args.aws_ms)]
+    for path in args.corpus:
+        cmd += ["--corpus", str(path)]
+    if port is not None:
+        cmd += ["--port", str(port)]
+    if args.cache:
+        cmd.append("--cache")
+    if args.verbose:
+        cmd.append("--verbose")
+    if args.endpoint_url:
+        cmd += ["--endpoint-url", args.endpoint_url]
+    return cmd
+
+
+# ---- load generation ----
+
+async def closed_loop_async(call, queries, concurrency):
+    latencies, errors = [], 0
+    position = iter(range(len(queries)))
+
+    async def worker():
+        nonlocal errors
+        for i in position:
+            t0 = time.perf_counter()
+            try:
+                await call(queries[i])
+            except Exception:
+                errors += 1
+            latencies.append(time.perf_counter() - t0)
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies, errors
+
+
+def closed_loop_threads(call, queries, concurrency):
+    latencies, errors, lock = [], [0], threading.Lock()
+    position = iter(range(len(queries)))
+
+    def worker():
+        while True:
+            with lock:
+                i = next(position, None)
+            if i is None:
+                return
+            t0 = time.perf_counter()
+            try:
+                call(queries[i])
+            except Exception:
+                with lock:
+                    errors[0] += 1
+            with lock:
+                latencies.append(time.perf_counter() - t0)
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for f in [pool.submit(worker) for _ in range(concurrency)]:
+            f.result()
+    return latencies, errors[0]
+
+
+def run_tool(args, corpus, queries):
+    samples = install_stubs(args, corpus)
+    quiet_logs(args)
+    import mcp_server
+    tool = mcp_server.generate_aws_cli
+    # fastmcp wraps decorated functions in a tool object
+    call = getattr(tool, "fn", tool)
+
+    async def go():
+        await closed_loop_async(call, queries[:args.warmup], args.concurrency)
+        started = time.time()
+        t0 = time.perf_counter()
+        latencies, errors = await closed_loop_async(call, queries, args.concurrency)
+        return latencies, errors, time.perf_counter() - t0, started
+
+    latencies, errors, wall, started = asyncio.run(go())
+    return latencies, errors, wall, _since(samples, started), peak_rss_mb()
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def run_http(args, corpus, queries):
+    port = _free_port()
+    stats_out = tempfile.mktemp(suffix=".json")
+    output = None if args.verbose else subprocess.DEVNULL
+    proc = subprocess.Popen(serve_command(args, "http", stats_out, port), stdout=output, stderr=output)
+    local = threading.local()
+
+    def post(query):
+        conn = getattr(local, "conn", None)
+        if conn is None:
+            conn = local.conn = http.client.HTTPConnection("127.0.0.1", port, timeout=60)
+        conn.request("POST", "/generate", body=json.dumps({"query": query}),
+                     headers={"Content-Type": "application/json"})
+        resp = conn.getresponse()
+        resp.read()
+        if resp.status != 200:
+            raise RuntimeError(f"HTTP {resp.status}")
+
+    try:
+        _wait_http(proc, port)
+        closed_loop_threads(post, queries[:args.warmup], args.concurrency)
+        started = time.time()
+        t0 = time.perf_counter()
+        latencies, errors = closed_loop_threads(post, queries, args.concurrency)
+        wall = time.perf_counter() - t0
+    finally:
+        proc.send_signal(2)  # SIGINT: uvicorn shuts down gracefully, then the stats are written
+        _reap(proc)
+    return (latencies, errors, wall) + _read_stats(stats_out, started)
+
+
+def _wait_http(proc, port, timeout=60.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise SystemExit("HTTP server exited during startup (rerun with --verbose; needs fastapi and uvicorn)")
+        try:
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=1)
+            conn.request("GET", "/health")
+            if conn.getresponse().status == 200:
+                return
+        except OSError:
+            time.sleep(0.1)
+    raise SystemExit(f"HTTP server not up after {timeout:g}s")
+
+
+class StdioClient:
+    """Minimal MCP client: newline-delimited JSON-RPC over the server's stdin/stdout."""
+
+    def __init__(self, proc):
+        self.proc = proc
+        self.pending = {}
+        self.next_id = 0
+        self.reader = asyncio.ensure_future(self._read())
+
+    async def _read(self):
+        while True:
+            line = await self.proc.stdout.readline()
+            if not line:
+                break
+            msg = json.loads(line)
+            fut = self.pending.pop(msg.get("id"), None) if "method" not in msg else None
+            if fut is not None and not fut.done():
+                fut.set_result(msg)
+        for fut in self.pending.values():
+            if not fut.done():
+                fut.set_exception(RuntimeError("server closed the stream"))
+
+    async def _send(self, msg):
+        self.proc.stdin.write((json.dumps(msg) + "\n").encode())
+        await self.proc.stdin.drain()
+
+    async def request(self, method, params):
+        self.next_id += 1
+        fut = self.pending[self.next_id] = asyncio.get_running_loop().create_future()
+        await self._send({"jsonrpc": "2.0", "id": self.next_id, "method": method, "params": params})
+        msg = await fut
+        if "error" in msg:
+            raise RuntimeError(msg["error"].get("message"))
+        return msg["result"]
+
+    async def initialize(self):
+        await self.request("initialize", {"protocolVersion": "2024-11-05", "capabilities": {},
+                                          "clientInfo": {"name": "bench_load", "version": "1"}})
+        await self._send({"jsonrpc": "2.0", "method": "notifications/initialized"})
+
+    async def call_tool(self, name, arguments):
+        result = await self.request("tools/call", {"name": name, "arguments": arguments})
+        if result.get("isError"):
+            raise RuntimeError(result.get("content"))
+        return result
+
+
+def run_stdio(args, corpus, queries):
+    stats_out = tempfile.mktemp(suffix=".json")
+
+    async def go():
+        proc = await asyncio.create_subprocess_exec(
+            *serve_command(args, "stdio", stats_out), stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+            stderr=None if args.verbose else subprocess.DEVNULL, limit=2 ** 24)
+        client = StdioClient(proc)
+        try:
+            await asyncio.wait_for(client.initialize(), timeout=60)
+
+            async def call(query):
+                await client.call_tool("generate_aws_cli", {"query": query})
+
+            await closed_loop_async(call, queries[:args.warmup], args.concurrency)
+            started = time.time()
+            t0 = time.perf_counter()
+            latencies, errors = await closed_loop_async(call, queries, args.concurrency)
+            return latencies, errors, time.perf_counter() - t0, started
+        finally:
+            # EOF on stdin ends the stdio server, which then writes its stats
+            proc.stdin.close()
+            try:
+                await asyncio.wait_for(proc.wait(), timeout=30)
+            except asyncio.TimeoutError:
+                proc.kill()
+            client.reader.cancel()
+
+    try:
+        latencies, errors, wall, started = asyncio.run(go())
+    except (asyncio.TimeoutError, RuntimeError) as e:
+        raise SystemExit(f"stdio server failed ({e}); rerun with --verbose (needs fastmcp)")
+    return (latencies, errors, wall) + _read_stats(stats_out, started)
+
+
+def _reap(proc, timeout=30.0):
+    try:
+        proc.wait(timeout=timeout)
+    except subprocess.TimeoutExpired:
+        proc.kill()
+        proc.wait()
+
+
+def _read_stats(path, started):
+    try:
+        with open(path) as f:
+            stats = json.load(f)
+        os.unlink(path)
+    except (OSError, ValueError):
+        return {}, None
+    return _since(stats["samples"], started), stats["peak_rss_mb"]
+
+
+def _since(samples, started) -> dict:
+    """Stage samples recorded after the warm-up, in seconds."""
+    out = {}
+    for stage, pairs in samples.items():
+        kept = [s for t, s in pairs if t >= started]
+        if kept:
+            out[stage] = kept
+    return out
+
+
+# ---- reporting ----
+
+def percentile(sorted_values, q: float) -> float:
+    # nearest rank
+    return sorted_values[max(0, min(len(sorted_values) - 1, math.ceil(q * len(sorted_values)) - 1))]
+
+
+def summarize(seconds) -> dict:
+    values = sorted(seconds)
+    return {"count": len(values), **{f"p{int(q * 100)}": round(percentile(values, q) * 1000, 3)
+                                     for q in (0.5, 0.95, 0.99)}, "max": round(values[-1] * 1000, 3)}
+
+
+def target_result(latencies, errors, wall, stages, rss) -> dict:
+    latency = {"end_to_end": summarize(latencies)} if latencies else {}
+    latency.update({stage: summarize(v) for stage, v in sorted(stages.items())})
+    return {"requests": len(latencies), "errors": errors, "seconds": round(wall, 3),
+            "throughput_rps": round(len(latencies) / wall, 2) if wall else 0.0,
+            "peak_rss_mb": rss, "latency_ms": latency}
+
+
+def print_result(target, result):
+    print(f"\n[{target}] {result['requests']} requests, {result['errors']} errors, "
+          f"{result['throughput_rps']} req/s, peak RSS {result['peak_rss_mb']} MB")
+    print(f"  {'stage':<22} {'count':>7} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9}")
+    for stage, s in result["latency_ms"].items():
+        print(f"  {stage:<22} {s['count']:>7} {s['p50']:9.2f} {s['p95']:9.2f} {s['p99']:9.2f} {s['max']:9.2f}")
+
+
+def compare(results, baseline, tolerance, min_delta_ms):
+    """Regressions of `results` against `baseline`, as messages."""
+    failures = []
+    for target, cur in results["targets"].items():
+        base = baseline.get("targets", {}).get(target)
+        if not base:
+            continue
+        for stage, lat in cur["latency_ms"].items():
+            old = base["latency_ms"].get(stage)
+            if not old:
+                continue
+            for q in ("p95", "p99"):
+                # sub-millisecond stages jitter by more than any sane tolerance
+                if lat[q] > old[q] * (1 + tolerance) and lat[q] - old[q] > min_delta_ms:
+                    failures.append(f"{target} {stage} {q}: {lat[q]:.2f} ms vs baseline {old[q]:.2f} ms")
+        if cur["throughput_rps"] < base["throughput_rps"] * (1 - tolerance):
+            failures.append(f"{target} throughput: {cur['throughput_rps']} req/s "
+                            f"vs baseline {base['throughput_rps']} req/s")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--targets", type=lambda s: [t.strip() for t in s.split(",")], default=["tool"],
+                        help=f"comma-separated subset of {','.join(TARGETS)}")
+    parser.add_argument("--corpus", type=Path, action="append", default=None,
+                        help=f"JSON lines with a query field; repeatable (default: {DEFAULT_CORPUS})")
+    parser.add_argument("--requests", type=int, default=None, help="requests per target (default: corpus size x 5)")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--warmup", type=int, default=20, help="unmeasured requests before each run")
+    parser.add_argument("--classifier", choices=("stub", "real", "none"), default="stub")
+    parser.add_argument("--classify-ms", type=float, default=20.0, help="stub classifier cost per batch")
+    parser.add_argument("--aws-ms", type=float, default=30.0, help="stubbed AWS round trip")
+    parser.add_argument("--endpoint-url", default=None, help="local moto server instead of stubbed responses")
+    parser.add_argument("--cache", action="store_true", help="keep the parse and validation caches on")
+    parser.add_argument("--save-baseline", type=Path, default=None)
+    parser.add_argument("--baseline", type=Path, default=None, help="fail if a run regresses against this file")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed relative regression")
+    parser.add_argument("--min-delta-ms", type=float, default=2.0, help="ignore latency regressions below this")
+    parser.add_argument("--verbose", action="store_true", help="show server output")
+    parser.add_argument("--serve", choices=("http", "stdio"), default=None, help=argparse.SUPPRESS)
+    parser.add_argument("--port", type=int, default=8000, help=argparse.SUPPRESS)
+    parser.add_argument("--stats-out", default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    args.corpus = args.corpus or [DEFAULT_CORPUS]
+
+    corpus = load_corpus(args.corpus)
+    configure_env(args)
+    if args.serve:
+        return serve(args, corpus)
+
+    unknown = set(args.targets) - set(TARGETS)
+    if unknown:
+        parser.error(f"unknown targets: {', '.join(sorted(unknown))}")
+    n = args.requests or len(corpus) * 5
+    queries = [corpus[i % len(corpus)][0] for i in range(n)]
+    print(f"{len(corpus)} corpus queries, {n} requests/target, concurrency {args.concurrency}, "
+          f"classifier {args.classifier} ({args.classify_ms:g} ms), "
+          f"AWS {'at ' + args.endpoint_url if args.endpoint_url else f'stubbed ({args.aws_ms:g} ms)'}")
+
+    runners = {"tool": run_tool, "http": run_http, "stdio": run_stdio}
+    results = {"config": {"corpus": [str(p) for p in args.corpus], "requests": n, "concurrency": args.concurrency,
+                          "classifier": args.classifier, "classify_ms": args.classify_ms, "aws_ms": args.aws_ms,
+                          "cache": args.cache},
+               "targets": {}}
+    # subprocess targets first: the in-process one leaves its state (and RSS) behind
+    for target in sorted(args.targets, key=lambda t: t == "tool"):
+        result = target_result(*runners[target](args, corpus, queries))
+        results["targets"][target] = result
+        print_result(target, result)
+
+    if args.save_baseline:
+        args.save_baseline.write_text(json.dumps(results, indent=2))
+        print(f"\nbaseline written to {args.save_baseline}")
+    if args.baseline:
+        failures = compare(results, json.loads(args.baseline.read_text()), args.tolerance, args.min_delta_ms)
+        if failures:
+            print(f"\nregressions against {args.baseline} (tolerance {args.tolerance:.0%}):")
+            for msg in failures:
+                print(f"  {msg}")
+            sys.exit(1)
+        print(f"\nno regressions against {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
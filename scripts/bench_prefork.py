@@ -0,0 +1,217 @@
+"""
+scripts/bench_prefork.py
+----------------------------------------
+Memory and throughput of the HTTP server with a single process vs pre-forked
+workers (see core.prefork). For each --workers count, this script:
+
+- starts `mcp_server.run_http(N)` in a subprocess (this script in --serve mode);
+- drives POST /generate closed-loop;
+- reads every server process's memory from /proc while it is still up.
+
+Each row reports throughput, latency, the summed RSS and the summed PSS
+(proportional set size). RSS counts shared pages once per process, so it
+overstates the pre-fork total. PSS splits each shared page between the
+processes that map it, so its sum is the memory the server really uses. With
+shared weights the PSS sum should grow by far less than one model per worker.
+
+The stub classifier holds --model-mb of "weights" allocated before the fork.
+Per query it burns --classify-ms of CPU while holding the GIL, as a
+compute-bound model would. A single process is then bound to one core, and
+throughput should scale with workers up to the core count. `--classifier real`
+loads the configured backend instead. AWS is stubbed as in bench_load.py. Rule
+matches are sent to the model tier too (RULES_CONF_THRESHOLD > 1), so every
+request pays for inference.
+
+    python scripts/bench_prefork.py --workers 1,2,4 --requests 400 --concurrency 16
+    python scripts/bench_prefork.py --workers 1,4 --classifier real --json prefork.json
+
+Memory figures need Linux (/proc/<pid>/smaps_rollup).
+"""
+
+import argparse
+import json
+import os
+import signal
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+SRC = ROOT / "src"
+sys.path.insert(0, str(SRC.resolve()))
+
+from bench_load import (DEFAULT_CORPUS, StubClassifier, _free_port, _reap, _wait_http, closed_loop_threads,
+                        configure_env, load_corpus, quiet_logs, stub_aws, summarize)
+
+
+class CpuStubClassifier(StubClassifier):
+    """StubClassifier that burns CPU per query (GIL held) next to a resident weights blob."""
+
+    def __init__(self, ms: float, labels: dict, model_mb: int):
+        super().__init__(0.0, labels)
+        self.cpu_seconds = ms / 1000.0
+        # bytes, not bytearray(n): the pages must really be resident, as loaded weights are
+        self.weights = bytes(range(256)) * (model_mb * 4096)
+
+    def __call__(self, sequences, candidate_labels, multi_label=False):
+        n = 1 if isinstance(sequences, str) else len(sequences)
+        deadline = time.perf_counter() + self.cpu_seconds * n
+        while time.perf_counter() < deadline:
+            pass
+        return super().__call__(sequences, candidate_labels, multi_label)
+
+
+# ---- serve mode (subprocess side) ----
+
+def serve(args, corpus):
+    if args.classifier == "stub":
+        from core import nlp_utils
+        labels = {" ".join(q.split()).lower(): i for q, i in corpus if i}
+        nlp_utils._zero_shot_model.set(CpuStubClassifier(args.classify_ms, labels, args.model_mb))
+    stub_aws(args.aws_ms)
+    quiet_logs(args)
+    import mcp_server
+    mcp_server.run_http(args.workers[0], port=args.port)
+
+
+# ---- memory ----
+
+def process_tree(pid: int):
+    pids, todo = [], [pid]
+    while todo:
+        p = todo.pop()
+        pids.append(p)
+        try:
+            with open(f"/proc/{p}/task/{p}/children") as f:
+                todo.extend(int(c) for c in f.read().split())
+        except OSError:
+            pass
+    return pids
+
+
+def memory_mb(pid: int):
+    """Summed RSS and PSS of `pid` and its descendants, or None without /proc."""
+    totals = {"Rss": 0, "Pss": 0}
+    pids = process_tree(pid)
+    for p in pids:
+        try:
+            with open(f"/proc/{p}/smaps_rollup") as f:
+                for line in f:
+                    key, _, rest = line.partition(":")
+                    if key in totals:
+                        totals[key] += int(rest.split()[0])  # kB
+        except OSError:
+            return None
+    return {"processes": len(pids), "rss_mb": round(totals["Rss"] / 1024, 1),
+            "pss_mb": round(totals["Pss"] / 1024, 1)}
+
+
+# ---- driver ----
+
+def serve_command(args, workers, port):
+    cmd = [sys.executable, str(Path(__file__).resolve()), "--serve", "--workers", str(workers), "--port", str(port),
+           "--classifier", args.classifier, "--classify-ms", str(args.classify_ms), "--model-mb", str(args.model_mb),
+           "--aws-ms", str(args.aws_ms)]
+    for path in args.corpus:
+        cmd += ["--corpus", str(path)]
+    if args.verbose:
+        cmd.append("--verbose")
+    return cmd
+
+
+def run(args, workers, queries):
+    import http.client
+    port = _free_port()
+    output = None if args.verbose else subprocess.DEVNULL
+    proc = subprocess.Popen(serve_command(args, workers, port), stdout=output, stderr=output)
+    local = threading.local()
+
+    def post(query):
+        conn = getattr(local, "conn", None)
+        if conn is None:
+            conn = local.conn = http.client.HTTPConnection("127.0.0.1", port, timeout=60)
+        conn.request("POST", "/generate", body=json.dumps({"query": query}),
+                     headers={"Content-Type": "application/json"})
+        resp = conn.getresponse()
+        resp.read()
+        if resp.status != 200:
+            raise RuntimeError(f"HTTP {resp.status}")
+
+    try:
+        _wait_http(proc, port, timeout=args.startup_timeout)
+        idle = memory_mb(proc.pid)
+        closed_loop_threads(post, queries[:args.warmup], args.concurrency)
+        t0 = time.perf_counter()
+        latencies, errors = closed_loop_threads(post, queries, args.concurrency)
+        wall = time.perf_counter() - t0
+        loaded = memory_mb(proc.pid)
+    finally:
+        proc.send_signal(signal.SIGINT)
+        _reap(proc)
+    return {"workers": workers, "requests": len(latencies), "errors": errors,
+            "throughput_rps": round(len(latencies) / wall, 2) if wall else 0.0,
+            "latency_ms": summarize(latencies), "memory_idle": idle, "memory_loaded": loaded}
+
+
+def print_row(result, base):
+    mem = result["memory_loaded"] or {}
+    speedup = result["throughput_rps"] / base["throughput_rps"] if base["throughput_rps"] else 0.0
+    print(f"{result['workers']:>7} {result['throughput_rps']:>9.1f} {speedup:>6.2f}x "
+          f"{result['latency_ms']['p50']:>9.1f} {result['latency_ms']['p95']:>9.1f} "
+          f"{mem.get('processes', '-'):>5} {mem.get('rss_mb', '-'):>9} {mem.get('pss_mb', '-'):>9} "
+          f"{result['errors']:>6}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=lambda s: [int(w) for w in s.split(",")], default=[1, 2, 4],
+                        help="comma-separated worker counts; 1 is the single-process baseline")
+    parser.add_argument("--corpus", type=Path, action="append", default=None,
+                        help=f"JSON lines with a query field; repeatable (default: {DEFAULT_CORPUS})")
+    parser.add_argument("--requests", type=int, default=None, help="requests per run (default: corpus size x 5)")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--warmup", type=int, default=20, help="unmeasured requests before each run")
+    parser.add_argument("--classifier", choices=("stub", "real"), default="stub")
+    parser.add_argument("--classify-ms", type=float, default=10.0, help="stub classifier CPU per query")
+    parser.add_argument("--model-mb", type=int, default=512, help="stub classifier weights")
+    parser.add_argument("--aws-ms", type=float, default=5.0, help="stubbed AWS round trip")
+    parser.add_argument("--startup-timeout", type=float, default=300.0)
+    parser.add_argument("--json", type=Path, default=None, help="also write the results here")
+    parser.add_argument("--verbose", action="store_true", help="show server output")
+    parser.add_argument("--serve", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--port", type=int, default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    args.corpus = args.corpus or [DEFAULT_CORPUS]
+    args.cache, args.endpoint_url = False, None
+
+    corpus = load_corpus(args.corpus)
+    configure_env(args)
+    # every query pays for inference: no rule match is confident enough to skip the model
+    os.environ["RULES_CONF_THRESHOLD"] = "2"
+    if args.serve:
+        return serve(args, corpus)
+
+    n = args.requests or len(corpus) * 5
+    queries = [corpus[i % len(corpus)][0] for i in range(n)]
+    print(f"{n} requests/run, concurrency {args.concurrency}, classifier {args.classifier} "
+          f"({args.classify_ms:g} ms CPU/query, {args.model_mb} MB weights), {os.cpu_count()} cores")
+    print(f"{'workers':>7} {'req/s':>9} {'speed':>7} {'p50 ms':>9} {'p95 ms':>9} "
+          f"{'procs':>5} {'RSS MB':>9} {'PSS MB':>9} {'errors':>6}")
+    results = []
+    for workers in args.workers:
+        results.append(run(args, workers, queries))
+        print_row(results[-1], results[0])
+    if any(r["memory_loaded"] is None for r in results):
+        print("(memory needs /proc/<pid>/smaps_rollup)")
+    if args.json:
+        args.json.write_text(json.dumps({"config": {"requests": n, "concurrency": args.concurrency,
+                                                    "classifier": args.classifier, "classify_ms": args.classify_ms,
+                                                    "model_mb": args.model_mb, "cpus": os.cpu_count()},
+                                         "runs": results}, indent=2))
+        print(f"\nresults written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+scripts/bench_rules.py
+----------------------------------------
+Per-query cost of the rule tier: the previous sequential regex cascade vs the
+compiled single-pass matcher in core.intent_rules.
+
+Queries are read from a JSONL corpus (one {"query": ...} object per line;
+`title`/`body` fields are accepted too so request logs can be replayed).
+
+    python scripts/bench_rules.py --corpus scripts/data/queries.jsonl --repeat 2000
+"""
+
+import argparse
+import json
+import re
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+SRC = ROOT / "src"
+sys.path.insert(0, str(SRC.resolve()))
+
+from core import intent_rules
+
+
+def legacy_rule_intent_and_entities(text: str):
+    """The cascade as it was before core.intent_rules, kept for comparison."""
+    t = text.lower()
+    r = re.search(r"(?:in\s+|region\s+)(us-[a-z0-9-]+)", t)
+    region = r.group(1) if r else None
+    if re.search(r"\b(create|make)\b.*\b(s3|bucket)\b", t):
+        m = re.search(r"(?:named|called|name(?:d)?|bucket\s+named|bucket\s+)([a-z0-9][a-z0-9\-\.]{2,62})", t)
+        return "create_s3_bucket", {"bucket": m.group(1) if m else None, "region": region}
+    if re.search(r"\b(list|show)\b.*\b(s3|buckets)\b", t):
+        return "list_s3_buckets", {"region": region}
+    if re.search(r"\b(create|make)\b.*\b(dynamo|dynamodb|table)\b", t):
+        m = re.search(r"(?:table\s+named|table\s+)([A-Za-z0-9_\-]+)", t)
+        return "create_dynamodb_table", {"table": m.group(1) if m else None, "region": region}
+    if re.search(r"\b(list|show)\b.*\b(dynamo|tables)\b", t):
+        return "list_dynamodb_tables", {"region": region}
+    m_start = re.search(r"\b(start|run)\b.*\b(ec2|instance)\b.*\b(i-[0-9a-fA-F]+)\b", t)
+    if m_start:
+        return "start_ec2_instance", {"instance_id": m_start.group(3), "region": region}
+    m_stop = re.search(r"\b(stop|terminate)\b.*\b(ec2|instance)\b.*\b(i-[0-9a-fA-F]+)\b", t)
+    if m_stop:
+        return "stop_ec2_instance", {"instance_id": m_stop.group(3), "region": region}
+    if re.search(r"\b(list|show|describe)\b.*\b(ec2|instances)\b", t):
+        m_tag = re.search(r"tag\s+([A-Za-z0-9\-_]+)=([A-Za-z0-9\-_]+)", t)
+        tag = {m_tag.group(1): m_tag.group(2)} if m_tag else None
+        return "describe_ec2_instances", {"region": region, "tag": tag}
+    if re.search(r"\b(create|add)\b.*\b(iam|user)\b", t):
+        m = re.search(r"(?:user\s+named|user\s+)([A-Za-z0-9_\-]+)", t)
+        return "create_iam_user", {"user": m.group(1) if m else None}
+    if re.search(r"\b(list|show)\b.*\b(iam|users)\b", t):
+        return "list_iam_users", {}
+    if re.search(r"\b(invoke|call)\b.*\b(lambda)\b", t):
+        m = re.search(r"(?:function\s+named|function\s+|named\s+)([A-Za-z0-9_\-]+)", t)
+        return "invoke_lambda", {"function": m.group(1) if m else None, "region": region}
+    if re.search(r"\b(list|show)\b.*\b(lambda|functions)\b", t):
+        return "list_lambda_functions", {"region": region}
+    return ("unknown", {})
+
+
+def load_corpus(path: Path):
+    queries = []
+    with path.open(encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            obj = json.loads(line)
+            q = obj.get("query") or obj.get("title") or obj.get("body")
+            if q:
+                queries.append(q)
+    return queries
+
+
+def bench(fn, queries, repeat):
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        for q in queries:
+            fn(q)
+    elapsed = time.perf_counter() - t0
+    return elapsed / (repeat * len(queries)) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--corpus", type=Path, default=ROOT / "scripts" / "data" / "queries.jsonl")
+    parser.add_argument("--repeat", type=int, default=2000)
+    args = parser.parse_args()
+
+    queries = load_corpus(args.corpus)
+    print(f"{len(queries)} queries x {args.repeat} repetitions\n")
+    legacy = bench(legacy_rule_intent_and_entities, queries, args.repeat)
+    compiled = bench(intent_rules.classify, queries, args.repeat)
+    print(f"legacy cascade   {legacy:8.2f} us/query")
+    print(f"compiled rules   {compiled:8.2f} us/query   ({legacy / compiled:.1f}x)")
+
+    diffs = [(q, legacy_rule_intent_and_entities(q), intent_rules.classify(q)) for q in queries]
+    diffs = [d for d in diffs if d[1] != d[2]]
+    if diffs:
+        print(f"\n{len(diffs)} queries parse differently:")
+        for q, old, new in diffs:
+            print(f"  {q!r}\n    legacy:   {old}\n    compiled: {new}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+scripts/bench_telemetry.py
+----------------------------------------
+Request-path cost of one telemetry event: the previous synchronous loguru write
+(serialize=True file sink) vs TelemetryPipeline.emit, plus end-to-end drain
+time for the batched writer.
+
+With --dynamodb-endpoint the pipeline also writes to a local DynamoDB stand-in
+(DynamoDB Local or `moto_server`), creating the telemetry table if needed:
+
+    python scripts/bench_telemetry.py --events 20000
+    python scripts/bench_telemetry.py --events 2000 --dynamodb-endpoint http://127.0.0.1:8000
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+SRC = ROOT / "src"
+sys.path.insert(0, str(SRC.resolve()))
+
+from loguru import logger
+
+from core.telemetry import DynamoDBSink, JsonlFileSink, TelemetryPipeline
+
+DETAILS = {"result_summary": {"intent": "list_s3_buckets", "status": "valid"}}
+
+
+def event(i):
+    return {"timestamp": int(time.time() * 1000), "event": "response.emitted", "details": {**DETAILS, "i": i}}
+
+
+def bench_loguru(path, n):
+    logger.remove()
+    logger.add(path, serialize=True, level="INFO")
+    t0 = time.perf_counter()
+    for i in range(n):
+        logger.info(event(i))
+    elapsed = time.perf_counter() - t0
+    logger.remove()
+    return elapsed
+
+
+def ensure_table(client, table):
+    if table in client.list_tables()["TableNames"]:
+        return
+    client.create_table(
+        TableName=table, BillingMode="PAY_PER_REQUEST",
+        AttributeDefinitions=[{"AttributeName": "tenantId", "AttributeType": "S"},
+                              {"AttributeName": "eventId", "AttributeType": "S"}],
+        KeySchema=[{"AttributeName": "tenantId", "KeyType": "HASH"},
+                   {"AttributeName": "eventId", "KeyType": "RANGE"}],
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--events", type=int, default=20000)
+    parser.add_argument("--batch-size", type=int, default=100)
+    parser.add_argument("--dynamodb-endpoint", default=None)
+    parser.add_argument("--table", default="mcp-telemetry-v2")
+    args = parser.parse_args()
+
+    tmp = tempfile.mkdtemp()
+    sync_s = bench_loguru(os.path.join(tmp, "loguru.log"), args.events)
+
+    sinks = [JsonlFileSink(os.path.join(tmp, "telemetry.log"))]
+    if args.dynamodb_endpoint:
+        import boto3
+        os.environ.setdefault("AWS_ACCESS_KEY_ID", "testing")
+        os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "testing")
+        client = boto3.client("dynamodb", region_name="us-west-1", endpoint_url=args.dynamodb_endpoint)
+        ensure_table(client, args.table)
+        sinks.append(DynamoDBSink(args.table, client=client, tenant="bench"))
+
+    pipeline = TelemetryPipeline(sinks, buffer_size=args.events, batch_size=args.batch_size)
+    t0 = time.perf_counter()
+    for i in range(args.events):
+        pipeline.emit(event(i))
+    emit_s = time.perf_counter() - t0
+    pipeline.shutdown(timeout=120)
+    drained_s = time.perf_counter() - t0
+
+    print(f"{args.events} events\n")
+    print(f"sync loguru       {sync_s / args.events * 1e6:8.2f} us/event on the request path")
+    print(f"pipeline.emit     {emit_s / args.events * 1e6:8.2f} us/event on the request path "
+          f"({sync_s / emit_s:.1f}x)")
+    print(f"pipeline drained  {drained_s:8.2f} s total in background")
+    print("pipeline stats:", pipeline.stats())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+scripts/export_onnx.py
+----------------------------------------
+Export the zero-shot NLI model to ONNX for ML_BACKEND=onnx. The tokenizer and
+config are saved next to model.onnx; --int8 additionally applies ONNX Runtime
+dynamic int8 quantization (smaller file, faster CPU matmuls).
+
+    python scripts/export_onnx.py --out models/bart-large-mnli-onnx --int8
+    ML_BACKEND=onnx ONNX_MODEL_DIR=models/bart-large-mnli-onnx python src/mcp_server.py
+"""
+
+import argparse
+import os
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+SRC = ROOT / "src"
+sys.path.insert(0, str(SRC.resolve()))
+
+from core.nli_backends import NLI_MODEL, ONNX_MODEL_DIR
+
+
+def export(model_name: str, out_dir: str, opset: int):
+    import torch
+    from transformers import AutoModelForSequenceClassification, AutoTokenizer
+
+    os.makedirs(out_dir, exist_ok=True)
+    tokenizer = AutoTokenizer.from_pretrained(model_name)
+    model = AutoModelForSequenceClassification.from_pretrained(model_name)
+    model.eval()
+    sample = tokenizer(["list my s3 buckets"], ["This example is list_s3_buckets."], return_tensors="pt")
+    path = os.path.join(out_dir, "model.onnx")
+    torch.onnx.export(
+        model, (sample["input_ids"], sample["attention_mask"]), path,
+        input_names=["input_ids", "attention_mask"], output_names=["logits"],
+        dynamic_axes={"input_ids": {0: "batch", 1: "seq"}, "attention_mask": {0: "batch", 1: "seq"},
+                      "logits": {0: "batch"}},
+        opset_version=opset,
+    )
+    tokenizer.save_pretrained(out_dir)
+    model.config.save_pretrained(out_dir)
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--model", default=NLI_MODEL)
+    parser.add_argument("--out", default=ONNX_MODEL_DIR)
+    parser.add_argument("--opset", type=int, default=14)
+    parser.add_argument("--int8", action="store_true", help="replace model.onnx with a dynamically quantized copy")
+    args = parser.parse_args()
+
+    path = export(args.model, args.out, args.opset)
+    print(f"exported {args.model} -> {path} ({os.path.getsize(path) / 1e6:.0f} MB)")
+    if args.int8:
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+        fp32 = path.replace(".onnx", ".fp32.onnx")
+        os.replace(path, fp32)
+        quantize_dynamic(fp32, path, weight_type=QuantType.QInt8)
+        print(f"quantized -> {path} ({os.path.getsize(path) / 1e6:.0f} MB); fp32 copy kept at {fp32}")
+
+
+if __name__ == "__main__":
+    main()
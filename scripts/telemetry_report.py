@@ -0,0 +1,335 @@
+"""
+scripts/telemetry_report.py
+----------------------------------------
+Analytics over the JSON-lines telemetry log and its rotated backups.
+
+Reads `telemetry.log` plus every `telemetry.log.*` next to it: the numbered
+backups of the file sink, and gzip / bz2 / xz compressed copies, e.g. from
+logrotate. Each file is streamed line by line, so memory stays constant
+however long the history is:
+
+- counters for events, intents, validation statuses and NLP tiers;
+- log-bucketed latency histograms per stage (within 5%);
+- a Space-Saving summary for the most frequent normalized queries, which
+  counts at most --capacity distinct queries.
+
+With --checkpoint the aggregates and per-file read offsets are saved after each
+run, so a re-run only reads bytes appended since. Files are recognized by a
+hash of their first KiB rather than by name, so a rotated or compressed copy
+is not read twice. --export-hot writes the top queries as JSON lines
+({"query": ..., "count": ...}). Point NLP_CACHE_PREWARM_FILE (or
+cache.nlp.prewarm_file) at it to parse them into the cache when the server
+starts. Queries logged as hashes (TELEMETRY_QUERY_LOGGING=hash, the default)
+are counted but cannot be exported; the server needs `full` or `truncate`
+logging for that, and the export fails if the top queries are all hashes.
+
+    python scripts/telemetry_report.py
+    python scripts/telemetry_report.py --checkpoint telemetry/report.ckpt --top 50 --json
+    python scripts/telemetry_report.py --export-hot telemetry/hot_queries.jsonl --top 200
+"""
+
+import argparse
+import bz2
+import gzip
+import hashlib
+import heapq
+import json
+import lzma
+import math
+import os
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+SRC = ROOT / "src"
+sys.path.insert(0, str(SRC.resolve()))
+
+from config.settings import CONFIG
+
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:
+    _loads = json.loads
+
+HEAD_BYTES = 1024
+OPENERS = {".gz": gzip.open, ".bz2": bz2.open, ".xz": lzma.open, ".lzma": lzma.open}
+CHECKPOINT_VERSION = 1
+
+
+def default_log_path() -> str:
+    return os.getenv("TELEMETRY_LOG_PATH", CONFIG.get("telemetry", {}).get("log_path", "telemetry/telemetry.log"))
+
+
+def normalize(query: str) -> str:
+    # same normalization as the parse cache key; case is kept since entity names are case-sensitive
+    return " ".join(query.split())
+
+
+class LogHistogram:
+    """Sparse histogram over geometric buckets: percentiles within GROWTH - 1."""
+
+    MIN_MS = 0.01
+    GROWTH = 1.05
+
+    def __init__(self, buckets=None):
+        self.buckets = Counter({int(k): v for k, v in (buckets or {}).items()})
+
+    def add(self, ms: float):
+        i = 0 if ms <= self.MIN_MS else math.ceil(math.log(ms / self.MIN_MS, self.GROWTH))
+        self.buckets[i] += 1
+
+    def percentile(self, q: float) -> float:
+        # upper bound of the bucket holding the q-th observation
+        target, seen = q * sum(self.buckets.values()), 0
+        for i in sorted(self.buckets):
+            seen += self.buckets[i]
+            if seen >= target:
+                return self.MIN_MS * self.GROWTH ** i
+        return 0.0
+
+    def summary(self) -> dict:
+        return {"count": sum(self.buckets.values()),
+                **{f"p{int(q * 100)}_ms": round(self.percentile(q), 2) for q in (0.5, 0.95, 0.99)}}
+
+
+class SpaceSaving:
+    """Top-k heavy hitters in O(capacity) memory (Metwally et al.).
+
+    A new key arriving when full replaces the current minimum and inherits
+    its count, recorded as `error`: the true count is within [count - error, count].
+    """
+
+    def __init__(self, capacity: int, items=()):
+        self.capacity = max(1, capacity)
+        self.counts, self.errors = {}, {}
+        for key, count, error in items:
+            self.counts[key], self.errors[key] = count, error
+        self._heap = [(c, k) for k, c in self.counts.items()]
+        heapq.heapify(self._heap)
+
+    def add(self, key: str):
+        if key in self.counts:
+            self.counts[key] += 1
+            return
+        error = 0
+        if len(self.counts) >= self.capacity:
+            # heap entries lag behind increments; refresh them until the true minimum is on top
+            while True:
+                count, victim = heapq.heappop(self._heap)
+                if self.counts[victim] == count:
+                    break
+                heapq.heappush(self._heap, (self.counts[victim], victim))
+            del self.counts[victim], self.errors[victim]
+            error = count
+        self.counts[key], self.errors[key] = error + 1, error
+        heapq.heappush(self._heap, (error + 1, key))
+
+    def top(self, n: int):
+        return sorted(((k, c, self.errors[k]) for k, c in self.counts.items()), key=lambda t: -t[1])[:n]
+
+
+class Report:
+    def __init__(self, capacity: int, state: dict = None):
+        state = state or {}
+        self.lines = state.get("lines", 0)
+        self.bad_lines = state.get("bad_lines", 0)
+        self.first_ts = state.get("first_ts")
+        self.last_ts = state.get("last_ts")
+        self.events = Counter(state.get("events", {}))
+        self.intents = Counter(state.get("intents", {}))
+        self.statuses = Counter(state.get("statuses", {}))
+        self.tiers = Counter(state.get("tiers", {}))
+        self.latency = {k: LogHistogram(v) for k, v in state.get("latency", {}).items()}
+        self.queries = SpaceSaving(capacity, state.get("queries", ()))
+
+    def add_line(self, line: bytes):
+        self.lines += 1
+        try:
+            rec = _loads(line)
+            event, details = rec["event"], rec.get("details") or {}
+        except (ValueError, KeyError, TypeError):
+            self.bad_lines += 1
+            return
+        self.events[event] += 1
+        ts = rec.get("timestamp")
+        if isinstance(ts, (int, float)):
+            self.first_ts = ts if self.first_ts is None else min(self.first_ts, ts)
+            self.last_ts = ts if self.last_ts is None else max(self.last_ts, ts)
+
+        if event == "lambda.invoke":
+            summaries = [details]
+            if details.get("duration_ms") is not None:
+                self._latency("lambda", details["duration_ms"])
+        else:
+            summaries = details.get("result_summary") or []
+            if isinstance(summaries, dict):
+                summaries = [summaries]
+        for s in summaries:
+            if isinstance(s, dict) and s.get("intent"):
+                self.intents[s["intent"]] += 1
+                self.statuses[s.get("status") or "none"] += 1
+        if details.get("tier"):
+            self.tiers[details["tier"]] += 1
+        for stage, ms in (details.get("stages_ms") or {}).items():
+            self._latency(stage, ms)
+
+        if details.get("query"):
+            self.queries.add(normalize(details["query"]))
+        elif details.get("query_sha256"):
+            self.queries.add("sha256:" + details["query_sha256"])
+
+    def _latency(self, stage: str, ms):
+        if isinstance(ms, (int, float)):
+            self.latency.setdefault(stage, LogHistogram()).add(ms)
+
+    def state(self) -> dict:
+        return {"lines": self.lines, "bad_lines": self.bad_lines, "first_ts": self.first_ts,
+                "last_ts": self.last_ts, "events": self.events, "intents": self.intents,
+                "statuses": self.statuses, "tiers": self.tiers,
+                "latency": {k: h.buckets for k, h in self.latency.items()},
+                "queries": self.queries.top(self.queries.capacity)}
+
+    def summary(self, top: int) -> dict:
+        def iso(ts):
+            return time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(ts / 1000)) if ts else None
+
+        return {"lines": self.lines, "bad_lines": self.bad_lines,
+                "from": iso(self.first_ts), "to": iso(self.last_ts),
+                "events": dict(self.events.most_common()), "intents": dict(self.intents.most_common()),
+                "statuses": dict(self.statuses.most_common()), "tiers": dict(self.tiers.most_common()),
+                "latency": {k: h.summary() for k, h in sorted(self.latency.items())},
+                "top_queries": [{"query": k, "count": c, "error": e} for k, c, e in self.queries.top(top)]}
+
+
+def log_files(path: Path):
+    """The live log and its rotated / compressed siblings, oldest first."""
+    files = [p for p in path.parent.glob(path.name + ".*") if p.is_file()]
+    if path.is_file():
+        files.append(path)
+    return sorted(files, key=lambda p: p.stat().st_mtime)
+
+
+def _open(path: Path):
+    return OPENERS.get(path.suffix, open)(path, "rb")
+
+
+def _match(entries, head: bytes):
+    """Checkpoint entry for the file starting with `head` (longest fingerprint wins)."""
+    best = None
+    for entry in entries:
+        n = entry["head_len"]
+        if n <= len(head) and hashlib.sha1(head[:n]).hexdigest() == entry["head_sha1"]:
+            if best is None or n > best["head_len"]:
+                best = entry
+    return best
+
+
+def scan_file(path: Path, report: Report, entries: list) -> int:
+    """Feed the unread complete lines of `path` to `report`; returns bytes read."""
+    with _open(path) as f:
+        head = f.read(HEAD_BYTES)
+        if not head:
+            return 0
+        entry = _match(entries, head)
+        if entry is None:
+            entry = {"offset": 0}
+            entries.append(entry)
+        offset = entry["offset"]
+        if path.suffix not in OPENERS and offset > path.stat().st_size:
+            offset = 0  # truncated in place
+        f.seek(offset)
+        pos = offset
+        for line in f:
+            if not line.endswith(b"\n"):
+                break  # still being written; picked up next run
+            pos += len(line)
+            if line.strip():
+                report.add_line(line)
+        entry.update(head_len=len(head), head_sha1=hashlib.sha1(head).hexdigest(), offset=pos, name=path.name)
+        return pos - offset
+
+
+def load_checkpoint(path, capacity):
+    if path and path.exists():
+        data = json.loads(path.read_text())
+        if data.get("version") == CHECKPOINT_VERSION:
+            return Report(capacity, data["state"]), data["files"]
+    return Report(capacity), []
+
+
+def save_checkpoint(path: Path, report: Report, entries: list):
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    tmp.write_text(json.dumps({"version": CHECKPOINT_VERSION, "files": entries, "state": report.state()}))
+    os.replace(tmp, path)
+
+
+def print_summary(s: dict):
+    print(f"{s['lines']} records ({s['bad_lines']} unreadable), {s['from']} .. {s['to']}")
+    for title, key in (("events", "events"), ("intents", "intents"), ("validation status", "statuses"),
+                       ("NLP tier", "tiers")):
+        total = sum(s[key].values())
+        print(f"\n{title}:")
+        for name, n in s[key].items():
+            print(f"  {name:<28} {n:>10} {n / total:7.1%}")
+    print(f"\n{'stage latency':<30} {'count':>10} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for stage, h in s["latency"].items():
+        print(f"  {stage:<28} {h['count']:>10} {h['p50_ms']:9.2f} {h['p95_ms']:9.2f} {h['p99_ms']:9.2f}")
+    print("\ntop queries:")
+    for q in s["top_queries"]:
+        bound = f" (+/-{q['error']})" if q["error"] else ""
+        print(f"  {q['count']:>10}{bound}  {q['query']}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--log", type=Path, default=Path(default_log_path()),
+                        help="live log file; rotated siblings are found next to it")
+    parser.add_argument("--top", type=int, default=20, help="queries to report / export")
+    parser.add_argument("--capacity", type=int, default=10000, help="distinct queries tracked for the top list")
+    parser.add_argument("--checkpoint", type=Path, default=None, help="state file for incremental re-runs")
+    parser.add_argument("--reset", action="store_true", help="ignore an existing checkpoint")
+    parser.add_argument("--export-hot", type=Path, default=None, help="write the top queries as JSON lines")
+    parser.add_argument("--min-count", type=int, default=2,
+                        help="export only queries seen at least this often (after the Space-Saving error)")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args()
+
+    report, entries = (Report(args.capacity), []) if args.reset else load_checkpoint(args.checkpoint, args.capacity)
+    files = log_files(args.log)
+    if not files and not report.lines:
+        raise SystemExit(f"no telemetry logs at {args.log}")
+    t0, read = time.perf_counter(), 0
+    for path in files:
+        read += scan_file(path, report, entries)
+    elapsed = time.perf_counter() - t0
+    if args.checkpoint:
+        # forget files that rotated away; their counts stay in the aggregates
+        present = {p.name for p in files}
+        save_checkpoint(args.checkpoint, report, [e for e in entries if e.get("name") in present])
+
+    summary = report.summary(args.top)
+    if args.json:
+        print(json.dumps(summary, indent=2))
+    else:
+        print_summary(summary)
+        print(f"\nread {read / 1e6:.1f} MB from {len(files)} files in {elapsed:.2f}s")
+
+    if args.export_hot:
+        frequent = [q for q in summary["top_queries"] if q["count"] - q["error"] >= args.min_count]
+        hot = [q for q in frequent if not q["query"].startswith("sha256:")]
+        if frequent and not hot:
+            raise SystemExit("--export-hot: the top queries were only logged as hashes, which can't be parsed "
+                             "back; set TELEMETRY_QUERY_LOGGING=full (or truncate) on the server to export them")
+        if len(hot) < len(frequent):
+            print(f"skipped {len(frequent) - len(hot)} hashed queries (TELEMETRY_QUERY_LOGGING=hash)", file=sys.stderr)
+        with open(args.export_hot, "w", encoding="utf-8") as f:
+            for q in hot:
+                f.write(json.dumps({"query": q["query"], "count": q["count"]}) + "\n")
+        print(f"exported {len(hot)} queries to {args.export_hot}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
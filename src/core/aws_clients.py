@@ -0,0 +1,173 @@
+# src/core/aws_clients.py
+"""Process-wide registry of reusable boto3 clients.
+
+Building a client means resolving the credential chain, loading the service
+model and opening a fresh urllib3 pool, so the validator asks for clients here
+instead of creating a Session per call. Clients are cached per
+(service, region, profile); botocore clients are thread-safe once built, and
+building goes through a lock because boto3 Sessions are not.
+
+Refreshable credentials (SSO, assume-role, instance/container roles) are renewed
+by botocore itself. Static temporary credentials are not, so a client whose call
+fails with an expired-token error is marked stale and rebuilt on next use;
+`AWS_CLIENT_MAX_AGE` additionally retires clients after a fixed age.
+
+boto3 is imported on first use, so importing this module (and the validator)
+stays cheap for cold starts that never reach AWS.
+"""
+import os
+import threading
+import time
+from typing import TYPE_CHECKING, Dict, Optional, Tuple
+
+from loguru import logger
+
+from config.settings import CONFIG
+from core.metrics import AWS_API_ERRORS, AWS_API_SECONDS
+
+if TYPE_CHECKING:
+    import boto3
+
+_cfg = CONFIG.get("aws_clients", {})
+MAX_POOL_CONNECTIONS = int(os.getenv("AWS_MAX_POOL_CONNECTIONS", _cfg.get("max_pool_connections", 10)))
+CLIENT_MAX_AGE = float(os.getenv("AWS_CLIENT_MAX_AGE", _cfg.get("max_age_seconds", 0)))  # 0 = no age limit
+CONNECT_TIMEOUT = float(os.getenv("AWS_CONNECT_TIMEOUT", _cfg.get("connect_timeout_seconds", 5)))
+READ_TIMEOUT = float(os.getenv("AWS_READ_TIMEOUT", _cfg.get("read_timeout_seconds", 10)))
+
+EXPIRED_CREDENTIAL_CODES = frozenset({
+    "ExpiredToken", "ExpiredTokenException", "RequestExpired", "TokenRefreshRequired",
+})
+
+ClientKey = Tuple[str, str, Optional[str]]
+
+
+class _Entry:
+    __slots__ = ("client", "created", "stale")
+
+    def __init__(self, client):
+        self.client = client
+        self.created = time.monotonic()
+        self.stale = False
+
+
+class ClientRegistry:
+    def __init__(self, max_pool_connections: int = MAX_POOL_CONNECTIONS, max_age: float = CLIENT_MAX_AGE):
+        self.max_pool_connections = max(1, int(max_pool_connections))
+        self._config = None
+        self.max_age = max_age
+        self._clients: Dict[ClientKey, _Entry] = {}
+        self._sessions: Dict[Optional[str], "boto3.Session"] = {}
+        self._lock = threading.Lock()
+        self.hits = self.created = self.refreshed = self.evictions = 0
+
+    @property
+    def config(self):
+        if self._config is None:
+            from botocore.config import Config
+            self._config = Config(
+                max_pool_connections=self.max_pool_connections,
+                connect_timeout=CONNECT_TIMEOUT,
+                read_timeout=READ_TIMEOUT,
+            )
+        return self._config
+
+    def _usable(self, entry: Optional[_Entry]) -> bool:
+        if entry is None or entry.stale:
+            return False
+        return not self.max_age or time.monotonic() - entry.created < self.max_age
+
+    def get(self, service: str, region: str, profile: Optional[str] = None):
+        profile = profile or os.getenv("AWS_PROFILE") or None
+        key = (service, region, profile)
+        entry = self._clients.get(key)
+        if self._usable(entry):
+            self.hits += 1
+            return entry.client
+        with self._lock:
+            entry = self._clients.get(key)
+            if self._usable(entry):
+                self.hits += 1
+                return entry.client
+            if entry is not None:
+                # stale or aged out: drop the session too so credentials are re-resolved
+                self._sessions.pop(profile, None)
+                self.refreshed += 1
+            session = self._sessions.get(profile)
+            if session is None:
+                import boto3
+                session = self._sessions[profile] = boto3.Session(profile_name=profile)
+            client = session.client(service, region_name=region, config=self.config)
+            client.meta.events.register("before-parameter-build", _start_timer)
+            client.meta.events.register("after-call", _record_call)
+            client.meta.events.register("after-call", self._expiry_hook(key))
+            self._clients[key] = _Entry(client)
+            self.created += 1
+            return client
+
+    def _expiry_hook(self, key: ClientKey):
+        def _after_call(parsed=None, **kwargs):
+            code = (parsed or {}).get("Error", {}).get("Code")
+            if code in EXPIRED_CREDENTIAL_CODES:
+                logger.warning("Credentials expired for {} client ({}); rebuilding on next use", key[0], code)
+                self.invalidate(*key)
+        return _after_call
+
+    def invalidate(self, service: str, region: str, profile: Optional[str] = None):
+        entry = self._clients.get((service, region, profile))
+        if entry is not None:
+            entry.stale = True
+
+    def evict(self, service: Optional[str] = None, region: Optional[str] = None, profile: Optional[str] = None):
+        """Drop matching clients (all when no filter is given)."""
+        with self._lock:
+            for key in list(self._clients):
+                if (service is None or key[0] == service) and (region is None or key[1] == region) \
+                        and (profile is None or key[2] == profile):
+                    del self._clients[key]
+                    self.evictions += 1
+            if service is None and region is None:
+                if profile is None:
+                    self._sessions.clear()
+                else:
+                    self._sessions.pop(profile, None)
+
+    def stats(self) -> dict:
+        return {
+            "clients": len(self._clients),
+            "max_pool_connections": self.max_pool_connections,
+            "hits": self.hits,
+            "created": self.created,
+            "refreshed": self.refreshed,
+            "evictions": self.evictions,
+        }
+
+
+def _start_timer(context=None, **kwargs):
+    if context is not None:
+        context["mcp_started"] = time.perf_counter()
+
+
+def _record_call(model=None, parsed=None, context=None, **kwargs):
+    started = (context or {}).get("mcp_started")
+    if started is None or model is None:
+        return
+    service = model.service_model.service_name
+    AWS_API_SECONDS.observe(time.perf_counter() - started, service, model.name)
+    code = (parsed or {}).get("Error", {}).get("Code")
+    if code:
+        AWS_API_ERRORS.inc(service, model.name, code)
+
+
+_registry = ClientRegistry()
+
+
+def get_client(service: str, region: str, profile: Optional[str] = None):
+    return _registry.get(service, region, profile)
+
+
+def evict_clients(service: Optional[str] = None, region: Optional[str] = None, profile: Optional[str] = None):
+    _registry.evict(service, region, profile)
+
+
+def client_stats() -> dict:
+    return _registry.stats()
@@ -0,0 +1,139 @@
+# src/core/aws_listings.py
+"""Paginated, lazily streamed resource listings for the list_* intents.
+
+`iter_resources` returns a `ResourceListing`: iterating it walks the service
+paginator page by page and yields one compact item per resource, so callers can
+stream results instead of materializing a whole account. A `limit` stops the
+walk early; afterwards `next_token` holds botocore's resume token (None when
+the listing is complete), which can be passed back as `next_token` to continue.
+
+Filters are pushed to the API where it supports them (`LISTINGS[...].filters`),
+including ones derived from the parsed query (EC2 tag / state / instance id), so
+only matching resources are transferred.
+"""
+import os
+from typing import Any, Callable, Dict, Iterator, List, NamedTuple, Optional
+
+from config.settings import CONFIG, DEFAULT_REGION
+from core.aws_clients import get_client
+
+_cfg = CONFIG.get("listing", {})
+DEFAULT_LIST_LIMIT = int(os.getenv("LIST_LIMIT", _cfg.get("default_limit", 1000)))
+
+
+def ec2_instance_filters(entities: dict) -> dict:
+    """Parsed tag / state / instance-id entities as EC2 filter names."""
+    filters = {f"tag:{k}": v for k, v in (entities.get("tag") or {}).items()}
+    if entities.get("state"):
+        filters["instance-state-name"] = entities["state"]
+    if entities.get("instance_id"):
+        filters["instance-id"] = entities["instance_id"]
+    return filters
+
+
+def _ec2_filters(filters: dict) -> dict:
+    # {"instance-state-name": "running", "tag:env": ["prod"]} -> EC2 Filters
+    return {"Filters": [{"Name": k, "Values": v if isinstance(v, list) else [v]} for k, v in filters.items()]}
+
+
+def _instances(reservation: dict) -> List[dict]:
+    return [{
+        "InstanceId": inst.get("InstanceId"),
+        "State": inst.get("State", {}).get("Name"),
+        "Tags": inst.get("Tags", []),
+    } for inst in reservation.get("Instances", [])]
+
+
+class ListingSpec(NamedTuple):
+    service: str
+    operation: str
+    result_key: str
+    detail_key: str
+    items: Callable[[Any], List[Any]]
+    # caller filter name -> API parameter, or a builder that maps the whole dict
+    filters: Dict[str, str] = {}
+    filter_builder: Optional[Callable[[dict], dict]] = None
+    # parsed entities -> filters, merged under the caller's filters
+    entity_filters: Optional[Callable[[dict], dict]] = None
+    # global services list the same resources from every region
+    regional: bool = True
+
+
+LISTINGS: Dict[str, ListingSpec] = {
+    "list_s3_buckets": ListingSpec("s3", "list_buckets", "Buckets", "buckets",
+                                   lambda b: [b["Name"]], filters={"prefix": "Prefix"}, regional=False),
+    # EC2 pages by reservation, so `limit` counts reservations (usually one instance each)
+    "describe_ec2_instances": ListingSpec("ec2", "describe_instances", "Reservations", "instances",
+                                          _instances, filter_builder=_ec2_filters,
+                                          entity_filters=ec2_instance_filters),
+    "list_dynamodb_tables": ListingSpec("dynamodb", "list_tables", "TableNames", "tables", lambda t: [t]),
+    "list_iam_users": ListingSpec("iam", "list_users", "Users", "users",
+                                  lambda u: [u["UserName"]], filters={"path_prefix": "PathPrefix"},
+                                  regional=False),
+    "list_lambda_functions": ListingSpec("lambda", "list_functions", "Functions", "functions",
+                                         lambda f: [f["FunctionName"]]),
+    "list_sns_topics": ListingSpec("sns", "list_topics", "Topics", "topics", lambda t: [t["TopicArn"]]),
+    "list_sqs_queues": ListingSpec("sqs", "list_queues", "QueueUrls", "queues", lambda q: [q],
+                                   filters={"prefix": "QueueNamePrefix"}),
+    "list_cloudwatch_alarms": ListingSpec("cloudwatch", "describe_alarms", "MetricAlarms", "alarms",
+                                          lambda a: [{"AlarmName": a["AlarmName"], "State": a.get("StateValue")}],
+                                          filters={"prefix": "AlarmNamePrefix", "state": "StateValue"}),
+    "list_ecs_clusters": ListingSpec("ecs", "list_clusters", "clusterArns", "clusters", lambda c: [c]),
+    "list_glue_jobs": ListingSpec("glue", "list_jobs", "JobNames", "jobs", lambda j: [j]),
+}
+LISTINGS["list_ec2_instances"] = LISTINGS["describe_ec2_instances"]
+
+
+def _api_filters(spec: ListingSpec, filters: Optional[dict]) -> dict:
+    if not filters:
+        return {}
+    if spec.filter_builder:
+        return spec.filter_builder(filters)
+    unknown = set(filters) - set(spec.filters)
+    if unknown:
+        raise ValueError(f"Unsupported filters for {spec.operation}: {', '.join(sorted(unknown))}")
+    return {spec.filters[k]: v for k, v in filters.items()}
+
+
+class ResourceListing:
+    """One listing request; iterate once for items, then read `next_token`."""
+
+    def __init__(self, spec: ListingSpec, region: str, limit: Optional[int] = None,
+                 next_token: Optional[str] = None, filters: Optional[dict] = None):
+        self.spec = spec
+        self.region = region
+        self.limit = limit
+        self.starting_token = next_token
+        self.params = _api_filters(spec, filters)
+        self.next_token: Optional[str] = None
+
+    def __iter__(self) -> Iterator[Any]:
+        spec = self.spec
+        # resolved on first iteration, i.e. wherever the listing is consumed
+        client = get_client(spec.service, self.region)
+        if not client.can_paginate(spec.operation):
+            # single-shot API (e.g. ListBuckets on older botocore): bounded, no resume
+            page = getattr(client, spec.operation)(**self.params)
+            raw = page.get(spec.result_key, [])
+            for r in raw[:self.limit] if self.limit else raw:
+                yield from spec.items(r)
+            return
+        pages = client.get_paginator(spec.operation).paginate(
+            **self.params,
+            PaginationConfig={"MaxItems": self.limit, "StartingToken": self.starting_token},
+        )
+        for page in pages:
+            for r in page.get(spec.result_key, []):
+                yield from spec.items(r)
+        self.next_token = pages.resume_token
+
+
+def iter_resources(intent: str, entities: dict, limit: Optional[int] = None,
+                   next_token: Optional[str] = None, filters: Optional[dict] = None) -> ResourceListing:
+    spec = LISTINGS.get(intent)
+    if spec is None:
+        raise ValueError(f"'{intent}' is not a listing intent")
+    region = entities.get("region") or DEFAULT_REGION
+    if spec.entity_filters:
+        filters = {**spec.entity_filters(entities), **(filters or {})}
+    return ResourceListing(spec, region, limit, next_token, filters)
@@ -1,153 +1,471 @@
-# src/core/validator.py
-import boto3
-import botocore
+# src/core/aws_validator.py
+import asyncio
+import copy
+import json
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import TYPE_CHECKING, Callable, Dict, List, NamedTuple, Optional, Tuple
+
 from loguru import logger
 # Use root-level package import when `src` is on PYTHONPATH
-from config.settings import DEFAULT_REGION
+from config.settings import CONFIG, DEFAULT_REGION
+from core.aws_clients import get_client
+from core.aws_listings import DEFAULT_LIST_LIMIT, LISTINGS, iter_resources
+from core.intent_registry import REGISTRY
+from core.cache import cache_config, create_cache, make_key
+from core.exceptions import StageTimeout
+from core.execution import get_stage
+from core.inventory import INDEXES, get_inventory
+from core.metrics import STAGE_SECONDS
+
+if TYPE_CHECKING:
+    from botocore.exceptions import ClientError
+
+# Short-lived cache of validation outcomes (VALIDATION_CACHE_ENABLED=false to disable).
+# Listings go stale quickly, so they get a shorter TTL than existence checks.
+# Shared backends are namespaced per credentials profile so accounts never read each other's results.
+_validation_cache = create_cache("validation", "VALIDATION_CACHE_ENABLED", default_size=1024, default_ttl=None,
+                                 namespace=os.getenv("VALIDATION_CACHE_NAMESPACE") or os.getenv("AWS_PROFILE")
+                                 or "default")
+_cache_cfg = cache_config("validation")
+LIST_TTL = float(os.getenv("VALIDATION_CACHE_TTL_LIST", _cache_cfg.get("list_ttl_seconds", 30)))
+CHECK_TTL = float(os.getenv("VALIDATION_CACHE_TTL_CHECK", _cache_cfg.get("check_ttl_seconds", 300)))
+# per-intent overrides, e.g. VALIDATION_CACHE_TTLS='{"invoke_lambda": 60}'
+INTENT_TTLS = {**_cache_cfg.get("intent_ttl_seconds", {}), **json.loads(os.getenv("VALIDATION_CACHE_TTLS") or "{}")}
+_CACHEABLE_STATUSES = ("valid", "invalid")
+
+# multi-region listings ("in all regions" / "in us-east-1 and eu-west-1")
+_fanout_cfg = CONFIG.get("fanout", {})
+FANOUT_REGIONS = [r.strip() for r in os.getenv("FANOUT_REGIONS", "").split(",") if r.strip()] \
+    or _fanout_cfg.get("regions", [DEFAULT_REGION])
+FANOUT_WORKERS = int(os.getenv("FANOUT_WORKERS", _fanout_cfg.get("workers", 8)))
+FANOUT_TIMEOUT = float(os.getenv("FANOUT_TIMEOUT", _fanout_cfg.get("timeout_seconds", 6)))
+# separate from the validation stage: fan-out runs inside a validation worker
+_fanout_pool: Optional[ThreadPoolExecutor] = None
+
+def validation_ttl(intent: str) -> float:
+    if intent in INTENT_TTLS:
+        return float(INTENT_TTLS[intent])
+    if intent.startswith(("list_", "describe_")):
+        return LIST_TTL
+    return CHECK_TTL
 
 def _session_client(service: str, region: str):
-    sess = boto3.Session()
-    return sess.client(service, region_name=region)
+    # pooled per (service, region, profile); see core.aws_clients
+    return get_client(service, region)
+
+def _cache_key(intent: str, entities: dict, *listing) -> str:
+    return make_key(intent, entities, entities.get("region") or DEFAULT_REGION, *listing)
+
+def _cached(key: str):
+    if _validation_cache is None:
+        return None
+    hit = _validation_cache.get(key)
+    return copy.deepcopy(hit) if hit is not None else None
+
+def _remember(key: str, intent: str, result: dict) -> dict:
+    # a fan-out with failed regions is retried rather than served from cache
+    if _validation_cache is not None and result.get("status") in _CACHEABLE_STATUSES \
+            and not result["detail"].get("partial"):
+        _validation_cache.set(key, copy.deepcopy(result), ttl=validation_ttl(intent))
+    return result
+
+def validate_command_safe(intent: str, entities: dict, limit: Optional[int] = None,
+                          next_token: Optional[str] = None, filters: Optional[dict] = None) -> dict:
+    """Check `intent` against the account.
+
+    For list intents `limit`, `next_token` and `filters` bound the listing (see
+    core.aws_listings); `detail["next_token"]` continues a truncated one.
+    """
+    with STAGE_SECONDS.time("validate"):
+        key = _cache_key(intent, entities, limit, next_token, filters)
+        hit = _cached(key)
+        if hit is not None:
+            return hit
+        return _remember(key, intent, _validate(intent, entities, limit, next_token, filters))
 
-def validate_command_safe(intent: str, entities: dict) -> dict:
+async def validate_command_safe_async(intent: str, entities: dict, limit: Optional[int] = None,
+                                      next_token: Optional[str] = None, filters: Optional[dict] = None) -> dict:
+    """validate_command_safe for coroutines: boto3 calls run on the bounded
+    `validation` stage, and a call over its timeout reports status "unknown"."""
+    with STAGE_SECONDS.time("validate"):
+        key = _cache_key(intent, entities, limit, next_token, filters)
+        hit = _cached(key)
+        if hit is not None:
+            return hit
+        try:
+            result = await get_stage("validation").run(_validate, intent, entities, limit, next_token, filters)
+        except StageTimeout as e:
+            return _timed_out({"intent": intent, "entities": entities}, e)
+        return _remember(key, intent, result)
+
+def _validate(intent: str, entities: dict, limit: Optional[int] = None,
+              next_token: Optional[str] = None, filters: Optional[dict] = None) -> dict:
     region = entities.get("region") or DEFAULT_REGION
     result = {"intent": intent, "region": region, "status": "unknown", "reason": None, "detail": {}}
 
     try:
-        if intent == "create_s3_bucket":
-            s3 = _session_client("s3", region)
-            bucket = entities.get("bucket")
-            if not bucket:
-                result.update(status="unknown", reason="No bucket name provided.")
-                return result
+        if intent in LISTINGS and entities.get("regions") and LISTINGS[intent].regional:
+            return _validate_regions(intent, entities, _fanout_targets(entities["regions"]), limit, filters)
+
+        if intent in LISTINGS:
             try:
-                s3.head_bucket(Bucket=bucket)
-                result.update(status="invalid", reason=f"Bucket '{bucket}' already exists.")
-            except botocore.exceptions.ClientError as e:
-                err = e.response.get("Error", {}).get("Code", "")
-                if err in ("404", "NoSuchBucket", "NotFound"):
-                    result.update(status="valid", reason="Bucket name available.")
-                else:
-                    result.update(status="invalid", reason=f"{err}")
+                listing = iter_resources(intent, entities, limit=limit or DEFAULT_LIST_LIMIT,
+                                         next_token=next_token, filters=filters)
+            except ValueError as e:
+                result.update(status="unknown", reason=str(e))
+                return result
+            key = listing.spec.detail_key
+            items = list(listing)
+            result.update(status="valid", reason=f"Listed {key}",
+                          detail={key: items, "next_token": listing.next_token})
             return result
 
-        if intent == "list_s3_buckets":
-            s3 = _session_client("s3", region)
-            buckets = [b["Name"] for b in s3.list_buckets().get("Buckets", [])]
-            result.update(status="valid", reason="Listed buckets", detail={"buckets": buckets})
+        spec = REGISTRY.get(intent)
+        check = _CHECKS.get(intent)
+        if spec is None or check is None:
+            result.update(status="unsupported", reason="Validation not implemented for this intent")
             return result
+        for name in spec.required:
+            if not entities.get(name):
+                result.update(status="unknown", reason=f"No {_ENTITY_LABELS.get(name, name)} provided.")
+                return result
+        if _from_inventory(intent, entities, region, result):
+            return result
+        check(_session_client(spec.service, region), entities, result)
+        return result
 
-        if intent in ("describe_ec2_instances", "list_ec2_instances"):
-            ec2 = _session_client("ec2", region)
-            reservations = ec2.describe_instances().get("Reservations", [])
-            instances = []
-            for r in reservations:
-                for inst in r.get("Instances", []):
-                    instances.append({
-                        "InstanceId": inst.get("InstanceId"),
-                        "State": inst.get("State", {}).get("Name"),
-                        "Tags": inst.get("Tags", [])
-                    })
-            result.update(status="valid", reason="Listed instances", detail={"instances": instances})
+    except Exception as e:
+        if _no_credentials(e):
+            result.update(status="unknown", reason="AWS credentials not configured.")
             return result
+        logger.exception("Validation error: {}", e)
+        result.update(status="error", reason=str(e))
+        return result
 
-        if intent in ("create_dynamodb_table", "list_dynamodb_tables"):
-            dynamodb = _session_client("dynamodb", region)
-            if intent == "list_dynamodb_tables":
-                tables = dynamodb.list_tables().get("TableNames", [])
-                result.update(status="valid", reason="Listed tables", detail={"tables": tables})
-                return result
-            table = entities.get("table")
-            if not table:
-                result.update(status="unknown", reason="No table name provided.")
-                return result
-            tables = dynamodb.list_tables().get("TableNames", [])
-            if table in tables:
-                result.update(status="invalid", reason=f"Table '{table}' already exists.")
+def _no_credentials(e: Exception) -> bool:
+    # botocore is imported lazily; an exception from it means it is loaded already
+    from botocore.exceptions import NoCredentialsError
+    return isinstance(e, NoCredentialsError)
+
+def _error_code(e: "ClientError") -> str:
+    return e.response.get("Error", {}).get("Code", "")
+
+def _check_bucket(s3, entities: dict, result: dict):
+    bucket = entities["bucket"]
+    try:
+        s3.head_bucket(Bucket=bucket)
+        result.update(status="invalid", reason=f"Bucket '{bucket}' already exists.")
+    except s3.exceptions.ClientError as e:
+        err = _error_code(e)
+        if err in ("404", "NoSuchBucket", "NotFound"):
+            result.update(status="valid", reason="Bucket name available.")
+        else:
+            result.update(status="invalid", reason=f"{err}")
+
+def _check_table(dynamodb, entities: dict, result: dict):
+    table = entities["table"]
+    # a direct lookup instead of scanning (the first page of) list_tables
+    try:
+        dynamodb.describe_table(TableName=table)
+        result.update(status="invalid", reason=f"Table '{table}' already exists.")
+    except dynamodb.exceptions.ClientError as e:
+        if _error_code(e) == "ResourceNotFoundException":
+            result.update(status="valid", reason="Table name available.")
+        else:
+            result.update(status="error", reason=str(e))
+
+def _check_instance(ec2, entities: dict, result: dict):
+    iid = entities["instance_id"]
+    try:
+        resp = ec2.describe_instances(InstanceIds=[iid]).get("Reservations", [])
+        if resp:
+            # get current state
+            state = resp[0]["Instances"][0].get("State", {}).get("Name")
+            result.update(status="valid", reason=f"Instance {iid} exists and is {state}", detail={"state": state})
+        else:
+            result.update(status="invalid", reason=f"Instance {iid} not found.")
+    except ec2.exceptions.ClientError as e:
+        result.update(status="error", reason=str(e))
+
+def _check_user(iam, entities: dict, result: dict):
+    user = entities["user"]
+    try:
+        iam.get_user(UserName=user)
+        result.update(status="invalid", reason=f"User '{user}' already exists.")
+    except iam.exceptions.ClientError as e:
+        if _error_code(e) in ("NoSuchEntity", "NoSuchEntityException"):
+            result.update(status="valid", reason="User does not exist; name available.")
+        else:
+            result.update(status="error", reason=str(e))
+
+def _check_function(lam, entities: dict, result: dict):
+    fn = entities["function"]
+    try:
+        lam.get_function(FunctionName=fn)
+        result.update(status="valid", reason=f"Function '{fn}' exists.")
+    except lam.exceptions.ClientError as e:
+        if _error_code(e) in ("ResourceNotFoundException", "ResourceNotFound"):
+            result.update(status="invalid", reason=f"Function '{fn}' not found.")
+        else:
+            result.update(status="error", reason=str(e))
+
+def _check_queue(sqs, entities: dict, result: dict):
+    queue = entities["queue"]
+    try:
+        sqs.get_queue_url(QueueName=queue)
+        result.update(status="invalid", reason=f"Queue '{queue}' already exists.")
+    except sqs.exceptions.ClientError as e:
+        if _error_code(e) in ("AWS.SimpleQueueService.NonExistentQueue", "QueueDoesNotExist"):
+            result.update(status="valid", reason="Queue name available.")
+        else:
+            result.update(status="error", reason=str(e))
+
+# existence checks per intent; clients come from the intent's registry service
+_CHECKS = {
+    "create_s3_bucket": _check_bucket,
+    "create_dynamodb_table": _check_table,
+    "start_ec2_instance": _check_instance,
+    "stop_ec2_instance": _check_instance,
+    "create_iam_user": _check_user,
+    "invoke_lambda": _check_function,
+    "create_sqs_queue": _check_queue,
+}
+_ENTITY_LABELS = {"bucket": "bucket name", "table": "table name", "instance_id": "instance id",
+                  "function": "function name", "queue": "queue name"}
+
+class _Membership(NamedTuple):
+    listing: str
+    entity: str
+    name: Callable[[str], str]  # listed item -> resource name
+    present: Tuple[str, str]    # (status, reason) when the name is listed
+    absent: Optional[Tuple[str, str]]  # None: not being listed proves nothing
+
+# existence checks that one listing of the service can answer for a whole batch
+_MEMBERSHIP = {
+    "create_dynamodb_table": _Membership("list_dynamodb_tables", "table", str,
+                                         ("invalid", "Table '{}' already exists."), ("valid", "Table name available.")),
+    "create_iam_user": _Membership("list_iam_users", "user", str, ("invalid", "User '{}' already exists."),
+                                   ("valid", "User does not exist; name available.")),
+    "invoke_lambda": _Membership("list_lambda_functions", "function", str, ("valid", "Function '{}' exists."),
+                                 ("invalid", "Function '{}' not found.")),
+    "create_sqs_queue": _Membership("list_sqs_queues", "queue", lambda url: url.rsplit("/", 1)[-1],
+                                    ("invalid", "Queue '{}' already exists."), ("valid", "Queue name available.")),
+}
+_SHARED_LISTINGS = {m.listing for m in _MEMBERSHIP.values()}
+
+# existence checks the inventory (core.inventory) can answer. Only a listed name
+# is trusted: the index can be up to a refresh interval behind, bucket names are
+# global, and a resource created since the last listing isn't in it yet, so a
+# miss always goes to the API.
+_INSTANCE_FOUND = ("valid", "Instance {} exists and is {}")
+_INVENTORY_CHECKS = {
+    **{intent: m._replace(absent=None) for intent, m in _MEMBERSHIP.items() if m.listing in INDEXES},
+    "create_s3_bucket": _Membership("list_s3_buckets", "bucket", str, ("invalid", "Bucket '{}' already exists."),
+                                    None),
+    "start_ec2_instance": _Membership("describe_ec2_instances", "instance_id", str, _INSTANCE_FOUND, None),
+    "stop_ec2_instance": _Membership("describe_ec2_instances", "instance_id", str, _INSTANCE_FOUND, None),
+}
+
+def _from_inventory(intent: str, entities: dict, region: str, result: dict) -> bool:
+    """Answer an existence check from the inventory index; False means probe the API."""
+    inventory = get_inventory()
+    check = _INVENTORY_CHECKS.get(intent)
+    if inventory is None or check is None:
+        return False
+    name = entities[check.entity]
+    if ":" in name:
+        return False
+    hit = inventory.lookup(check.listing, region, name)
+    if hit is None or not hit.found:
+        return False
+    status, reason = check.present
+    detail = {"source": "inventory", "inventory_age_seconds": round(hit.age, 1)}
+    if hit.value is not None:
+        detail["state"] = hit.value
+    result.update(status=status, reason=reason.format(name, hit.value), detail=detail)
+    return True
+
+def _shared_listing(req: dict) -> Optional[Tuple[str, Optional[str]]]:
+    """(listing intent, region) whose full listing answers `req`, if any."""
+    intent, entities = req["intent"], req["entities"]
+    if entities.get("regions") or (intent in _INVENTORY_CHECKS and get_inventory() is not None):
+        # the inventory answers those; a name it has not listed is probed directly
+        return None
+    membership = _MEMBERSHIP.get(intent)
+    if membership:
+        name = entities.get(membership.entity)
+        # ARNs and other qualified names don't compare against listed names
+        if not name or ":" in name:
+            return None
+        listing = membership.listing
+    elif intent in _SHARED_LISTINGS and not (req.get("limit") or req.get("next_token") or req.get("filters")):
+        listing = intent
+    else:
+        return None
+    region = entities.get("region") or DEFAULT_REGION
+    return listing, region if LISTINGS[listing].regional else None
+
+def _validate_shared(listing: str, region: Optional[str], reqs: Dict[str, dict]) -> Dict[str, dict]:
+    """Answer every request in `reqs` (cache key -> request) from one listing."""
+    listed = _validate(listing, {"region": region})
+    detail_key = LISTINGS[listing].detail_key
+    ok = listed["status"] == "valid"
+    complete = ok and listed["detail"].get("next_token") is None
+    out = {}
+    for key, req in reqs.items():
+        intent, entities = req["intent"], req["entities"]
+        req_region = entities.get("region") or DEFAULT_REGION
+        if intent == listing:
+            out[key] = {**copy.deepcopy(listed), "region": req_region}
+            continue
+        membership = _MEMBERSHIP[intent]
+        name = entities[membership.entity]
+        names = {membership.name(i) for i in listed["detail"].get(detail_key, [])} if ok else set()
+        if name in names:
+            status, reason = membership.present
+        elif complete:
+            status, reason = membership.absent
+        else:
+            # listing failed or was truncated: fall back to the direct check
+            out[key] = _validate(intent, entities)
+            continue
+        out[key] = {"intent": intent, "region": req_region, "status": status,
+                    "reason": reason.format(name), "detail": {}}
+    return out
+
+async def validate_batch_async(requests: List[dict]) -> List[dict]:
+    """Validate many requests (dicts with `intent`, `entities` and optional
+    `limit` / `next_token` / `filters`); results come back in input order.
+
+    Identical requests are validated once. Requests that one listing can answer
+    (existence checks plus plain list requests for the same service and region)
+    share a single listing call when there are two or more of them; everything
+    else runs as an individual validation. All work goes through the
+    `validation` stage, so its concurrency limit and timeout apply per call.
+    """
+    with STAGE_SECONDS.time("validate_batch"):
+        keys = [_cache_key(r["intent"], r["entities"], r.get("limit"), r.get("next_token"), r.get("filters"))
+                for r in requests]
+        results: Dict[str, dict] = {}
+        pending: Dict[str, dict] = {}
+        for key, req in zip(keys, requests):
+            if key in results or key in pending:
+                continue
+            hit = _cached(key)
+            if hit is not None:
+                results[key] = hit
             else:
-                result.update(status="valid", reason="Table name available.")
-            return result
+                pending[key] = req
 
-        if intent in ("start_ec2_instance", "stop_ec2_instance", "list_ec2_instances"):
-            ec2 = _session_client("ec2", region)
-            if intent == "list_ec2_instances":
-                # return basic instance id + state + tags
-                reservations = ec2.describe_instances().get("Reservations", [])
-                instances = []
-                for r in reservations:
-                    for inst in r.get("Instances", []):
-                        instances.append({
-                            "InstanceId": inst.get("InstanceId"),
-                            "State": inst.get("State", {}).get("Name"),
-                            "Tags": inst.get("Tags", [])
-                        })
-                result.update(status="valid", reason="Listed instances", detail={"instances": instances})
-                return result
-            iid = entities.get("instance_id")
-            if not iid:
-                result.update(status="unknown", reason="No instance id provided.")
-                return result
-            try:
-                resp = ec2.describe_instances(InstanceIds=[iid]).get("Reservations", [])
-                if resp:
-                    # get current state
-                    state = resp[0]["Instances"][0].get("State", {}).get("Name")
-                    result.update(status="valid", reason=f"Instance {iid} exists and is {state}", detail={"state": state})
-                else:
-                    result.update(status="invalid", reason=f"Instance {iid} not found.")
-            except botocore.exceptions.ClientError as e:
-                result.update(status="error", reason=str(e))
-            return result
+        groups: Dict[Tuple[str, Optional[str]], Dict[str, dict]] = {}
+        direct: Dict[str, dict] = {}
+        for key, req in pending.items():
+            target = _shared_listing(req)
+            if target is None:
+                direct[key] = req
+            else:
+                groups.setdefault(target, {})[key] = req
+        for target in [t for t, reqs in groups.items() if len(reqs) < 2]:
+            direct.update(groups.pop(target))
 
-        if intent in ("create_iam_user", "list_iam_users"):
-            iam = _session_client("iam", region)
-            if intent == "list_iam_users":
-                users = iam.list_users().get("Users", [])
-                result.update(status="valid", reason="Listed users", detail={"users": [u["UserName"] for u in users]})
-                return result
-            user = entities.get("user")
-            if not user:
-                result.update(status="unknown", reason="No user provided.")
-                return result
+        stage = get_stage("validation")
+
+        async def run_direct(key: str, req: dict):
             try:
-                iam.get_user(UserName=user)
-                result.update(status="invalid", reason=f"User '{user}' already exists.")
-            except botocore.exceptions.ClientError as e:
-                code = e.response.get("Error", {}).get("Code", "")
-                if code in ("NoSuchEntity", "NoSuchEntityException"):
-                    result.update(status="valid", reason="User does not exist; name available.")
-                else:
-                    result.update(status="error", reason=str(e))
-            return result
+                return {key: await stage.run(_validate, req["intent"], req["entities"], req.get("limit"),
+                                             req.get("next_token"), req.get("filters"))}
+            except StageTimeout as e:
+                return {key: _timed_out(req, e)}
 
-        if intent in ("invoke_lambda", "list_lambda_functions"):
-            lam = _session_client("lambda", region)
-            if intent == "list_lambda_functions":
-                funcs = lam.list_functions().get("Functions", [])
-                result.update(status="valid", reason="Listed functions", detail={"functions": [f["FunctionName"] for f in funcs]})
-                return result
-            fn = entities.get("function")
-            if not fn:
-                result.update(status="unknown", reason="No function name provided.")
-                return result
+        async def run_group(target, reqs: Dict[str, dict]):
             try:
-                lam.get_function(FunctionName=fn)
-                result.update(status="valid", reason=f"Function '{fn}' exists.")
-            except botocore.exceptions.ClientError as e:
-                code = e.response.get("Error", {}).get("Code", "")
-                if code in ("ResourceNotFoundException", "ResourceNotFound"):
-                    result.update(status="invalid", reason=f"Function '{fn}' not found.")
-                else:
-                    result.update(status="error", reason=str(e))
-            return result
-        # ... (as in phase-2.5 validator)
-        result.update(status="unsupported", reason="Validation not implemented for this intent")
-        return result
+                return await stage.run(_validate_shared, target[0], target[1], reqs)
+            except StageTimeout as e:
+                return {key: _timed_out(req, e) for key, req in reqs.items()}
 
-    except botocore.exceptions.NoCredentialsError:
-        result.update(status="unknown", reason="AWS credentials not configured.")
-        return result
-    except Exception as e:
-        logger.exception("Validation error: %s", e)
-        result.update(status="error", reason=str(e))
-        return result
+        outcomes = await asyncio.gather(*(run_direct(k, r) for k, r in direct.items()),
+                                        *(run_group(t, reqs) for t, reqs in groups.items()))
+        for outcome in outcomes:
+            for key, result in outcome.items():
+                # timeouts come back uncached: _remember only keeps valid / invalid
+                results[key] = _remember(key, pending[key]["intent"], result)
+        return [copy.deepcopy(results[k]) for k in keys]
+
+def _timed_out(req: dict, e: StageTimeout) -> dict:
+    region = req["entities"].get("region") or DEFAULT_REGION
+    return {"intent": req["intent"], "region": region, "status": "unknown", "reason": str(e), "detail": {}}
+
+def _fanout_targets(regions) -> List[str]:
+    return list(FANOUT_REGIONS) if regions == "all" else list(dict.fromkeys(regions))
+
+def _list_region(intent: str, entities: dict, region: str, limit: Optional[int], filters: Optional[dict]) -> dict:
+    listing = iter_resources(intent, {**entities, "region": region}, limit=limit, filters=filters)
+    return {"items": list(listing), "next_token": listing.next_token}
+
+def _validate_regions(intent: str, entities: dict, regions: List[str], limit: Optional[int] = None,
+                      filters: Optional[dict] = None) -> dict:
+    """Run one listing per region concurrently and merge them.
+
+    Items are tagged with their "Region"; `detail.regions` lists the regions and
+    `detail.region_status` has a per-region status. Regions that failed, took
+    longer than FANOUT_TIMEOUT from their own start, or never got a fan-out
+    worker only mark the result `partial` instead of failing it. Resume tokens
+    are per region. `region` is the comma-joined list, a string like any result's.
+    """
+    global _fanout_pool
+    if _fanout_pool is None:
+        _fanout_pool = ThreadPoolExecutor(max_workers=FANOUT_WORKERS, thread_name_prefix="fanout")
+    result = {"intent": intent, "region": ",".join(regions), "status": "unknown", "reason": None, "detail": {}}
+    key = LISTINGS[intent].detail_key
+    started: Dict[str, float] = {}
+
+    def list_region(region: str) -> dict:
+        started[region] = time.monotonic()
+        return _list_region(intent, entities, region, limit or DEFAULT_LIST_LIMIT, filters)
+
+    futures = {_fanout_pool.submit(list_region, r): r for r in regions}
+    # queued regions wait for a worker; give up on them once every wave could have used its full timeout
+    waves = -(-len(regions) // FANOUT_WORKERS)
+    give_up = time.monotonic() + FANOUT_TIMEOUT * waves
+    pending = set(futures)
+    while pending:
+        now = time.monotonic()
+        deadlines = [started[futures[f]] + FANOUT_TIMEOUT for f in pending if futures[f] in started]
+        pending = {f for f in pending if futures[f] not in started or now < started[futures[f]] + FANOUT_TIMEOUT}
+        if not pending or now >= give_up:
+            break
+        next_deadline = min([d for d in deadlines if d > now] + [give_up])
+        _, pending = wait(pending, timeout=next_deadline - now, return_when=FIRST_COMPLETED)
+
+    merged, per_region = [], {}
+    for fut, region in futures.items():
+        # a running listing can't be stopped; it finishes on its worker and is dropped
+        if not fut.done() and (region in started or not fut.cancel()):
+            per_region[region] = {"status": "timeout", "reason": f"No response within {FANOUT_TIMEOUT:g}s"}
+            continue
+        if fut.cancelled():
+            per_region[region] = {"status": "skipped",
+                                  "reason": f"Not started: all {FANOUT_WORKERS} fan-out workers were busy"}
+            continue
+        try:
+            listed = fut.result()
+        except Exception as e:
+            if _no_credentials(e):
+                per_region[region] = {"status": "unknown", "reason": "AWS credentials not configured."}
+            else:
+                per_region[region] = {"status": "error", "reason": str(e)}
+            continue
+        merged.extend({**i, "Region": region} if isinstance(i, dict) else {"Name": i, "Region": region}
+                      for i in listed["items"])
+        per_region[region] = {"status": "ok", "count": len(listed["items"]), "next_token": listed["next_token"]}
+
+    failed = [r for r, v in per_region.items() if v["status"] != "ok"]
+    detail = {key: merged, "regions": list(regions), "region_status": per_region, "partial": bool(failed)}
+    if len(failed) == len(regions):
+        result.update(status="error", reason=f"Listing failed in all {len(regions)} regions", detail=detail)
+    else:
+        reason = f"Listed {key} in {len(regions) - len(failed)}/{len(regions)} regions"
+        result.update(status="valid", reason=reason, detail=detail)
+    return result
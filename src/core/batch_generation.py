@@ -0,0 +1,50 @@
+# src/core/batch_generation.py
+"""Many queries per call: the shared implementation behind the
+`generate_aws_cli_batch` MCP tool and `POST /generate/batch`.
+
+Queries are classified together (core.nlp_utils.parse_nlp_batch_async) and
+validated together (core.aws_validator.validate_batch_async), so a batch costs
+one model call and one listing per (service, region) rather than one of each
+per query. Results come back in input order, one per query; a query that fails
+gets an `error` entry instead of failing the batch.
+"""
+import os
+from typing import List, Optional
+
+from loguru import logger
+
+from config.settings import CONFIG
+from core.aws_validator import validate_batch_async
+from core.command_generator import generate_command
+from core.metrics import STAGE_SECONDS
+from core.nlp_utils import parse_nlp_batch_async
+
+MAX_BATCH_QUERIES = int(os.getenv("BATCH_MAX_QUERIES", CONFIG.get("batch", {}).get("max_queries", 50)))
+
+
+async def generate_batch(queries: List[str], limit: Optional[int] = None,
+                         filters: Optional[dict] = None) -> List[dict]:
+    """`limit` and `filters` apply to every list intent in the batch."""
+    if not queries:
+        raise ValueError("queries must not be empty")
+    if len(queries) > MAX_BATCH_QUERIES:
+        raise ValueError(f"at most {MAX_BATCH_QUERIES} queries per batch, got {len(queries)}")
+
+    with STAGE_SECONDS.time("request_batch"):
+        parsed = await parse_nlp_batch_async(queries)
+        items, requests = [], []
+        for query, (intent, entities) in zip(queries, parsed):
+            try:
+                command, explanation = generate_command(intent, entities, limit)
+            except Exception as e:
+                logger.exception("Command generation failed for batch item: {}", e)
+                items.append({"query": query, "intent": intent, "error": str(e)})
+                continue
+            items.append({"query": query, "intent": intent, "command": command, "explanation": explanation})
+            requests.append({"intent": intent, "entities": entities, "limit": limit, "filters": filters})
+
+        validations = iter(await validate_batch_async(requests)) if requests else iter(())
+        for item in items:
+            if "error" not in item:
+                item["validation"] = next(validations)
+        return items
@@ -0,0 +1,123 @@
+# src/core/batching.py
+"""Async micro-batching for model calls.
+
+Concurrent callers `await batcher.submit(item)`; items are collected for up to
+`max_wait_ms` (or until `max_batch_size` is reached) and handed to `batch_fn`
+as one list. `batch_fn` runs off the event loop and must return one result per
+input, in order.
+"""
+import asyncio
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from loguru import logger
+
+
+class MicroBatcher:
+    def __init__(self, batch_fn: Callable[[List[Any]], List[Any]], max_batch_size: int = 16,
+                 max_wait_ms: float = 5.0, name: str = "batcher", executor=None):
+        self.batch_fn = batch_fn
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait = max(0.0, float(max_wait_ms)) / 1000.0
+        self.name = name
+        self.executor = executor
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._stats = {
+            "batches": 0,
+            "items": 0,
+            "max_batch_size_seen": 0,
+            "queue_wait_ms_total": 0.0,
+            "batch_latency_ms_total": 0.0,
+            "batch_latency_ms_max": 0.0,
+            "errors": 0,
+        }
+        self._size_histogram: Dict[int, int] = {}
+
+    def _ensure_worker(self, loop: asyncio.AbstractEventLoop):
+        # queues/tasks are bound to a loop; rebuild if we are called from a new one
+        if self._loop is not loop or self._worker is None or self._worker.done():
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._worker = loop.create_task(self._run())
+
+    async def submit(self, item: Any) -> Any:
+        loop = asyncio.get_running_loop()
+        self._ensure_worker(loop)
+        fut = loop.create_future()
+        self._queue.put_nowait((item, fut, time.perf_counter()))
+        return await fut
+
+    async def _collect(self) -> list:
+        queue = self._queue
+        batch = [await queue.get()]
+        deadline = self._loop.time() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            if not queue.empty():
+                batch.append(queue.get_nowait())
+                continue
+            timeout = deadline - self._loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self):
+        while True:
+            batch = await self._collect()
+            await self._dispatch(batch)
+
+    async def _dispatch(self, batch: list):
+        items = [b[0] for b in batch]
+        started = time.perf_counter()
+        try:
+            results = await self._loop.run_in_executor(self.executor, self.batch_fn, items)
+            if len(results) != len(items):
+                raise RuntimeError(f"{self.name}: batch_fn returned {len(results)} results for {len(items)} items")
+        except Exception as e:
+            logger.exception("{}: batch of {} failed: {}", self.name, len(items), e)
+            self._stats["errors"] += 1
+            for _, fut, _ in batch:
+                if not fut.done():
+                    fut.set_exception(e)
+            return
+        finally:
+            self._record(batch, started)
+
+        for (_, fut, _), res in zip(batch, results):
+            if not fut.done():
+                fut.set_result(res)
+
+    def _record(self, batch: list, started: float):
+        now = time.perf_counter()
+        latency_ms = (now - started) * 1000.0
+        s = self._stats
+        s["batches"] += 1
+        s["items"] += len(batch)
+        s["max_batch_size_seen"] = max(s["max_batch_size_seen"], len(batch))
+        s["queue_wait_ms_total"] += sum((started - enq) * 1000.0 for _, _, enq in batch)
+        s["batch_latency_ms_total"] += latency_ms
+        s["batch_latency_ms_max"] = max(s["batch_latency_ms_max"], latency_ms)
+        self._size_histogram[len(batch)] = self._size_histogram.get(len(batch), 0) + 1
+
+    def stats(self) -> dict:
+        s = dict(self._stats)
+        batches, items = s["batches"], s["items"]
+        return {
+            "name": self.name,
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000.0,
+            "batches": batches,
+            "items": items,
+            "errors": s["errors"],
+            "avg_batch_size": round(items / batches, 2) if batches else 0.0,
+            "max_batch_size_seen": s["max_batch_size_seen"],
+            "avg_queue_wait_ms": round(s["queue_wait_ms_total"] / items, 3) if items else 0.0,
+            "avg_batch_latency_ms": round(s["batch_latency_ms_total"] / batches, 3) if batches else 0.0,
+            "max_batch_latency_ms": round(s["batch_latency_ms_max"], 3),
+            "batch_size_histogram": dict(sorted(self._size_histogram.items())),
+        }
@@ -0,0 +1,295 @@
+# src/core/cache.py
+"""Result caches with per-entry TTL and pluggable backends.
+
+- `memory` (default): bounded in-process LRU (`TTLCache`).
+- `sqlite`: a file shared by every worker on the host (`SqliteCache`).
+- `redis`: any Redis-protocol server, shared across hosts and Lambda
+  containers (`RedisCache`; redis-server, fakeredis, ElastiCache ...).
+
+The backend is chosen per cache (`cache.<name>.backend`, env
+`<NAME>_CACHE_BACKEND`, falling back to `CACHE_BACKEND`). Shared backends store
+JSON and prefix every key with the cache name and a caller-supplied namespace
+(e.g. NLP mode + model version), so incompatible deployments never read each
+other's entries. A backend error counts as a miss; caching never fails a request.
+
+Caches register themselves by name so their hit/miss counters can be reported
+together (see `cache_stats`, surfaced by the health_check tool and /metrics).
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from loguru import logger
+
+from config.settings import CONFIG
+
+
+def _env_flag(name: str, default: bool) -> bool:
+    v = os.getenv(name)
+    if v is None:
+        return default
+    return v.lower() in ("1", "true", "yes")
+
+
+def cache_config(section: str) -> dict:
+    """`cache.<section>` from defaults.json (empty dict if absent)."""
+    return dict(CONFIG.get("cache", {}).get(section, {}))
+
+
+def make_key(*parts: Any) -> str:
+    return json.dumps(parts, sort_keys=True, separators=(",", ":"), default=str)
+
+
+class TTLCache:
+    backend = "memory"
+
+    def __init__(self, name: str, maxsize: int = 1024, ttl: Optional[float] = None):
+        self.name = name
+        self.maxsize = max(1, int(maxsize))
+        self.ttl = ttl
+        self._data: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.evictions = self.expirations = 0
+
+    def get(self, key: str) -> Any:
+        now = time.monotonic()
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                self.misses += 1
+                return None
+            value, expires = item
+            if expires is not None and expires <= now:
+                del self._data[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        ttl = self.ttl if ttl is None else ttl
+        if ttl is not None and ttl <= 0:
+            return
+        expires = time.monotonic() + ttl if ttl is not None else None
+        with self._lock:
+            self._data[key] = (value, expires)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "backend": self.backend,
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+
+class _SharedCache:
+    """JSON-serialized entries under "<prefix><name>:<namespace>:<key>"."""
+
+    backend = "shared"
+
+    def __init__(self, name: str, namespace: str = "", ttl: Optional[float] = None, prefix: str = "mcp:"):
+        self.name = name
+        self.ttl = ttl
+        self.prefix = f"{prefix}{name}:{namespace}:"
+        self.hits = self.misses = self.errors = 0
+
+    def _load(self, key: str) -> Optional[str]:
+        raise NotImplementedError
+
+    def _store(self, key: str, raw: str, ttl: Optional[float]):
+        raise NotImplementedError
+
+    def get(self, key: str) -> Any:
+        try:
+            raw = self._load(self.prefix + key)
+        except Exception as e:
+            self._error("get", e)
+            raw = None
+        if raw is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return json.loads(raw)
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        ttl = self.ttl if ttl is None else ttl
+        if ttl is not None and ttl <= 0:
+            return
+        try:
+            self._store(self.prefix + key, json.dumps(value, default=str), ttl)
+        except Exception as e:
+            self._error("set", e)
+
+    def _error(self, op: str, e: Exception):
+        self.errors += 1
+        if self.errors == 1 or self.errors % 100 == 0:
+            logger.warning("{} cache ({}) {} failed ({} errors so far): {}", self.name, self.backend, op,
+                           self.errors, e)
+
+    def _size(self) -> Optional[int]:
+        return None
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "backend": self.backend,
+            "size": self._size(),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "errors": self.errors,
+        }
+
+
+class SqliteCache(_SharedCache):
+    """Entries in one sqlite file; WAL mode lets several processes read and write it."""
+
+    backend = "sqlite"
+    PRUNE_EVERY = 256  # sets between expiry / size sweeps
+
+    def __init__(self, name: str, path: str, namespace: str = "", maxsize: int = 100000,
+                 ttl: Optional[float] = None):
+        super().__init__(name, namespace, ttl)
+        self.path = path
+        self.maxsize = max(1, int(maxsize))
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._local = threading.local()
+        self._sets = 0
+        with self._conn() as conn:
+            conn.execute("CREATE TABLE IF NOT EXISTS cache "
+                         "(key TEXT PRIMARY KEY, value TEXT NOT NULL, expires REAL, touched REAL NOT NULL)")
+            conn.execute("CREATE INDEX IF NOT EXISTS cache_touched ON cache (touched)")
+
+    def _conn(self) -> sqlite3.Connection:
+        # one connection per thread; validation runs on a thread pool
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def _load(self, key: str) -> Optional[str]:
+        row = self._conn().execute("SELECT value, expires FROM cache WHERE key = ?", (key,)).fetchone()
+        if row is None or (row[1] is not None and row[1] <= time.time()):
+            return None
+        return row[0]
+
+    def _store(self, key: str, raw: str, ttl: Optional[float]):
+        now = time.time()
+        conn = self._conn()
+        conn.execute("INSERT OR REPLACE INTO cache (key, value, expires, touched) VALUES (?, ?, ?, ?)",
+                     (key, raw, now + ttl if ttl is not None else None, now))
+        self._sets += 1
+        if self._sets % self.PRUNE_EVERY == 0:
+            conn.execute("DELETE FROM cache WHERE expires IS NOT NULL AND expires <= ?", (now,))
+            conn.execute("DELETE FROM cache WHERE key IN (SELECT key FROM cache ORDER BY touched DESC "
+                         "LIMIT -1 OFFSET ?)", (self.maxsize,))
+
+    def clear(self):
+        self._conn().execute("DELETE FROM cache WHERE substr(key, 1, ?) = ?", (len(self.prefix), self.prefix))
+
+    def _size(self) -> Optional[int]:
+        try:
+            return self._conn().execute("SELECT COUNT(*) FROM cache WHERE substr(key, 1, ?) = ?",
+                                        (len(self.prefix), self.prefix)).fetchone()[0]
+        except Exception:
+            return None
+
+
+class RedisCache(_SharedCache):
+    """Redis-protocol backend; expiry is left to the server (SET ... PX)."""
+
+    backend = "redis"
+
+    def __init__(self, name: str, url: str = "redis://localhost:6379/0", namespace: str = "",
+                 ttl: Optional[float] = None, client=None, timeout: float = 0.25):
+        super().__init__(name, namespace, ttl)
+        if client is None:
+            import redis
+            client = redis.Redis.from_url(url, socket_timeout=timeout, socket_connect_timeout=timeout)
+        self.client = client
+
+    def _load(self, key: str) -> Optional[str]:
+        raw = self.client.get(key)
+        return raw.decode("utf-8") if isinstance(raw, bytes) else raw
+
+    def _store(self, key: str, raw: str, ttl: Optional[float]):
+        self.client.set(key, raw, px=int(ttl * 1000) if ttl is not None else None)
+
+    def clear(self):
+        for key in self.client.scan_iter(match=self.prefix + "*", count=500):
+            self.client.delete(key)
+
+
+_REGISTRY: Dict[str, Any] = {}
+
+
+def create_cache(name: str, enabled_env: str, default_size: int, default_ttl: Optional[float],
+                 namespace: str = ""):
+    """Build the named cache from defaults.json + env, or None when disabled.
+
+    `<enabled_env>` toggles the cache; `<NAME>_CACHE_SIZE` / `<NAME>_CACHE_TTL`
+    override the configured size and default TTL, and `<NAME>_CACHE_BACKEND`
+    (or `CACHE_BACKEND`) picks memory | sqlite | redis. `namespace` only
+    applies to the shared backends; in-process entries die with the process.
+    """
+    cfg = cache_config(name)
+    if not _env_flag(enabled_env, cfg.get("enabled", True)):
+        return None
+    prefix = name.upper()
+    shared = cache_config("shared")
+    size = int(os.getenv(f"{prefix}_CACHE_SIZE", cfg.get("maxsize", default_size)))
+    ttl = os.getenv(f"{prefix}_CACHE_TTL", cfg.get("ttl_seconds", default_ttl))
+    ttl = float(ttl) if ttl is not None else None
+    backend = (os.getenv(f"{prefix}_CACHE_BACKEND") or cfg.get("backend")
+               or os.getenv("CACHE_BACKEND") or shared.get("backend", "memory")).lower()
+    if backend == "sqlite":
+        path = os.getenv("CACHE_SQLITE_PATH", shared.get("sqlite_path", ".cache/mcp-cache.sqlite"))
+        cache = SqliteCache(name, path, namespace=namespace, maxsize=size, ttl=ttl)
+    elif backend == "redis":
+        url = os.getenv("CACHE_REDIS_URL", shared.get("redis_url", "redis://localhost:6379/0"))
+        cache = RedisCache(name, url, namespace=namespace, ttl=ttl)
+    elif backend == "memory":
+        cache = TTLCache(name, maxsize=size, ttl=ttl)
+    else:
+        raise ValueError(f"Unknown cache backend for {name}: {backend}")
+    register_cache(name, cache)
+    return cache
+
+
+def register_cache(name: str, cache):
+    """Report a cache built elsewhere (see core.semantic_cache) with the others."""
+    _REGISTRY[name] = cache
+
+
+def cache_stats() -> dict:
+    return {name: c.stats() for name, c in _REGISTRY.items()}
+
+
+def clear_caches():
+    for c in _REGISTRY.values():
+        c.clear()
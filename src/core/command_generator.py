@@ -1,66 +1,92 @@
 # src/core/command_generator.py
 # Use package-root imports (when `src` is on PYTHONPATH) — avoid importing `src.` prefix which breaks
 # when running files under `src/` directly.
+from typing import Optional
+
 from config.settings import DEFAULT_REGION
+from core.aws_listings import LISTINGS, ec2_instance_filters
+from core.intent_registry import REGISTRY, list_supported_services  # noqa: F401  (re-exported)
+from core.metrics import STAGE_SECONDS
 from loguru import logger
 
-def list_supported_services():
-    return ["s3", "ec2", "dynamodb", "iam", "lambda", "sns", "sqs", "cloudwatch", "ecs", "glue"]
-
-def generate_command(intent: str, entities: dict):
-    region = entities.get("region") or DEFAULT_REGION
-
-    # S3
-    if intent == "create_s3_bucket":
-        bucket = entities.get("bucket") or "my-bucket"
-        cmd = f"aws s3 mb s3://{bucket} --region {region}"
-        return cmd, f"Creates an S3 bucket named '{bucket}' in {region}."
-
-    if intent == "list_s3_buckets":
-        return "aws s3 ls", "Lists S3 buckets in your account."
+# compact projection used whenever instances are filtered
+EC2_INSTANCE_QUERY = "Reservations[].Instances[].{Id:InstanceId,State:State.Name,Tags:Tags}"
 
-    # DynamoDB
-    if intent == "create_dynamodb_table":
-        table = entities.get("table") or "MyTable"
-        cmd = (
-            f"aws dynamodb create-table --table-name {table} "
-            f"--attribute-definitions AttributeName=Id,AttributeType=S "
-            f"--key-schema AttributeName=Id,KeyType=HASH "
-            f"--billing-mode PAY_PER_REQUEST --region {region}"
-        )
-        return cmd, f"Creates a DynamoDB table named '{table}' in {region} with on-demand billing."
+def _describe_instances(entities: dict, region: str):
+    filters = ec2_instance_filters(entities)
+    iid = filters.pop("instance-id", None)
+    parts = ["aws ec2 describe-instances"]
+    if iid:
+        parts.append(f"--instance-ids {iid}")
+    if filters:
+        parts.append("--filters " + " ".join(f'"Name={k},Values={v}"' for k, v in filters.items()))
+        parts.append(f'--query "{EC2_INSTANCE_QUERY}"')
+    parts.append(f"--region {region}")
+    what = f"EC2 instance {iid}" if iid else "EC2 instances"
+    if filters:
+        what += " matching " + ", ".join(f"{k}={v}" for k, v in filters.items())
+    return " ".join(parts), f"Describes {what} in {region}."
 
-    if intent == "list_dynamodb_tables":
-        return "aws dynamodb list-tables", "Lists DynamoDB tables."
+def _paged(intent: str, cmd: str, explanation: str, limit: Optional[int], next_token: Optional[str]):
+    # the CLI pages with the same botocore paginator as validation, so its tokens resume each other
+    if intent not in _PAGED or not (limit or next_token):
+        return cmd, explanation
+    if limit:
+        cmd += f" --max-items {limit}"
+        explanation = f"{explanation.rstrip('.')}, at most {limit}."
+    if next_token:
+        cmd += f" --starting-token {next_token}"
+        explanation = f"{explanation.rstrip('.')}, continuing from the given token."
+    return cmd, explanation
 
-    # EC2
-    if intent == "start_ec2_instance":
-        iid = entities.get("instance_id") or "<instance-id>"
-        return f"aws ec2 start-instances --instance-ids {iid} --region {region}", f"Starts EC2 instance {iid} in {region}."
+def _for_each_region(intent: str, entities: dict, limit: Optional[int]):
+    # the CLI has no fan-out, so loop the single-region command over the regions;
+    # resume tokens are per region, so only the limit carries over
+    cmd, explanation = _generate(intent, {**entities, "regions": None, "region": "$r"})
+    if "--region" not in cmd:
+        cmd += " --region $r"
+    regions = entities["regions"]
+    if regions == "all":
+        source = '$(aws ec2 describe-regions --query "Regions[].RegionName" --output text)'
+        where = "every enabled region"
+    else:
+        source = " ".join(regions)
+        where = ", ".join(regions)
+    if "$r" in explanation:
+        explanation = explanation.replace("$r", where)
+    else:
+        explanation = f"{explanation.rstrip('.')} in {where}."
+    cmd, explanation = _paged(intent, cmd, explanation, limit, None)
+    return f"for r in {source}; do {cmd}; done", explanation
 
-    if intent == "stop_ec2_instance":
-        iid = entities.get("instance_id") or "<instance-id>"
-        return f"aws ec2 stop-instances --instance-ids {iid} --region {region}", f"Stops EC2 instance {iid} in {region}."
+def generate_command(intent: str, entities: dict, limit: Optional[int] = None, next_token: Optional[str] = None):
+    """The CLI command and its explanation. `limit` / `next_token` add
+    --max-items / --starting-token to paginated list commands."""
+    with STAGE_SECONDS.time("generate_command"):
+        return _generate(intent, entities, limit, next_token)
 
-    if intent == "list_ec2_instances" or intent == "describe_ec2_instances":
-        return f"aws ec2 describe-instances --region {region}", f"Describes EC2 instances in {region}."
-
-    # IAM
-    if intent == "create_iam_user":
-        user = entities.get("user") or "NewUser"
-        return f"aws iam create-user --user-name {user}", f"Creates IAM user {user}."
-
-    if intent == "list_iam_users":
-        return "aws iam list-users", "Lists IAM users in the account."
-
-    # Lambda
-    if intent == "invoke_lambda":
-        fn = entities.get("function") or "<function-name>"
-        return f"aws lambda invoke --function-name {fn} out.json --cli-binary-format raw-in-base64-out", f"Invokes Lambda function '{fn}'."
-
-    if intent == "list_lambda_functions":
-        return f"aws lambda list-functions --region {region}", f"Lists Lambda functions in {region}."
+def _generate(intent: str, entities: dict, limit: Optional[int] = None, next_token: Optional[str] = None):
+    if entities.get("regions"):
+        return _for_each_region(intent, entities, limit)
+    spec = REGISTRY.get(intent)
+    if spec is None:
+        logger.warning("Unsupported intent: {}", intent)
+        return "echo 'Unsupported intent'", "Intent not supported by Phase 3 skeleton."
+    region = entities.get("region") or DEFAULT_REGION
+    builder = _BUILDERS.get(intent)
+    if builder:
+        return _paged(intent, *builder(entities, region), limit, next_token)
+    values = dict(spec.defaults)
+    values.update({k: v for k, v in entities.items() if v}, region=region)
+    render_cmd, render_expl = _TEMPLATES[intent]
+    return _paged(intent, render_cmd(values), render_expl(values), limit, next_token)
 
-    # Placeholder for other services (SNS, SQS, ECS, Glue) - add as needed
-    logger.warning("Unsupported intent: %s", intent)
-    return "echo 'Unsupported intent'", "Intent not supported by Phase 3 skeleton."
+# intents whose command depends on more than template substitution
+_BUILDERS = {
+    "list_ec2_instances": _describe_instances,
+    "describe_ec2_instances": _describe_instances,
+}
+# list intents whose CLI command takes --max-items / --starting-token (`aws s3 ls` doesn't)
+_PAGED = frozenset(LISTINGS) - {"list_s3_buckets"}
+# bound str.format_map per intent, built once
+_TEMPLATES = {name: (spec.command.format_map, spec.explanation.format_map) for name, spec in REGISTRY.items()}
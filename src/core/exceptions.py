@@ -0,0 +1,24 @@
+# src/core/exceptions.py
+
+
+class StageTimeout(TimeoutError):
+    """A request stage (classification, validation) exceeded its time budget."""
+
+    def __init__(self, stage: str, timeout: float):
+        super().__init__(f"{stage} stage timed out after {timeout:g}s")
+        self.stage = stage
+        self.timeout = timeout
+
+
+class TierUnavailable(RuntimeError):
+    """A model tier could not answer at all (model not loaded, API failing,
+    circuit open), as opposed to answering without a confident label."""
+
+    def __init__(self, tier: str, reason: str):
+        super().__init__(f"{tier} tier unavailable: {reason}")
+        self.tier = tier
+        self.reason = reason
+
+    def __reduce__(self):
+        # raised inside the classify process pool (CLASSIFY_EXECUTOR=process) and pickled back
+        return type(self), (self.tier, self.reason)
@@ -0,0 +1,142 @@
+# src/core/execution.py
+"""Event-loop offloading for the blocking request stages.
+
+The MCP tools and HTTP routes are coroutines, but classification is a CPU-bound
+forward pass and validation is blocking boto3 I/O. Each of those runs through a
+`Stage`: a dedicated executor, a cap on in-flight calls and a time budget that
+covers both queueing for a slot and the call itself.
+
+- `classify`: ML intent classification. Threads by default (torch releases the
+  GIL in its kernels); `CLASSIFY_EXECUTOR=process` moves it to a process pool
+  of `CLASSIFY_WORKERS` processes, each loading its own model.
+- `haiku` / `validation`: network calls on bounded thread pools.
+
+A timed-out call raises `StageTimeout`; the executor thread itself cannot be
+interrupted and finishes in the background, which is why the pools are bounded.
+Per-stage settings come from `execution.<stage>` in defaults.json or
+`<STAGE>_WORKERS` / `<STAGE>_MAX_CONCURRENCY` / `<STAGE>_TIMEOUT` env vars.
+"""
+import asyncio
+import os
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from config.settings import CONFIG
+from core.exceptions import StageTimeout
+
+_cfg = CONFIG.get("execution", {})
+
+
+def _stage_setting(stage: str, key: str, default):
+    env = os.getenv(f"{stage.upper()}_{key.upper()}")
+    if env is not None:
+        return env
+    return _cfg.get(stage, {}).get(key, default)
+
+
+class Stage:
+    def __init__(self, name: str, executor: Optional[Executor], max_concurrency: int, timeout: Optional[float]):
+        self.name = name
+        self.executor = executor
+        self.max_concurrency = max(1, int(max_concurrency))
+        self.timeout = timeout if timeout and timeout > 0 else None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._sem: Optional[asyncio.Semaphore] = None
+        self.in_flight = 0
+        self._stats = {"calls": 0, "timeouts": 0, "errors": 0, "latency_ms_total": 0.0, "latency_ms_max": 0.0}
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        # semaphores are bound to a loop; rebuild if we are called from a new one
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._sem = asyncio.Semaphore(self.max_concurrency)
+        return self._sem
+
+    async def run(self, fn: Callable[..., Any], *args) -> Any:
+        """Run the blocking `fn(*args)` on this stage's executor."""
+        async def call():
+            return await asyncio.get_running_loop().run_in_executor(self.executor, fn, *args)
+        return await self.guard(call)
+
+    async def guard(self, make_awaitable: Callable[[], Awaitable[Any]]) -> Any:
+        """Await `make_awaitable()` under this stage's concurrency limit and timeout."""
+        started = time.perf_counter()
+        self._stats["calls"] += 1
+        try:
+            return await asyncio.wait_for(self._limited(make_awaitable), self.timeout)
+        except asyncio.TimeoutError:
+            self._stats["timeouts"] += 1
+            raise StageTimeout(self.name, self.timeout) from None
+        except Exception:
+            self._stats["errors"] += 1
+            raise
+        finally:
+            latency_ms = (time.perf_counter() - started) * 1000.0
+            self._stats["latency_ms_total"] += latency_ms
+            self._stats["latency_ms_max"] = max(self._stats["latency_ms_max"], latency_ms)
+
+    async def _limited(self, make_awaitable):
+        async with self._semaphore():
+            self.in_flight += 1
+            try:
+                return await make_awaitable()
+            finally:
+                self.in_flight -= 1
+
+    def stats(self) -> dict:
+        s = self._stats
+        return {
+            "executor": type(self.executor).__name__ if self.executor else "default",
+            "max_concurrency": self.max_concurrency,
+            "timeout_s": self.timeout,
+            "in_flight": self.in_flight,
+            "calls": s["calls"],
+            "timeouts": s["timeouts"],
+            "errors": s["errors"],
+            "avg_latency_ms": round(s["latency_ms_total"] / s["calls"], 3) if s["calls"] else 0.0,
+            "max_latency_ms": round(s["latency_ms_max"], 3),
+        }
+
+
+def _make_stage(name: str) -> Stage:
+    default_workers, default_concurrency, default_timeout = _STAGE_DEFAULTS[name]
+    workers = int(_stage_setting(name, "workers", default_workers))
+    if _stage_setting(name, "executor", "thread").lower() == "process":
+        executor: Executor = ProcessPoolExecutor(max_workers=workers)
+    else:
+        executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f"{name}-stage")
+    concurrency = int(_stage_setting(name, "max_concurrency", default_concurrency))
+    timeout = float(_stage_setting(name, "timeout", default_timeout))
+    return Stage(name, executor, concurrency, timeout)
+
+
+_STAGE_DEFAULTS = {
+    # name: (workers, max in-flight requests, timeout seconds)
+    # classify admits more requests than workers: concurrent ones share micro-batches
+    "classify": (2, 64, 10.0),
+    "haiku": (8, 8, 15.0),
+    # semantic cache lookups: one small encoder pass, cheap enough to give up on quickly
+    "semantic": (2, 64, 2.0),
+    "validation": (10, 10, 8.0),
+}
+_stages: Dict[str, Stage] = {}
+
+
+def get_stage(name: str) -> Stage:
+    """The named stage, built on first use (so importing this module starts no pools)."""
+    stage = _stages.get(name)
+    if stage is None:
+        stage = _stages[name] = _make_stage(name)
+    return stage
+
+
+def reset_stages():
+    """In a forked worker: forget the parent's stages. Their pool threads (or
+    processes) didn't survive the fork, so each stage is rebuilt on next use."""
+    _stages.clear()
+
+
+def execution_stats() -> dict:
+    return {name: s.stats() for name, s in _stages.items()}
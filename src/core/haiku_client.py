@@ -0,0 +1,200 @@
+# src/core/haiku_client.py
+"""Claude Haiku intent classification with bounded latency.
+
+- One shared Anthropic client per process, so the underlying HTTP connection
+  pool is kept alive between requests; explicit connect/read timeouts.
+- The SDK's own retries are off; `HAIKU_MAX_RETRIES` retryable failures
+  (connection errors, timeouts, 429, 5xx/529) are retried here with full-jitter
+  exponential backoff, capped so one call never exceeds its timeout budget.
+- A circuit breaker opens after `HAIKU_BREAKER_FAILURES` consecutive failed
+  calls; while open, `classify` raises TierUnavailable at once and the parse
+  falls back to the ML / rule tiers. After `HAIKU_BREAKER_COOLDOWN` one trial
+  call is let through (half-open) and its outcome closes or re-opens the
+  breaker.
+- Concurrent identical queries are coalesced (single-flight): the first caller
+  makes the upstream call and the others wait for its result.
+
+The label prompt is built once per label set. Set `HAIKU_BASE_URL` to point
+the client at a local mock server.
+"""
+import os
+import random
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, Dict, List, Optional
+
+from loguru import logger
+
+from config.settings import CONFIG
+from core.exceptions import TierUnavailable
+
+_cfg = CONFIG.get("haiku", {})
+
+
+def _setting(key: str, default):
+    return os.getenv(f"HAIKU_{key.upper()}", _cfg.get(key, default))
+
+
+HAIKU_MODEL = str(_setting("model", "claude-3-haiku-20240307"))
+HAIKU_BASE_URL = _setting("base_url", None)
+CONNECT_TIMEOUT = float(_setting("connect_timeout", 2.0))
+READ_TIMEOUT = float(_setting("read_timeout", 5.0))
+MAX_RETRIES = int(_setting("max_retries", 2))
+BACKOFF_BASE = float(_setting("backoff_base", 0.2))
+BACKOFF_MAX = float(_setting("backoff_max", 2.0))
+BREAKER_FAILURES = int(_setting("breaker_failures", 5))
+BREAKER_COOLDOWN = float(_setting("breaker_cooldown", 30.0))
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+
+class CircuitBreaker:
+    def __init__(self, failures: int = BREAKER_FAILURES, cooldown: float = BREAKER_COOLDOWN):
+        self.threshold = max(1, failures)
+        self.cooldown = cooldown
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at = 0.0
+        self._state = CLOSED
+        self.rejected = 0
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self._state == CLOSED:
+                return True
+            if self._state == OPEN and time.monotonic() - self._opened_at >= self.cooldown:
+                self._state = HALF_OPEN  # exactly one trial call
+                return True
+            self.rejected += 1
+            return False
+
+    def record(self, ok: bool):
+        with self._lock:
+            if ok:
+                self._failures, self._state = 0, CLOSED
+                return
+            self._failures += 1
+            if self._state == HALF_OPEN or self._failures >= self.threshold:
+                if self._state != OPEN:
+                    logger.warning("Haiku circuit open after {} failures; cooling down {:.0f}s",
+                                   self._failures, self.cooldown)
+                self._state, self._opened_at = OPEN, time.monotonic()
+
+    @property
+    def state(self) -> str:
+        return self._state
+
+
+class SingleFlight:
+    """Collapse concurrent calls with the same key into one."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._inflight: Dict[str, Future] = {}
+        self.coalesced = 0
+
+    def do(self, key: str, fn: Callable[[], object], wait_timeout: Optional[float] = None):
+        with self._lock:
+            fut = self._inflight.get(key)
+            leader = fut is None
+            if leader:
+                fut = self._inflight[key] = Future()
+            else:
+                self.coalesced += 1
+        if not leader:
+            return fut.result(timeout=wait_timeout)
+        try:
+            result = fn()
+            fut.set_result(result)
+            return result
+        except BaseException as e:
+            fut.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+
+def build_prompt(labels: List[str]) -> str:
+    return ("Classify the user's AWS request into exactly one intent label. "
+            "Reply with the label only.\nLabels: " + ", ".join(labels))
+
+
+class HaikuClassifier:
+    def __init__(self, labels: List[str], api_key: str, base_url: Optional[str] = HAIKU_BASE_URL,
+                 model: str = HAIKU_MODEL, client=None):
+        self.labels = list(labels)
+        self._label_set = frozenset(self.labels)
+        self.system = build_prompt(self.labels)
+        self.model = model
+        self.budget = CONNECT_TIMEOUT + READ_TIMEOUT
+        if client is None:
+            import anthropic
+            client = anthropic.Anthropic(
+                api_key=api_key, base_url=base_url, max_retries=0,
+                timeout=anthropic.Timeout(READ_TIMEOUT, connect=CONNECT_TIMEOUT),
+            )
+        self.client = client
+        self.breaker = CircuitBreaker()
+        self.flight = SingleFlight()
+        self._stats = {"calls": 0, "retries": 0, "failures": 0}
+
+    def classify(self, text: str) -> Optional[str]:
+        """A label from `labels`, or None when the reply is not one. A failed
+        call or an open breaker raises TierUnavailable."""
+        key = " ".join(text.split()).lower()
+        try:
+            return self.flight.do(key, lambda: self._classify(text), wait_timeout=self.budget * (MAX_RETRIES + 1))
+        except TierUnavailable:
+            raise
+        except Exception as e:
+            logger.warning("Haiku classification failed: {}", e)
+            raise TierUnavailable("haiku", str(e) or type(e).__name__) from e
+
+    def _classify(self, text: str) -> Optional[str]:
+        if not self.breaker.allow():
+            raise TierUnavailable("haiku", "circuit open")
+        try:
+            reply = self._call_with_retries(text)
+        except Exception:
+            self._stats["failures"] += 1
+            self.breaker.record(False)
+            raise
+        self.breaker.record(True)
+        words = reply.strip().split()
+        label = words[0].strip(".,`'\"") if words else ""
+        return label if label in self._label_set else None
+
+    def _call_with_retries(self, text: str) -> str:
+        deadline = time.monotonic() + self.budget * (MAX_RETRIES + 1)
+        for attempt in range(MAX_RETRIES + 1):
+            try:
+                self._stats["calls"] += 1
+                resp = self.client.messages.create(
+                    model=self.model, max_tokens=16, system=self.system,
+                    messages=[{"role": "user", "content": text}],
+                )
+                return "".join(getattr(block, "text", "") for block in resp.content)
+            except Exception as e:
+                if attempt == MAX_RETRIES or not _retryable(e):
+                    raise
+                # full jitter: sleep U(0, min(max, base * 2^attempt))
+                delay = random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt))
+                if time.monotonic() + delay >= deadline:
+                    raise
+                self._stats["retries"] += 1
+                time.sleep(delay)
+        raise RuntimeError("unreachable")
+
+    def stats(self) -> dict:
+        return {**self._stats, "breaker": self.breaker.state, "rejected": self.breaker.rejected,
+                "coalesced": self.flight.coalesced}
+
+
+def _retryable(e: Exception) -> bool:
+    status = getattr(e, "status_code", None)
+    if status is not None:
+        return status == 429 or status >= 500
+    # connection errors and timeouts (APITimeoutError subclasses APIConnectionError) carry no status code
+    return any(cls.__name__ == "APIConnectionError" for cls in type(e).__mro__)
@@ -0,0 +1,103 @@
+# src/core/intent_registry.py
+"""Single source of truth for the supported intents.
+
+Each `IntentSpec` declares the service, the CLI command and explanation
+templates, which entities the intent needs (`required`) or can use
+(`optional`), and the placeholder values used when an entity is missing.
+Everything that enumerates intents or services derives from `REGISTRY`:
+command generation, the NLP label set, the rule tier's entity extractors, the
+validator dispatch and `list_supported_services`.
+"""
+from types import MappingProxyType
+from typing import Dict, List, Mapping, NamedTuple, Tuple
+
+
+class IntentSpec(NamedTuple):
+    intent: str
+    service: str
+    command: str
+    explanation: str
+    required: Tuple[str, ...] = ()
+    optional: Tuple[str, ...] = ()
+    defaults: Mapping[str, str] = MappingProxyType({})  # read-only: shared by every request
+
+    @property
+    def entities(self) -> Tuple[str, ...]:
+        return self.required + self.optional
+
+
+_EC2_LISTING = ("region", "regions", "tag", "state", "instance_id")
+
+_SPECS: List[IntentSpec] = [
+    # S3
+    IntentSpec("create_s3_bucket", "s3", "aws s3 mb s3://{bucket} --region {region}",
+               "Creates an S3 bucket named '{bucket}' in {region}.",
+               required=("bucket",), optional=("region",), defaults={"bucket": "my-bucket"}),
+    IntentSpec("list_s3_buckets", "s3", "aws s3 ls", "Lists S3 buckets in your account.", optional=("region",)),
+    # DynamoDB
+    IntentSpec("create_dynamodb_table", "dynamodb",
+               "aws dynamodb create-table --table-name {table} "
+               "--attribute-definitions AttributeName=Id,AttributeType=S "
+               "--key-schema AttributeName=Id,KeyType=HASH "
+               "--billing-mode PAY_PER_REQUEST --region {region}",
+               "Creates a DynamoDB table named '{table}' in {region} with on-demand billing.",
+               required=("table",), optional=("region",), defaults={"table": "MyTable"}),
+    IntentSpec("list_dynamodb_tables", "dynamodb", "aws dynamodb list-tables", "Lists DynamoDB tables.",
+               optional=("region", "regions")),
+    # EC2
+    IntentSpec("start_ec2_instance", "ec2", "aws ec2 start-instances --instance-ids {instance_id} --region {region}",
+               "Starts EC2 instance {instance_id} in {region}.",
+               required=("instance_id",), optional=("region",), defaults={"instance_id": "<instance-id>"}),
+    IntentSpec("stop_ec2_instance", "ec2", "aws ec2 stop-instances --instance-ids {instance_id} --region {region}",
+               "Stops EC2 instance {instance_id} in {region}.",
+               required=("instance_id",), optional=("region",), defaults={"instance_id": "<instance-id>"}),
+    # describe/list render through command_generator's filter-aware builder
+    IntentSpec("list_ec2_instances", "ec2", "aws ec2 describe-instances --region {region}",
+               "Describes EC2 instances in {region}.", optional=_EC2_LISTING),
+    IntentSpec("describe_ec2_instances", "ec2", "aws ec2 describe-instances --region {region}",
+               "Describes EC2 instances in {region}.", optional=_EC2_LISTING),
+    # IAM
+    IntentSpec("create_iam_user", "iam", "aws iam create-user --user-name {user}", "Creates IAM user {user}.",
+               required=("user",), defaults={"user": "NewUser"}),
+    IntentSpec("list_iam_users", "iam", "aws iam list-users", "Lists IAM users in the account."),
+    # Lambda
+    IntentSpec("invoke_lambda", "lambda",
+               "aws lambda invoke --function-name {function} out.json --cli-binary-format raw-in-base64-out",
+               "Invokes Lambda function '{function}'.",
+               required=("function",), optional=("region",), defaults={"function": "<function-name>"}),
+    IntentSpec("list_lambda_functions", "lambda", "aws lambda list-functions --region {region}",
+               "Lists Lambda functions in {region}.", optional=("region", "regions")),
+    # SNS
+    IntentSpec("create_sns_topic", "sns", "aws sns create-topic --name {topic} --region {region}",
+               "Creates SNS topic '{topic}' in {region}.",
+               required=("topic",), optional=("region",), defaults={"topic": "my-topic"}),
+    IntentSpec("list_sns_topics", "sns", "aws sns list-topics --region {region}",
+               "Lists SNS topics in {region}.", optional=("region", "regions")),
+    # SQS
+    IntentSpec("create_sqs_queue", "sqs", "aws sqs create-queue --queue-name {queue} --region {region}",
+               "Creates SQS queue '{queue}' in {region}.",
+               required=("queue",), optional=("region",), defaults={"queue": "my-queue"}),
+    IntentSpec("list_sqs_queues", "sqs", "aws sqs list-queues --region {region}",
+               "Lists SQS queues in {region}.", optional=("region", "regions")),
+    # CloudWatch
+    IntentSpec("list_cloudwatch_alarms", "cloudwatch", "aws cloudwatch describe-alarms --region {region}",
+               "Lists CloudWatch alarms in {region}.", optional=("region", "regions")),
+    # ECS
+    IntentSpec("list_ecs_clusters", "ecs", "aws ecs list-clusters --region {region}",
+               "Lists ECS clusters in {region}.", optional=("region", "regions")),
+    # Glue
+    IntentSpec("list_glue_jobs", "glue", "aws glue list-jobs --region {region}",
+               "Lists Glue jobs in {region}.", optional=("region", "regions")),
+]
+
+REGISTRY: Dict[str, IntentSpec] = {s.intent: s for s in _SPECS}
+INTENTS: List[str] = list(REGISTRY)
+SUPPORTED_SERVICES: List[str] = list(dict.fromkeys(s.service for s in _SPECS))
+
+
+def get_spec(intent: str):
+    return REGISTRY.get(intent)
+
+
+def list_supported_services() -> List[str]:
+    return list(SUPPORTED_SERVICES)
@@ -0,0 +1,193 @@
+# src/core/intent_rules.py
+"""Declarative intent rules compiled into a single-pass matcher.
+
+Every intent rule is "one of `verbs` followed (anywhere later) by one of
+`nouns`", optionally followed by an EC2 instance id. All rule keywords, instance
+ids and the region are collected by one scan over the text with a combined,
+precompiled alternation; rules are then resolved in table order from the
+recorded keyword positions. Entity extractors are precompiled too and only the
+ones declared for the resolved intent run.
+
+`confidence` scores a scan so the NLP cascade can trust an unambiguous rule
+match and skip the model tiers (see core.nlp_utils).
+"""
+import re
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from core.intent_registry import REGISTRY
+
+
+class IntentRule(NamedTuple):
+    intent: str
+    verbs: Tuple[str, ...]
+    nouns: Tuple[str, ...]
+    needs_instance_id: bool = False
+
+
+# Order matters: the first matching rule wins.
+INTENT_RULES: List[IntentRule] = [
+    # S3
+    IntentRule("create_s3_bucket", ("create", "make"), ("s3", "bucket")),
+    IntentRule("list_s3_buckets", ("list", "show"), ("s3", "buckets")),
+    # DynamoDB
+    IntentRule("create_dynamodb_table", ("create", "make"), ("dynamo", "dynamodb", "table")),
+    IntentRule("list_dynamodb_tables", ("list", "show"), ("dynamo", "tables")),
+    # EC2
+    IntentRule("start_ec2_instance", ("start", "run"), ("ec2", "instance"), needs_instance_id=True),
+    IntentRule("stop_ec2_instance", ("stop", "terminate"), ("ec2", "instance"), needs_instance_id=True),
+    IntentRule("describe_ec2_instances", ("list", "show", "describe"), ("ec2", "instances", "instance")),
+    # IAM
+    IntentRule("create_iam_user", ("create", "add"), ("iam", "user")),
+    IntentRule("list_iam_users", ("list", "show"), ("iam", "users")),
+    # Lambda
+    IntentRule("invoke_lambda", ("invoke", "call"), ("lambda",)),
+    IntentRule("list_lambda_functions", ("list", "show"), ("lambda", "functions")),
+    # SNS / SQS
+    IntentRule("create_sns_topic", ("create", "make"), ("sns", "topic")),
+    IntentRule("list_sns_topics", ("list", "show"), ("sns", "topics")),
+    IntentRule("create_sqs_queue", ("create", "make"), ("sqs", "queue")),
+    IntentRule("list_sqs_queues", ("list", "show"), ("sqs", "queues")),
+    # CloudWatch / ECS / Glue
+    IntentRule("list_cloudwatch_alarms", ("list", "show", "describe"), ("cloudwatch", "alarms")),
+    IntentRule("list_ecs_clusters", ("list", "show"), ("ecs", "clusters")),
+    IntentRule("list_glue_jobs", ("list", "show"), ("glue", "jobs")),
+]
+
+# Entities produced for each intent (also used when ML/Haiku picked the intent).
+INTENT_ENTITIES: Dict[str, Tuple[str, ...]] = {name: spec.entities for name, spec in REGISTRY.items()}
+
+_REGION = r"[a-z]{2}(?:-gov)?-[a-z]+-\d+"
+_KEYWORDS = sorted({w for r in INTENT_RULES for w in r.verbs + r.nouns}, key=len, reverse=True)
+
+# One alternation for everything the rule table needs to know about the text.
+_SCAN_RE = re.compile(
+    r"\b(?P<kw>" + "|".join(map(re.escape, _KEYWORDS)) + r")\b"
+    r"|\b(?P<iid>i-[0-9a-f]+)\b"
+    r"|\b(?:in|region)\s+(?P<region>" + _REGION + r")\b"
+)
+
+# nouns that name the service itself, as opposed to generic ones like "table" or "user"
+_SERVICE_NOUNS = frozenset({"s3", "dynamo", "dynamodb", "ec2", "iam", "lambda", "sns", "sqs", "cloudwatch",
+                            "ecs", "glue"})
+
+# Per keyword: bitmask of rules using it as a verb / as a noun (bit i = INTENT_RULES[i]).
+_VERB_MASK: Dict[str, int] = {}
+_NOUN_MASK: Dict[str, int] = {}
+_SERVICE_MASK: Dict[str, int] = {}
+_IID_RULES = 0
+for _i, _rule in enumerate(INTENT_RULES):
+    for _w in _rule.verbs:
+        _VERB_MASK[_w] = _VERB_MASK.get(_w, 0) | (1 << _i)
+    for _w in _rule.nouns:
+        _NOUN_MASK[_w] = _NOUN_MASK.get(_w, 0) | (1 << _i)
+        if _w in _SERVICE_NOUNS:
+            _SERVICE_MASK[_w] = _SERVICE_MASK.get(_w, 0) | (1 << _i)
+    if _rule.needs_instance_id:
+        _IID_RULES |= 1 << _i
+
+# a name following one of these words is not a name
+_NOT_A_NAME = r"(?!(?:named|called|in|for|with|on|to)\b)"
+_NAME_RE = {
+    "bucket": re.compile(r"\b(?:named|called|bucket)\s+" + _NOT_A_NAME + r"([a-z0-9][a-z0-9\-\.]{2,62})\b", re.I),
+    "table": re.compile(r"\b(?:named|called|table)\s+" + _NOT_A_NAME + r"([A-Za-z0-9_\-]+)", re.I),
+    "user": re.compile(r"\b(?:named|called|user)\s+" + _NOT_A_NAME + r"([A-Za-z0-9_\-]+)", re.I),
+    "function": re.compile(r"\b(?:named|called|function)\s+" + _NOT_A_NAME + r"([A-Za-z0-9_\-]+)", re.I),
+    "topic": re.compile(r"\b(?:named|called|topic)\s+" + _NOT_A_NAME + r"([A-Za-z0-9_\-]+)", re.I),
+    "queue": re.compile(r"\b(?:named|called|queue)\s+" + _NOT_A_NAME + r"([A-Za-z0-9_\-]+)", re.I),
+}
+_TAG_RE = re.compile(r"\btag\s+([A-Za-z0-9\-_]+)=([A-Za-z0-9\-_]+)", re.I)
+# multi-region listings: "in all regions" or "in us-east-1, eu-west-1 and ..."
+_ALL_REGIONS_RE = re.compile(r"\b(?:all|every|each)\s+(?:aws\s+)?regions?\b", re.I)
+_REGION_LIST_RE = re.compile(
+    r"\b(?:in|regions?)\s+(" + _REGION + r"(?:\s*(?:,|and|&)\s*" + _REGION + r")+)\b", re.I)
+_REGION_NAME_RE = re.compile(_REGION, re.I)
+_STATE_RE = re.compile(r"\b(pending|running|stopping|stopped|shutting-down|terminated)\b", re.I)
+
+
+class Scan(NamedTuple):
+    text: str
+    matched: int            # bitmask of INTENT_RULES that matched
+    instance_id: Optional[str]
+    region: Optional[str]
+    named_service: int = 0  # rules whose verb was followed by the service's own name
+
+
+def scan(text: str) -> Scan:
+    """Walk the text once, resolving every rule as keywords stream past."""
+    verbs_seen = 0       # rules whose verb has appeared
+    nouns_after = 0      # rules with verb ... noun seen
+    with_id = 0          # instance-id rules with verb ... noun ... id seen
+    named = 0            # rules with verb ... service name seen
+    iid = region = None
+    for kw, found_iid, found_region in _SCAN_RE.findall(text.lower()):
+        if kw:
+            verbs_seen |= _VERB_MASK.get(kw, 0)
+            nouns_after |= verbs_seen & _NOUN_MASK.get(kw, 0)
+            named |= verbs_seen & _SERVICE_MASK.get(kw, 0)
+        elif found_iid:
+            iid = found_iid
+            with_id |= nouns_after & _IID_RULES
+        elif region is None:
+            region = found_region
+    matched = (nouns_after & ~_IID_RULES) | with_id
+    return Scan(text, matched, iid, region, named)
+
+
+def match_intent(sc: Scan) -> str:
+    m = sc.matched
+    if not m:
+        return "unknown"
+    # lowest set bit = first rule in table order
+    return INTENT_RULES[(m & -m).bit_length() - 1].intent
+
+
+def confidence(sc: Scan) -> float:
+    """How far `match_intent(sc)` can be trusted, in [0, 1].
+
+    0 when no rule matched; 0.9 when exactly one did (0.5 when several did and
+    table order broke the tie); +0.1 when the query names the service itself
+    ("list iam users" vs "list users").
+    """
+    m = sc.matched
+    if not m:
+        return 0.0
+    winner = m & -m
+    score = 0.9 if m == winner else 0.5
+    if sc.named_service & winner:
+        score += 0.1
+    return round(score, 2)
+
+
+def _extract(name: str, sc: Scan):
+    if name == "region":
+        return sc.region
+    if name == "instance_id":
+        return sc.instance_id
+    if name == "tag":
+        # every "tag k=v" in the query; all of them must match
+        tags = {k: v for k, v in _TAG_RE.findall(sc.text)}
+        return tags or None
+    if name == "regions":
+        # "all" or a list of 2+ regions; a single region stays in "region"
+        if _ALL_REGIONS_RE.search(sc.text):
+            return "all"
+        m = _REGION_LIST_RE.search(sc.text)
+        return [r.lower() for r in _REGION_NAME_RE.findall(m.group(1))] if m else None
+    if name == "state":
+        m = _STATE_RE.search(sc.text)
+        return m.group(1).lower() if m else None
+    m = _NAME_RE[name].search(sc.text)
+    if not m:
+        return None
+    # bucket names are lowercase-only
+    return m.group(1).lower() if name == "bucket" else m.group(1)
+
+
+def extract_entities(intent: str, sc: Scan) -> Dict:
+    return {name: _extract(name, sc) for name in INTENT_ENTITIES.get(intent, ())}
+
+
+def classify(text: str) -> Tuple[str, Dict]:
+    sc = scan(text)
+    intent = match_intent(sc)
+    return intent, extract_entities(intent, sc)
@@ -0,0 +1,197 @@
+# src/core/inventory.py
+"""Background-refreshed resource inventory for O(1) existence checks.
+
+With `INVENTORY_ENABLED=true` the validator answers existence checks (bucket,
+table, IAM user, Lambda function, EC2 instance) from in-memory indexes instead
+of a live API probe per request. Each index holds the names from one full,
+paginated listing (see core.aws_listings) for one (account, listing, region).
+Global services (S3, IAM) have one index per account. The account is the
+credentials profile, the same key the client registry and validation cache use.
+
+Indexes are registered on first lookup and filled by a daemon thread. The
+thread re-lists each one every `refresh_seconds`. Until an index has been
+filled, or once it is older than `max_age_seconds` (for example because
+refreshes keep failing), `lookup` returns None and the caller falls back to
+the point lookup. Every lookup reports the index age, so callers can say how
+fresh an answer is.
+"""
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from loguru import logger
+
+from config.settings import CONFIG, DEFAULT_REGION
+from core.aws_listings import LISTINGS, iter_resources
+
+_cfg = CONFIG.get("inventory", {})
+INVENTORY_ENABLED = str(os.getenv("INVENTORY_ENABLED", _cfg.get("enabled", False))).lower() in ("1", "true", "yes")
+REFRESH_SECONDS = float(os.getenv("INVENTORY_REFRESH_SECONDS", _cfg.get("refresh_seconds", 300)))
+MAX_AGE_SECONDS = float(os.getenv("INVENTORY_MAX_AGE_SECONDS", _cfg.get("max_age_seconds", 900)))
+# regions indexed from startup; others are added on first lookup
+PRELOAD_REGIONS = [r.strip() for r in os.getenv("INVENTORY_REGIONS", "").split(",") if r.strip()] \
+    or _cfg.get("regions", [])
+
+
+class IndexSpec(NamedTuple):
+    name: Callable[[Any], str]                  # listed item -> resource name
+    value: Callable[[Any], Any] = lambda item: None
+
+
+# listing intent -> how its items become index entries
+INDEXES: Dict[str, IndexSpec] = {
+    "list_s3_buckets": IndexSpec(str),
+    "list_dynamodb_tables": IndexSpec(str),
+    "list_iam_users": IndexSpec(str),
+    "list_lambda_functions": IndexSpec(str),
+    "describe_ec2_instances": IndexSpec(lambda i: i["InstanceId"], lambda i: i["State"]),
+}
+
+IndexKey = Tuple[str, str, Optional[str]]  # (account, listing, region or None for global services)
+
+
+class Lookup(NamedTuple):
+    found: bool
+    value: Any          # e.g. the EC2 instance state; None for plain name indexes
+    age: float          # seconds since the index was listed
+
+
+class _Index:
+    __slots__ = ("entries", "refreshed", "attempted", "error", "refreshing")
+
+    def __init__(self):
+        self.entries: Optional[Dict[str, Any]] = None  # None until the first listing completes
+        self.refreshed = 0.0                            # last successful listing
+        self.attempted: Optional[float] = None          # last listing, successful or not
+        self.error: Optional[str] = None
+        self.refreshing = False
+
+
+def _account() -> str:
+    return os.getenv("AWS_PROFILE") or "default"
+
+
+class Inventory:
+    def __init__(self, refresh_seconds: float = REFRESH_SECONDS, max_age: float = MAX_AGE_SECONDS,
+                 lister: Optional[Callable[[str, str], List[Any]]] = None):
+        self.refresh_seconds = refresh_seconds
+        self.max_age = max_age
+        self._list = lister or _list_all
+        self._indexes: Dict[IndexKey, _Index] = {}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.hits = self.misses = self.unavailable = self.refreshes = self.failures = 0
+
+    def _key(self, listing: str, region: Optional[str]) -> IndexKey:
+        return _account(), listing, (region or DEFAULT_REGION) if LISTINGS[listing].regional else None
+
+    def track(self, listing: str, region: Optional[str] = None) -> IndexKey:
+        """Register an index (idempotent) and make sure the refresher is running."""
+        key = self._key(listing, region)
+        if key not in self._indexes:
+            with self._lock:
+                if key not in self._indexes:
+                    self._indexes[key] = _Index()
+                    self._wake.set()
+        self._ensure_thread()
+        return key
+
+    def lookup(self, listing: str, region: Optional[str], name: str) -> Optional[Lookup]:
+        """Whether `name` is in the index, or None if the index is not usable yet."""
+        index = self._indexes.get(self._key(listing, region))
+        if index is None:
+            self.track(listing, region)
+            self.unavailable += 1
+            return None
+        entries, age = index.entries, time.monotonic() - index.refreshed
+        if entries is None or age > self.max_age:
+            self.unavailable += 1
+            return None
+        found = name in entries
+        if found:
+            self.hits += 1
+        else:
+            self.misses += 1
+        return Lookup(found, entries.get(name), age)
+
+    def refresh(self, key: IndexKey):
+        """List one index in full and swap it in; on failure the old entries stay."""
+        index = self._indexes[key]
+        index.refreshing, index.attempted = True, time.monotonic()
+        try:
+            _, listing, region = key
+            spec = INDEXES[listing]
+            items = self._list(listing, region or DEFAULT_REGION)
+            index.entries = {spec.name(i): spec.value(i) for i in items}
+            index.refreshed, index.error = time.monotonic(), None
+            self.refreshes += 1
+        except Exception as e:
+            index.error = str(e)
+            self.failures += 1
+            logger.warning("Inventory refresh failed for {}: {}", key, e)
+        finally:
+            index.refreshing = False
+
+    def _due(self) -> List[IndexKey]:
+        now = time.monotonic()
+        # a failed listing is retried a full period later, like a successful one
+        return [k for k, i in list(self._indexes.items())
+                if i.attempted is None or now - i.attempted >= self.refresh_seconds]
+
+    def _run(self):
+        while True:
+            for key in self._due():
+                self.refresh(key)
+            self._wake.wait(timeout=min(self.refresh_seconds, 30.0))
+            self._wake.clear()
+
+    def _ensure_thread(self):
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="inventory-refresh", daemon=True)
+                self._thread.start()
+
+    def stats(self) -> dict:
+        now = time.monotonic()
+        indexes = {}
+        for (account, listing, region), i in sorted(self._indexes.items(), key=lambda kv: str(kv[0])):
+            indexes[f"{account}/{listing}/{region or 'global'}"] = {
+                "size": None if i.entries is None else len(i.entries),
+                "age_seconds": round(now - i.refreshed, 1) if i.entries is not None else None,
+                "refreshing": i.refreshing,
+                "error": i.error,
+            }
+        return {"enabled": INVENTORY_ENABLED, "refresh_seconds": self.refresh_seconds, "max_age_seconds": self.max_age,
+                "hits": self.hits, "misses": self.misses, "unavailable": self.unavailable,
+                "refreshes": self.refreshes, "failures": self.failures, "indexes": indexes}
+
+
+def _list_all(listing: str, region: str) -> List[Any]:
+    # limit=None walks every page
+    return list(iter_resources(listing, {"region": region}))
+
+
+_inventory: Optional[Inventory] = None
+
+
+def get_inventory() -> Optional[Inventory]:
+    """The process-wide inventory, or None when INVENTORY_ENABLED is off."""
+    global _inventory
+    if not INVENTORY_ENABLED:
+        return None
+    if _inventory is None:
+        _inventory = Inventory()
+        for region in PRELOAD_REGIONS:
+            for listing in INDEXES:
+                _inventory.track(listing, region)
+    return _inventory
+
+
+def inventory_stats() -> dict:
+    if _inventory is None:
+        return {"enabled": INVENTORY_ENABLED, "indexes": {}}
+    return _inventory.stats()
@@ -0,0 +1,131 @@
+# src/core/label_embeddings.py
+"""Embedding-based intent classifier with precomputed label representations.
+
+The zero-shot NLI pipeline scores every (query, "This example is <label>.")
+pair, so each request re-encodes all candidate hypotheses. Here the hypotheses
+are encoded once per (model, label set), optionally persisted to disk, and a
+query costs one encoder pass plus a matrix product against the label matrix.
+
+A label is accepted on the raw cosine similarities, not on ML_CONF_THRESHOLD:
+that threshold is tuned for zero-shot NLI probabilities, and a softmax over
+cosine similarities clears it on a small lead. The best label needs a cosine
+similarity of at least EMBED_MIN_SIMILARITY and a lead of at least
+EMBED_MIN_MARGIN over the runner-up; otherwise the tier abstains.
+"""
+import hashlib
+import json
+import os
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+from loguru import logger
+
+EMBED_MODEL = os.getenv("EMBED_MODEL", "sentence-transformers/all-MiniLM-L6-v2")
+EMBED_CACHE_DIR = os.getenv(
+    "EMBED_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "mcp-aws-cli", "label_embeddings")
+)
+# acceptance, in cosine similarity: the best label's score and its lead over the second best
+EMBED_MIN_SIMILARITY = float(os.getenv("EMBED_MIN_SIMILARITY", "0.45"))
+EMBED_MIN_MARGIN = float(os.getenv("EMBED_MIN_MARGIN", "0.08"))
+HYPOTHESIS_TEMPLATE = "This example is {}."
+
+
+def hypothesis(label: str) -> str:
+    return HYPOTHESIS_TEMPLATE.format(label.replace("_", " "))
+
+
+class TransformerEncoder:
+    """Mean-pooled sentence embeddings from a Hugging Face encoder."""
+
+    def __init__(self, model_name: str = EMBED_MODEL, max_length: int = 64):
+        import torch
+        from transformers import AutoModel, AutoTokenizer
+
+        self.model_name = model_name
+        self.max_length = max_length
+        self._torch = torch
+        self.tokenizer = AutoTokenizer.from_pretrained(model_name)
+        self.model = AutoModel.from_pretrained(model_name)
+        self.model.eval()
+
+    def encode(self, texts: Sequence[str]) -> np.ndarray:
+        torch = self._torch
+        batch = self.tokenizer(list(texts), padding=True, truncation=True,
+                               max_length=self.max_length, return_tensors="pt")
+        with torch.no_grad():
+            hidden = self.model(**batch).last_hidden_state
+        mask = batch["attention_mask"].unsqueeze(-1).to(hidden.dtype)
+        pooled = (hidden * mask).sum(dim=1) / mask.sum(dim=1).clamp(min=1e-9)
+        return pooled.cpu().numpy().astype(np.float32)
+
+
+def _normalize(m: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(m, axis=1, keepdims=True)
+    return m / np.maximum(norms, 1e-12)
+
+
+class LabelEmbeddingClassifier:
+    def __init__(self, labels: Sequence[str], encoder=None, model_name: str = EMBED_MODEL,
+                 cache_dir: Optional[str] = EMBED_CACHE_DIR, min_similarity: float = EMBED_MIN_SIMILARITY,
+                 min_margin: float = EMBED_MIN_MARGIN):
+        self.labels = list(labels)
+        self.model_name = model_name
+        self.encoder = encoder if encoder is not None else TransformerEncoder(model_name)
+        self.cache_dir = cache_dir
+        self.min_similarity = min_similarity
+        self.min_margin = min_margin
+        self.label_matrix = self._load_label_matrix()
+
+    def cache_key(self) -> str:
+        raw = json.dumps({"model": self.model_name, "labels": self.labels, "template": HYPOTHESIS_TEMPLATE})
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:16]
+
+    def _cache_path(self) -> Optional[str]:
+        if not self.cache_dir:
+            return None
+        return os.path.join(self.cache_dir, f"{self.cache_key()}.npy")
+
+    def _load_label_matrix(self) -> np.ndarray:
+        path = self._cache_path()
+        if path and os.path.exists(path):
+            try:
+                m = np.load(path)
+                if m.shape[0] == len(self.labels):
+                    logger.info("Loaded cached label embeddings from {}", path)
+                    return m
+            except Exception as e:
+                logger.warning("Ignoring unreadable label embedding cache {}: {}", path, e)
+
+        m = _normalize(np.asarray(self.encoder.encode([hypothesis(l) for l in self.labels]), dtype=np.float32))
+        if path:
+            try:
+                os.makedirs(self.cache_dir, exist_ok=True)
+                tmp = f"{path}.{os.getpid()}.tmp"
+                with open(tmp, "wb") as f:
+                    np.save(f, m)
+                os.replace(tmp, path)
+            except OSError as e:
+                logger.warning("Could not persist label embeddings to {}: {}", path, e)
+        return m
+
+    def similarities(self, texts: Sequence[str]) -> np.ndarray:
+        """(len(texts), len(labels)) matrix of cosine similarities."""
+        q = _normalize(np.asarray(self.encoder.encode(list(texts)), dtype=np.float32))
+        return q @ self.label_matrix.T
+
+    def classify(self, texts: Sequence[str]) -> List[Tuple[str, float, float]]:
+        """(best label, its similarity, its lead over the runner-up) per text."""
+        if not texts:
+            return []
+        sims = self.similarities(texts)
+        if sims.shape[1] < 2:
+            return [(self.labels[0], float(row[0]), float(row[0])) for row in sims]
+        top2 = np.sort(sims, axis=1)[:, -2:]
+        best = sims.argmax(axis=1)
+        return [(self.labels[i], float(top2[row, 1]), float(top2[row, 1] - top2[row, 0]))
+                for row, i in enumerate(best)]
+
+    def predict(self, texts: Sequence[str]) -> List[Optional[str]]:
+        """The accepted label per text, None where the tier abstains."""
+        return [label if sim >= self.min_similarity and margin >= self.min_margin else None
+                for label, sim, margin in self.classify(texts)]
@@ -0,0 +1,196 @@
+# src/core/metrics.py
+"""In-process latency histograms and counters, rendered as Prometheus text.
+
+Deliberately tiny (no prometheus_client dependency): fixed buckets, one lock
+per metric, label values passed positionally in declaration order.
+
+    with STAGE_SECONDS.time("parse_nlp"):
+        ...
+    NLP_RESULTS.inc("ml")
+
+`render_prometheus()` backs the HTTP `/metrics` route; `metrics_summary()`
+is the compact view reported by the health_check tool.
+"""
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Sequence, Tuple
+
+from core.cache import cache_stats
+
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _fmt_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{n}="{v}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, help: str, labels: Tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = labels
+        self._lock = threading.Lock()
+        _REGISTRY.append(self)
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name, help, labels=()):
+        super().__init__(name, help, labels)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, *labels: str, amount: float = 1.0):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def _items(self):
+        with self._lock:
+            return sorted(self._values.items())
+
+    def render(self) -> List[str]:
+        return [f"{self.name}{_fmt_labels(self.labelnames, k)} {v:g}" for k, v in self._items()]
+
+    def snapshot(self) -> dict:
+        return {"/".join(k) or "total": v for k, v in self._items()}
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def set(self, value: float, *labels: str):
+        with self._lock:
+            self._values[labels] = float(value)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, help, labels=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(buckets)
+        # labels -> [per-bucket counts..., +Inf count], sum, max
+        self._series: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, seconds: float, *labels: str):
+        i = bisect_left(self.buckets, seconds)
+        with self._lock:
+            s = self._series.get(labels)
+            if s is None:
+                s = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0.0]
+            s[0][i] += 1
+            s[1] += seconds
+            s[2] = max(s[2], seconds)
+
+    @contextmanager
+    def time(self, *labels: str):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - t0, *labels)
+
+    def _items(self):
+        with self._lock:
+            return sorted((k, (list(c), total, peak)) for k, (c, total, peak) in self._series.items())
+
+    def render(self) -> List[str]:
+        out = []
+        for labels, (counts, total, _) in self._items():
+            cumulative = 0
+            for le, c in zip(self.buckets, counts):
+                cumulative += c
+                bucket = _fmt_labels(self.labelnames, labels, 'le="%g"' % le)
+                out.append(f"{self.name}_bucket{bucket} {cumulative}")
+            cumulative += counts[-1]
+            bucket = _fmt_labels(self.labelnames, labels, 'le="+Inf"')
+            out.append(f"{self.name}_bucket{bucket} {cumulative}")
+            out.append(f"{self.name}_sum{_fmt_labels(self.labelnames, labels)} {total:.6f}")
+            out.append(f"{self.name}_count{_fmt_labels(self.labelnames, labels)} {cumulative}")
+        return out
+
+    def _quantile(self, counts: List[int], q: float) -> float:
+        # upper bound of the bucket holding the q-th observation
+        target, seen = q * sum(counts), 0
+        for le, c in zip(self.buckets, counts):
+            seen += c
+            if seen >= target:
+                return le
+        return float("inf")
+
+    def snapshot(self) -> dict:
+        out = {}
+        for labels, (counts, total, peak) in self._items():
+            n = sum(counts)
+            out["/".join(labels) or "total"] = {
+                "count": n,
+                "avg_ms": round(total / n * 1000, 3) if n else 0.0,
+                "p95_ms_le": round(self._quantile(counts, 0.95) * 1000, 3),
+                "max_ms": round(peak * 1000, 3),
+            }
+        return out
+
+
+_REGISTRY: List[_Metric] = []
+_COLLECTORS: List[Callable[[], List[str]]] = []
+
+
+def register_collector(fn: Callable[[], List[str]]):
+    """`fn()` returns extra exposition lines computed at scrape time."""
+    _COLLECTORS.append(fn)
+
+
+STAGE_SECONDS = Histogram("mcp_stage_seconds", "Time spent per request stage.", ("stage",))
+NLP_TIER_SECONDS = Histogram("mcp_nlp_tier_seconds", "Time spent per NLP tier attempt.", ("tier",))
+NLP_RESULTS = Counter("mcp_nlp_results_total", "Parses by the tier that produced the intent.", ("tier",))
+NLP_FALLTHROUGH = Counter("mcp_nlp_fallthrough_total", "NLP tiers that produced no label.", ("tier", "reason"))
+NLP_SKIPPED = Counter("mcp_nlp_tier_skipped_total", "NLP tier calls avoided because an earlier tier answered.",
+                      ("tier",))
+SEMANTIC_AUDITS = Counter("mcp_semantic_cache_audits_total", "Audited semantic cache hits by outcome.",
+                          ("outcome",))
+AWS_API_SECONDS = Histogram("mcp_aws_api_seconds", "AWS API call latency.", ("service", "operation"))
+AWS_API_ERRORS = Counter("mcp_aws_api_errors_total", "AWS API calls that returned an error.",
+                         ("service", "operation", "code"))
+MODEL_LOAD_SECONDS = Gauge("mcp_model_load_seconds", "Time taken to load each NLP engine.", ("engine",))
+
+
+def _cache_lines() -> List[str]:
+    stats = cache_stats()
+    lines = []
+    for metric, kind, key in (("mcp_cache_hits_total", "counter", "hits"),
+                              ("mcp_cache_misses_total", "counter", "misses"),
+                              ("mcp_cache_hit_ratio", "gauge", "hit_rate"),
+                              ("mcp_cache_entries", "gauge", "size"),
+                              ("mcp_cache_backend_errors_total", "counter", "errors")):
+        lines.append(f"# TYPE {metric} {kind}")
+        # shared backends may not know their size; in-process ones have no errors
+        lines.extend(f'{metric}{{cache="{name}",backend="{s["backend"]}"}} {s[key]:g}'
+                     for name, s in sorted(stats.items()) if s.get(key) is not None)
+    return lines
+
+
+register_collector(_cache_lines)
+
+
+def render_prometheus() -> str:
+    lines: List[str] = []
+    for m in _REGISTRY:
+        lines.extend(m.header())
+        lines.extend(m.render())
+    for collect in _COLLECTORS:
+        lines.extend(collect())
+    return "\n".join(lines) + "\n"
+
+
+def metrics_summary() -> dict:
+    return {m.name: m.snapshot() for m in _REGISTRY}
@@ -0,0 +1,137 @@
+# src/core/model_loader.py
+"""Lifecycle of the lazily loaded NLP engines.
+
+A `ModelLoader` wraps a zero-argument factory:
+
+- initialization runs once, under a lock, so concurrent first requests wait for
+  a single load instead of each building their own pipeline;
+- a failed load is remembered and not retried until a backoff expires
+  (`retry_backoff_seconds`, doubling per failure up to `max_backoff_seconds`),
+  so a missing dependency doesn't cost a heavy import on every query;
+- `warm_up()` loads (and optionally exercises) the model ahead of the first
+  request, in a background thread by default;
+- load time and first-inference time are kept for `health_check` / `/health`.
+
+Settings live under `models` in defaults.json (env MODEL_WARMUP,
+MODEL_RETRY_BACKOFF, MODEL_MAX_BACKOFF).
+"""
+import os
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+from loguru import logger
+
+from config.settings import CONFIG
+from core.metrics import MODEL_LOAD_SECONDS
+
+_cfg = CONFIG.get("models", {})
+MODEL_WARMUP = str(os.getenv("MODEL_WARMUP", _cfg.get("warmup", False))).lower() in ("1", "true", "yes")
+RETRY_BACKOFF = float(os.getenv("MODEL_RETRY_BACKOFF", _cfg.get("retry_backoff_seconds", 30)))
+MAX_BACKOFF = float(os.getenv("MODEL_MAX_BACKOFF", _cfg.get("max_backoff_seconds", 600)))
+
+# states reported by stats()
+COLD, LOADING, READY, FAILED = "cold", "loading", "ready", "failed"
+
+
+class ModelLoader:
+    def __init__(self, name: str, factory: Callable[[], object],
+                 retry_backoff: float = RETRY_BACKOFF, max_backoff: float = MAX_BACKOFF):
+        self.name = name
+        self.factory = factory
+        self.retry_backoff = retry_backoff
+        self.max_backoff = max_backoff
+        self._model = None
+        self._lock = threading.Lock()
+        self._state = COLD
+        self._failures = 0
+        self._retry_at = 0.0
+        self._last_error: Optional[str] = None
+        self._load_seconds: Optional[float] = None
+        self._first_inference_seconds: Optional[float] = None
+        self._warmup: Optional[threading.Thread] = None
+
+    @property
+    def ready(self) -> bool:
+        return self._model is not None
+
+    @property
+    def backing_off(self) -> bool:
+        """A load failed and get() won't try again until the backoff expires."""
+        return self._state == FAILED and time.monotonic() < self._retry_at
+
+    def get(self):
+        """The loaded model, or None while a previous failure is backing off."""
+        model = self._model
+        if model is not None:
+            return model
+        if self.backing_off:
+            return None
+        with self._lock:
+            if self._model is not None:
+                return self._model
+            if self.backing_off:
+                return None
+            self._state = LOADING
+            t0 = time.perf_counter()
+            try:
+                model = self.factory()
+            except Exception as e:
+                self._failed(e)
+                return None
+            self._load_seconds = time.perf_counter() - t0
+            MODEL_LOAD_SECONDS.set(self._load_seconds, self.name)
+            self._model, self._state, self._failures, self._last_error = model, READY, 0, None
+            logger.info("{} model loaded in {:.2f}s", self.name, self._load_seconds)
+            return model
+
+    def _failed(self, e: Exception):
+        self._failures += 1
+        backoff = min(self.max_backoff, self.retry_backoff * 2 ** (self._failures - 1))
+        self._retry_at = time.monotonic() + backoff
+        self._state, self._last_error = FAILED, f"{type(e).__name__}: {e}"
+        logger.warning("{} model failed to load ({}); retrying in {:.1f}s", self.name, self._last_error, backoff)
+
+    def record_inference(self, seconds: float):
+        if self._first_inference_seconds is None:
+            self._first_inference_seconds = seconds
+
+    def warm_up(self, exercise: Optional[Callable[[], object]] = None, background: bool = True):
+        """Load now; `exercise()` then runs one throwaway inference so lazy
+        allocations happen before the first real request."""
+        def _run():
+            if self.get() is None or exercise is None:
+                return
+            try:
+                exercise()
+            except Exception as e:
+                logger.warning("{} warm-up inference failed: {}", self.name, e)
+
+        if not background:
+            _run()
+            return None
+        if self._warmup is None or not self._warmup.is_alive():
+            self._warmup = threading.Thread(target=_run, name=f"warmup-{self.name}", daemon=True)
+            self._warmup.start()
+        return self._warmup
+
+    def set(self, model):
+        """Install an already-built model (benchmarks, tests)."""
+        with self._lock:
+            self._model, self._state, self._failures = model, READY, 0
+
+    def reset(self):
+        with self._lock:
+            self._model, self._state, self._failures, self._retry_at = None, COLD, 0, 0.0
+
+    def stats(self) -> Dict:
+        out = {
+            "state": self._state,
+            "ready": self.ready,
+            "load_seconds": self._load_seconds,
+            "first_inference_seconds": self._first_inference_seconds,
+        }
+        if self._state == FAILED:
+            out.update(failures=self._failures, last_error=self._last_error,
+                       retry_in_seconds=round(max(0.0, self._retry_at - time.monotonic()), 1))
+        return out
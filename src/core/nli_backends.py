@@ -0,0 +1,128 @@
+# src/core/nli_backends.py
+"""Cheaper inference backends for the zero-shot NLI intent classifier.
+
+`ML_BACKEND` picks how `bart-large-mnli` (or `NLI_MODEL`) is run:
+
+- `pytorch` (default): the transformers zero-shot pipeline, full precision.
+- `quantized`: the same weights with Linear layers dynamically quantized to
+  int8 (`torch.quantization.quantize_dynamic`); no export step.
+- `onnx`: an exported ONNX graph run with ONNX Runtime (`ONNX_MODEL_DIR`, see
+  `python scripts/export_onnx.py`). Needs onnxruntime and a tokenizer, not torch.
+
+The non-pipeline backends are called like the pipeline
+(`backend(texts, candidate_labels=..., multi_label=False)`) and return the same
+`{"sequence", "labels", "scores"}` dicts, so `nlp_utils._top_label` and the
+confidence threshold apply unchanged. As in the pipeline, single-label scores
+are a softmax of the entailment logits across the candidate labels.
+"""
+import os
+from typing import List, Sequence
+
+import numpy as np
+
+NLI_MODEL = os.getenv("NLI_MODEL", "facebook/bart-large-mnli")
+ONNX_MODEL_DIR = os.getenv("ONNX_MODEL_DIR", os.path.join("models", "bart-large-mnli-onnx"))
+ONNX_THREADS = int(os.getenv("ONNX_THREADS", "0"))  # 0 = onnxruntime default
+NLI_BATCH_PAIRS = int(os.getenv("NLI_BATCH_PAIRS", "64"))
+HYPOTHESIS_TEMPLATE = "This example is {}."  # the pipeline's default template
+
+BACKENDS = ("pytorch", "quantized", "onnx")
+
+
+def _softmax(x: np.ndarray, axis: int = -1) -> np.ndarray:
+    e = np.exp(x - x.max(axis=axis, keepdims=True))
+    return e / e.sum(axis=axis, keepdims=True)
+
+
+def _label_index(config, name: str, default: int) -> int:
+    for label, idx in (getattr(config, "label2id", None) or {}).items():
+        if label.lower().startswith(name):
+            return int(idx)
+    return default
+
+
+class ZeroShotNLI:
+    """Pipeline-compatible zero-shot classification over (premise, hypothesis) logits."""
+
+    def __init__(self, tokenizer, config, max_length: int = 128):
+        self.tokenizer = tokenizer
+        self.max_length = max_length
+        self.entailment_id = _label_index(config, "entail", 2)
+        self.contradiction_id = _label_index(config, "contra", 0)
+
+    def _logits(self, premises: List[str], hypotheses: List[str]) -> np.ndarray:
+        raise NotImplementedError
+
+    def __call__(self, texts, candidate_labels: Sequence[str], multi_label: bool = False):
+        single = isinstance(texts, str)
+        texts = [texts] if single else list(texts)
+        labels = list(candidate_labels)
+        premises = [t for t in texts for _ in labels]
+        hypotheses = [HYPOTHESIS_TEMPLATE.format(lbl) for _ in texts for lbl in labels]
+        chunks = [self._logits(premises[i:i + NLI_BATCH_PAIRS], hypotheses[i:i + NLI_BATCH_PAIRS])
+                  for i in range(0, len(premises), NLI_BATCH_PAIRS)]
+        logits = np.concatenate(chunks).reshape(len(texts), len(labels), -1)
+        if multi_label:
+            pair = logits[..., [self.contradiction_id, self.entailment_id]]
+            scores = _softmax(pair)[..., 1]
+        else:
+            scores = _softmax(logits[..., self.entailment_id])
+        out = []
+        for text, row in zip(texts, scores):
+            order = np.argsort(-row)
+            out.append({"sequence": text, "labels": [labels[i] for i in order],
+                        "scores": [float(row[i]) for i in order]})
+        return out[0] if single else out
+
+
+class QuantizedTorchNLI(ZeroShotNLI):
+    def __init__(self, model_name: str = NLI_MODEL):
+        import torch
+        from transformers import AutoModelForSequenceClassification, AutoTokenizer
+
+        model = AutoModelForSequenceClassification.from_pretrained(model_name)
+        model.eval()
+        self._torch = torch
+        self.model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+        super().__init__(AutoTokenizer.from_pretrained(model_name), model.config)
+
+    def _logits(self, premises, hypotheses):
+        batch = self.tokenizer(premises, hypotheses, padding=True, truncation="only_first",
+                               max_length=self.max_length, return_tensors="pt")
+        with self._torch.no_grad():
+            return self.model(**batch).logits.cpu().numpy()
+
+
+class OnnxNLI(ZeroShotNLI):
+    def __init__(self, model_dir: str = ONNX_MODEL_DIR):
+        import onnxruntime as ort
+        from transformers import AutoConfig, AutoTokenizer
+
+        path = os.path.join(model_dir, "model.onnx")
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"{path} not found; run scripts/export_onnx.py first")
+        opts = ort.SessionOptions()
+        if ONNX_THREADS:
+            opts.intra_op_num_threads = ONNX_THREADS
+        self.session = ort.InferenceSession(path, opts, providers=["CPUExecutionProvider"])
+        self._inputs = {i.name for i in self.session.get_inputs()}
+        super().__init__(AutoTokenizer.from_pretrained(model_dir), AutoConfig.from_pretrained(model_dir))
+
+    def _logits(self, premises, hypotheses):
+        batch = self.tokenizer(premises, hypotheses, padding=True, truncation="only_first",
+                               max_length=self.max_length, return_tensors="np")
+        feed = {k: v.astype(np.int64) for k, v in batch.items() if k in self._inputs}
+        return self.session.run(None, feed)[0]
+
+
+def load_zero_shot(backend: str):
+    """Build the zero-shot classifier for `backend` (one of BACKENDS)."""
+    if backend == "pytorch":
+        import torch  # noqa: F401  (fail fast before transformers falls back to another framework)
+        from transformers import pipeline
+        return pipeline("zero-shot-classification", model=NLI_MODEL)
+    if backend == "quantized":
+        return QuantizedTorchNLI()
+    if backend == "onnx":
+        return OnnxNLI()
+    raise ValueError(f"Unknown ML_BACKEND {backend!r}; expected one of {', '.join(BACKENDS)}")
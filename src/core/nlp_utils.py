@@ -1,164 +1,614 @@
 # src/core/nlp_utils.py
+import asyncio
+import copy
+import json
 import os
-import re
-from typing import Tuple, Dict
+import threading
+import time
+from contextvars import ContextVar
+from typing import Tuple, Dict, List, Optional
 from loguru import logger
 
+from config.settings import CONFIG
+from core import intent_registry, intent_rules
+from core.batching import MicroBatcher
+from core.cache import cache_config, create_cache, make_key
+from core.exceptions import StageTimeout, TierUnavailable
+from core.execution import get_stage
+from core.metrics import (NLP_FALLTHROUGH, NLP_RESULTS, NLP_SKIPPED, NLP_TIER_SECONDS, SEMANTIC_AUDITS, STAGE_SECONDS,
+                          metrics_summary)
+from core.model_loader import MODEL_WARMUP, ModelLoader
+
+_cascade = CONFIG.get("cascade", {})
+
 ENABLE_ML = os.getenv("ENABLE_ML", "true").lower() in ("1","true","yes")
-NLP_MODE = os.getenv("NLP_MODE", "local").lower()  # local | haiku
-ML_CONF_THRESHOLD = float(os.getenv("ML_CONF_THRESHOLD", "0.7"))
+NLP_MODE = os.getenv("NLP_MODE", "local").lower()  # local | embedding | haiku
+ML_CONF_THRESHOLD = float(os.getenv("ML_CONF_THRESHOLD", CONFIG.get("ml_confidence_threshold", 0.7)))
+ML_BACKEND = os.getenv("ML_BACKEND", "pytorch").lower()  # zero-shot runtime: pytorch | quantized | onnx
+
+# cascade: a rule match at or above RULES_CONF_THRESHOLD (see intent_rules.confidence) is answered
+# at once; anything weaker escalates through the model tiers in CASCADE_ORDER (> 1 disables the exit)
+RULES_CONF_THRESHOLD = float(os.getenv("RULES_CONF_THRESHOLD", _cascade.get("rules_threshold", 0.9)))
+CASCADE_ORDER = [t.strip() for t in os.getenv("NLP_CASCADE_ORDER", ",".join(_cascade.get("order", ["ml", "haiku"])))
+                 .lower().split(",") if t.strip()]
+
+# micro-batching of concurrent ML classifications (see parse_nlp_async)
+ML_BATCHING = os.getenv("ML_BATCHING", "true").lower() in ("1","true","yes")
+ML_BATCH_MAX_SIZE = int(os.getenv("ML_BATCH_MAX_SIZE", "16"))
+ML_BATCH_WINDOW_MS = float(os.getenv("ML_BATCH_WINDOW_MS", "5"))
+
+# bump to invalidate shared (sqlite / redis) parse caches after a model or rule change
+NLP_MODEL_VERSION = os.getenv("NLP_MODEL_VERSION") or os.getenv(
+    "EMBED_MODEL" if NLP_MODE == "embedding" else "NLI_MODEL", "default")
+
+# memoized parse results, keyed on whitespace-normalized text + mode (NLP_CACHE_ENABLED=false to disable)
+_nlp_cache = create_cache("nlp", "NLP_CACHE_ENABLED", default_size=2048, default_ttl=3600,
+                          namespace=f"{NLP_MODE}:{ML_BACKEND}:{NLP_MODEL_VERSION}")
+# nearest-neighbour intent cache in front of the model tiers (see core.semantic_cache)
+_semantic_cfg = cache_config("semantic")
+SEMANTIC_CACHE_ENABLED = os.getenv("SEMANTIC_CACHE_ENABLED", str(_semantic_cfg.get("enabled", False))).lower() \
+    in ("1", "true", "yes")
+SEMANTIC_CACHE_MODEL = os.getenv("SEMANTIC_CACHE_MODEL",
+                                 _semantic_cfg.get("model", "sentence-transformers/all-MiniLM-L6-v2"))
+
+# JSON lines of {"query": ...} parsed into the cache at server start (see prewarm_cache)
+NLP_PREWARM_FILE = os.getenv("NLP_CACHE_PREWARM_FILE") or cache_config("nlp").get("prewarm_file")
+
+def _load_zero_shot():
+    # pytorch | quantized | onnx; see core.nli_backends
+    from core.nli_backends import load_zero_shot
+    return load_zero_shot(ML_BACKEND)
+
+def _load_embedding():
+    from core.label_embeddings import LabelEmbeddingClassifier
+    return LabelEmbeddingClassifier(INTENTS)
+
+def _load_semantic_encoder():
+    from core.label_embeddings import TransformerEncoder
+    return TransformerEncoder(SEMANTIC_CACHE_MODEL)
+
+# lazily loaded engines: single locked init, failures back off (see core.model_loader)
+_zero_shot_model = ModelLoader("zero-shot", _load_zero_shot)
+_embedding_model = ModelLoader("embedding", _load_embedding)
+_semantic_encoder = ModelLoader("semantic-encoder", _load_semantic_encoder)
 
-# lazy classifier for local zero-shot
-_classifier = None
 def _get_local_classifier():
-    global _classifier
-    if _classifier:
-        return _classifier
-    if not ENABLE_ML:
-        return None
-    try:
-        # Ensure PyTorch is available before using transformers' PyTorch-based pipelines.
-        try:
-            import torch  # noqa: F401
-        except Exception:
-            logger.warning("PyTorch not available; skipping local ML classifier")
-            _classifier = None
-            return _classifier
-
-        from transformers import pipeline
-        _classifier = pipeline("zero-shot-classification", model="facebook/bart-large-mnli")
-        logger.info("Local ML classifier initialized")
-    except Exception as e:
-        logger.exception("Failed to init local classifier: %s", e)
-        _classifier = None
-    return _classifier
+    return _zero_shot_model.get() if ENABLE_ML else None
+
+def _get_embedding_classifier():
+    return _embedding_model.get() if ENABLE_ML else None
+
+def _active_model() -> ModelLoader:
+    return _embedding_model if NLP_MODE == "embedding" else _zero_shot_model
+
+def _load_haiku():
+    from config.secrets import get_secret
+    from core.haiku_client import HaikuClassifier
+    key = get_secret("ANTHROPIC_API_KEY")
+    if not key:
+        raise RuntimeError("Haiku enabled but ANTHROPIC_API_KEY not set")
+    return HaikuClassifier(INTENTS, api_key=key)
+
+# Haiku tier: one shared client (keep-alive, timeouts, retries, breaker; see core.haiku_client)
+_haiku_model = ModelLoader("haiku", _load_haiku)
 
-# anthropic client (Haiku fallback)
-_haiku_client = None
 def _get_haiku_client():
-    global _haiku_client
-    if _haiku_client:
-        return _haiku_client
-    if NLP_MODE != "haiku":
-        return None
+    return _haiku_model.get() if NLP_MODE == "haiku" else None
+
+# classifier label set; "unknown" lets the model abstain
+INTENTS = intent_registry.INTENTS + ["unknown"]
+
+def _rule_intent_and_entities(text: str) -> Tuple[str, Dict]:
+    return intent_rules.classify(text)
+
+def _top_label(res) -> Optional[str]:
+    # bart-large-mnli returns dict with labels + scores
+    labels = res.get("labels", [])
+    scores = res.get("scores", [])
+    if labels and scores and float(scores[0]) >= ML_CONF_THRESHOLD:
+        return labels[0]
+    return None
+
+def _embedding_intent_batch(texts: List[str]) -> List[Optional[str]]:
+    if not texts:
+        return []
+    classifier = _get_embedding_classifier()
+    if classifier is None:
+        raise TierUnavailable("ml", "embedding model not loaded")
     try:
-        from anthropic import Anthropic
-        key = os.getenv("ANTHROPIC_API_KEY")
-        if not key:
-            logger.warning("Haiku enabled but ANTHROPIC_API_KEY not set")
-            return None
-        _haiku_client = Anthropic(api_key=key)
-        logger.info("Anthropic Haiku client initialized")
+        t0 = time.perf_counter()
+        # accepted on its own cosine thresholds (EMBED_MIN_SIMILARITY / EMBED_MIN_MARGIN), not ML_CONF_THRESHOLD
+        labels = classifier.predict(texts)
+        _embedding_model.record_inference(time.perf_counter() - t0)
+        return labels
     except Exception as e:
-        logger.exception("Failed to init anthropic client: %s", e)
-        _haiku_client = None
-    return _haiku_client
-
-INTENTS = [
-    "create_s3_bucket", "list_s3_buckets",
-    "create_dynamodb_table", "list_dynamodb_tables",
-    "start_ec2_instance", "stop_ec2_instance", "list_ec2_instances", "describe_ec2_instances",
-    "create_iam_user", "list_iam_users",
-    "invoke_lambda", "list_lambda_functions",
-    "unknown"
-]
+        logger.exception("Embedding classification failed: {}", e)
+        raise TierUnavailable("ml", str(e)) from e
 
-def _rule_intent_and_entities(text: str) -> Tuple[str, Dict]:
-    t = text.lower()
-    r = re.search(r"(?:in\s+|region\s+)(us-[a-z0-9-]+)", t)
-    region = r.group(1) if r else None
-
-    # S3
-    if re.search(r"\b(create|make)\b.*\b(s3|bucket)\b", t):
-        m = re.search(r"(?:named|called|name(?:d)?|bucket\s+named|bucket\s+)([a-z0-9][a-z0-9\-\.]{2,62})", t)
-        bucket = m.group(1) if m else None
-        return "create_s3_bucket", {"bucket": bucket, "region": region}
-    if re.search(r"\b(list|show)\b.*\b(s3|buckets)\b", t):
-        return "list_s3_buckets", {"region": region}
-
-    # DynamoDB
-    if re.search(r"\b(create|make)\b.*\b(dynamo|dynamodb|table)\b", t):
-        m = re.search(r"(?:table\s+named|table\s+)([A-Za-z0-9_\-]+)", t)
-        return "create_dynamodb_table", {"table": m.group(1) if m else None, "region": region}
-    if re.search(r"\b(list|show)\b.*\b(dynamo|tables)\b", t):
-        return "list_dynamodb_tables", {"region": region}
-
-    # EC2
-    m_start = re.search(r"\b(start|run)\b.*\b(ec2|instance)\b.*\b(i-[0-9a-fA-F]+)\b", t)
-    if m_start:
-        return "start_ec2_instance", {"instance_id": m_start.group(3), "region": region}
-    m_stop = re.search(r"\b(stop|terminate)\b.*\b(ec2|instance)\b.*\b(i-[0-9a-fA-F]+)\b", t)
-    if m_stop:
-        return "stop_ec2_instance", {"instance_id": m_stop.group(3), "region": region}
-    if re.search(r"\b(list|show|describe)\b.*\b(ec2|instances)\b", t):
-        m_tag = re.search(r"tag\s+([A-Za-z0-9\-_]+)=([A-Za-z0-9\-_]+)", t)
-        tag = {m_tag.group(1): m_tag.group(2)} if m_tag else None
-        return "describe_ec2_instances", {"region": region, "tag": tag}
-
-    # IAM
-    if re.search(r"\b(create|add)\b.*\b(iam|user)\b", t):
-        m = re.search(r"(?:user\s+named|user\s+)([A-Za-z0-9_\-]+)", t)
-        return "create_iam_user", {"user": m.group(1) if m else None}
-    if re.search(r"\b(list|show)\b.*\b(iam|users)\b", t):
-        return "list_iam_users", {}
-
-    # Lambda
-    if re.search(r"\b(invoke|call)\b.*\b(lambda)\b", t):
-        m = re.search(r"(?:function\s+named|function\s+|named\s+)([A-Za-z0-9_\-]+)", t)
-        return "invoke_lambda", {"function": m.group(1) if m else None, "region": region}
-    if re.search(r"\b(list|show)\b.*\b(lambda|functions)\b", t):
-        return "list_lambda_functions", {"region": region}
-
-    return ("unknown", {})
+def _ml_intent_batch(texts: List[str]) -> List[Optional[str]]:
+    """Classify several queries with a single model call. None means no
+    confident label; TierUnavailable means the model could not run at all."""
+    if NLP_MODE == "embedding":
+        return _embedding_intent_batch(texts)
+    return _zero_shot_intent_batch(texts)
 
-def _ml_intent(text: str):
+def _zero_shot_intent_batch(texts: List[str]) -> List[Optional[str]]:
+    if not texts:
+        return []
     classifier = _get_local_classifier()
-    if not classifier:
-        return None
+    if classifier is None:
+        raise TierUnavailable("ml", "zero-shot model not loaded")
     try:
-        res = classifier(text, candidate_labels=INTENTS, multi_label=False)
-        # bart-large-mnli returns dict with labels + scores
-        labels = res.get("labels", [])
-        scores = res.get("scores", [])
-        if labels and scores and float(scores[0]) >= ML_CONF_THRESHOLD:
-            return labels[0]
+        t0 = time.perf_counter()
+        res = classifier(list(texts), candidate_labels=INTENTS, multi_label=False)
+        _zero_shot_model.record_inference(time.perf_counter() - t0)
+        # a single sequence comes back as a dict rather than a list
+        if isinstance(res, dict):
+            res = [res]
+        return [_top_label(r) for r in res]
     except Exception as e:
-        logger.exception("ML classification failed: %s", e)
-    return None
+        logger.exception("ML classification failed: {}", e)
+        raise TierUnavailable("ml", str(e)) from e
+
+def _ml_intent(text: str):
+    return _ml_intent_batch([text])[0]
+
+_ml_batcher = None
+def _get_ml_batcher() -> MicroBatcher:
+    global _ml_batcher
+    if _ml_batcher is None:
+        _ml_batcher = MicroBatcher(_ml_intent_batch, max_batch_size=ML_BATCH_MAX_SIZE,
+                                   max_wait_ms=ML_BATCH_WINDOW_MS, name="ml_intent",
+                                   executor=get_stage("classify").executor)
+    return _ml_batcher
+
+def batch_stats() -> dict:
+    if _ml_batcher is None:
+        return {"enabled": ML_BATCHING, "batches": 0, "items": 0}
+    return {"enabled": ML_BATCHING, **_ml_batcher.stats()}
 
 def _haiku_intent(text: str):
-    client = _get_haiku_client()
-    if not client:
+    classifier = _get_haiku_client()
+    if classifier is None:
+        raise TierUnavailable("haiku", "client not loaded")
+    return classifier.classify(text)
+
+def haiku_stats() -> dict:
+    classifier = _haiku_model.get() if _haiku_model.ready else None
+    return {"enabled": NLP_MODE == "haiku", **_haiku_model.stats(), **(classifier.stats() if classifier else {})}
+
+def warm_up(background: bool = True):
+    """Load the active ML engine and run one throwaway classification
+    (and one encoder pass when the semantic cache is on). The engine is warmed
+    whenever weak matches escalate to the ml tier, in haiku mode too."""
+    if _get_semantic_cache() is not None:
+        _semantic_encoder.warm_up(lambda: _semantic_encode(["list my s3 buckets"]), background=background)
+    if "ml" not in _escalation_tiers():
         return None
-    try:
-        prompt = f"Extract intent from this user request. Return a single label from: {', '.join(INTENTS)}. Request: {text}\nLabel:"
-        resp = client.completions.create(model="claude-3-haiku", prompt=prompt, max_tokens_to_sample=32)
-        lbl = resp.completion.strip().split()[0]
-        if lbl in INTENTS:
-            return lbl
-    except Exception as e:
-        logger.exception("Haiku classification failed: %s", e)
-    return None
+    return _active_model().warm_up(lambda: _ml_intent_batch(["list my s3 buckets"]), background=background)
+
+def after_fork():
+    """Drop state a forked worker must not share with its parent. The local
+    model stays (shared copy-on-write); the Haiku client's keep-alive
+    connections would be shared sockets, so each worker builds its own. The
+    micro-batcher holds the parent's classify executor, whose threads didn't
+    survive the fork, so it is rebuilt on the worker's own stage."""
+    global _ml_batcher
+    _haiku_model.reset()
+    _ml_batcher = None
+
+def model_status() -> dict:
+    """Readiness of the local engine when the ml tier is in the cascade; the
+    rule and Haiku tiers have nothing to load."""
+    tiers = _escalation_tiers()
+    if "ml" not in tiers:
+        return {"engine": "haiku" if tiers else "rules", "tiers": tiers, "ready": True}
+    model = _active_model()
+    return {"engine": model.name, "tiers": tiers, "warmup": MODEL_WARMUP, **model.stats()}
 
 def nlp_mode_summary():
-    return {"mode": NLP_MODE, "enable_ml": ENABLE_ML}
+    return {"mode": NLP_MODE, "enable_ml": ENABLE_ML,
+            "engine": "label-embedding" if NLP_MODE == "embedding" else "zero-shot",
+            "backend": None if NLP_MODE == "embedding" else ML_BACKEND}
+
+def _nlp_cache_key(text: str) -> str:
+    return make_key(" ".join(text.split()), NLP_MODE, ENABLE_ML)
+
+def _cache_lookup(key: str):
+    if _nlp_cache is None:
+        return None
+    hit = _nlp_cache.get(key)
+    if hit is None:
+        return None
+    intent, entities = hit
+    return intent, copy.deepcopy(entities)
+
+def _cache_store(key: str, result: Tuple[str, Dict]) -> Tuple[str, Dict]:
+    if _nlp_cache is not None:
+        _nlp_cache.set(key, (result[0], copy.deepcopy(result[1])))
+    return result
+
+def prewarm_cache(path: Optional[str] = NLP_PREWARM_FILE, background: bool = True):
+    """Parse every query in `path` (e.g. the hot-query export of
+    scripts/telemetry_report.py) so their first real request is a cache hit.
+    Semantic hits met on the way are not audited: a synchronous prewarm runs in
+    the pre-fork parent, whose executors the workers can't use."""
+    if not path or _nlp_cache is None:
+        return None
+
+    def run():
+        n = 0
+        token = _auditing.set(False)
+        try:
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    query = json.loads(line).get("query") if line.strip() else None
+                    if query:
+                        parse_nlp(query)
+                        n += 1
+        except Exception as e:
+            logger.warning("Parse cache prewarm from {} stopped: {}", path, e)
+        finally:
+            _auditing.reset(token)
+        logger.info("Prewarmed the parse cache with {} queries from {}", n, path)
+
+    if not background:
+        return run()
+    thread = threading.Thread(target=run, name="nlp-prewarm", daemon=True)
+    thread.start()
+    return thread
+
+# tier that answered the current context's last parse (reported in telemetry)
+_parse_tier: ContextVar[Optional[str]] = ContextVar("parse_tier", default=None)
+# whether semantic hits in this context may be sent to audit (off while prewarming)
+_auditing: ContextVar[bool] = ContextVar("semantic_auditing", default=True)
+
+def last_parse_tier() -> Optional[str]:
+    """"cache", "rules", "ml", "haiku" or "fallback" for the last parse in this context."""
+    return _parse_tier.get()
+
+def _tier_result(tier: str, lbl: Optional[str], reason: str = "no_label") -> Optional[str]:
+    # per-tier outcome counters behind /metrics; reason: no_label | timeout | unavailable
+    if lbl:
+        NLP_RESULTS.inc(tier)
+        _parse_tier.set(tier)
+    else:
+        NLP_FALLTHROUGH.inc(tier, reason)
+    return lbl
+
+def _escalation_tiers() -> List[str]:
+    """Model tiers a weak rule match escalates to, cheapest first by default."""
+    enabled = {"ml": ENABLE_ML, "haiku": NLP_MODE == "haiku"}
+    return [t for t in CASCADE_ORDER if enabled.get(t)]
+
+def _cascade_order() -> List[str]:
+    semantic = ["semantic"] if SEMANTIC_CACHE_ENABLED and _escalation_tiers() else []
+    return ["rules"] + semantic + _escalation_tiers()
+
+def _skipped(tiers: List[str]):
+    for tier in tiers:
+        NLP_SKIPPED.inc(tier)
+
+def _confident_rule(sc, tiers: List[str]) -> Optional[Tuple[str, Dict]]:
+    """The rule tier's answer if it clears RULES_CONF_THRESHOLD, else None."""
+    with NLP_TIER_SECONDS.time("rules"):
+        if intent_rules.confidence(sc) < RULES_CONF_THRESHOLD:
+            NLP_FALLTHROUGH.inc("rules", "low_confidence")
+            return None
+        intent = intent_rules.match_intent(sc)
+        NLP_RESULTS.inc("rules")
+        _parse_tier.set("rules")
+        _skipped(tiers)
+        return intent, intent_rules.extract_entities(intent, sc)
+
+_semantic_cache = None
+_semantic_lock = threading.Lock()
+
+def _semantic_encode(texts: List[str]):
+    encoder = _semantic_encoder.get()
+    return encoder.encode(texts) if encoder is not None else None
+
+def _get_semantic_cache():
+    """The semantic cache, or None when it is off or no model tier is enabled."""
+    global _semantic_cache
+    if not SEMANTIC_CACHE_ENABLED or not _escalation_tiers():
+        return None
+    if _semantic_cache is None:
+        with _semantic_lock:
+            if _semantic_cache is None:
+                # numpy is only imported once the cache is in use
+                from core.semantic_cache import create_semantic_cache
+                fingerprint = make_key(SEMANTIC_CACHE_MODEL, INTENTS)
+                _semantic_cache = create_semantic_cache(_semantic_encode, fingerprint)
+    return _semantic_cache
+
+def _semantic_match(texts: List[str]):
+    """(hits, vectors): the cached intent per text (None on a miss) and the
+    embeddings to store the tier's answers under. Blocking: one encoder pass."""
+    cache = _get_semantic_cache()
+    if cache is None or not texts:
+        return [None] * len(texts), None
+    with NLP_TIER_SECONDS.time("semantic"):
+        vectors = cache.encode(texts)
+        if vectors is None:
+            return [None] * len(texts), None
+        return cache.lookup(vectors), vectors
+
+async def _semantic_match_async(texts: List[str]):
+    if _get_semantic_cache() is None or not texts:
+        return [None] * len(texts), None
+    try:
+        return await get_stage("semantic").run(_semantic_match, texts)
+    except StageTimeout as e:
+        logger.warning("{}; asking the model tiers", e)
+        for _ in texts:
+            NLP_FALLTHROUGH.inc("semantic", "timeout")
+        return [None] * len(texts), None
+
+def _semantic_record(texts: List[str], hits, vectors, tiers: List[str]):
+    """Count hits and misses, and send a sample of the hits to audit."""
+    if vectors is None:
+        return
+    for text, hit, vector in zip(texts, hits, vectors):
+        if hit is None:
+            NLP_FALLTHROUGH.inc("semantic", "no_match")
+            continue
+        NLP_RESULTS.inc("semantic")
+        _parse_tier.set("semantic")
+        _skipped(tiers)
+        if _auditing.get() and _semantic_cache.should_audit():
+            _semantic_audit(hit, text, vector, tiers[0])
+
+def _semantic_audit(hit, text: str, vector, tier: str):
+    """Re-classify a hit with `tier` off the request path and score the cached intent."""
+    def done(future):
+        if future.cancelled() or future.exception() is not None:
+            return
+        agreed = _semantic_cache.record_audit(hit, text, vector, future.result())
+        if agreed is not None:
+            SEMANTIC_AUDITS.inc("agree" if agreed else "false_hit")
+            if not agreed:
+                logger.info("Semantic cache false hit: reused {} at similarity {:.3f}; {} says {}",
+                            hit.intent, hit.similarity, tier, future.result())
+
+    try:
+        stage = get_stage("haiku" if tier == "haiku" else "classify")
+        stage.executor.submit(_SYNC_TIERS[tier], text).add_done_callback(done)
+    except RuntimeError:  # executor shut down at exit
+        pass
+
+def save_semantic_cache():
+    """Persist the semantic cache now (it is also saved at exit)."""
+    if _semantic_cache is not None:
+        _semantic_cache.save()
+
+def _semantic_store(texts: List[str], labels: List[Optional[str]], vectors):
+    """Remember the model tiers' answers for later neighbours."""
+    if vectors is None:
+        return
+    for text, lbl, vector in zip(texts, labels, vectors):
+        # an abstention says nothing about a neighbour's intent
+        if lbl and lbl != "unknown":
+            _semantic_cache.add(text, lbl, vector)
+
+def cascade_stats() -> dict:
+    """Per-tier hit ratio (answered / attempted) and calls avoided by an earlier tier."""
+    snap = metrics_summary()
+    results = snap["mcp_nlp_results_total"]
+    misses: Dict[str, float] = {}
+    for label, n in snap["mcp_nlp_fallthrough_total"].items():
+        tier = label.split("/")[0]
+        misses[tier] = misses.get(tier, 0) + n
+    skipped = snap["mcp_nlp_tier_skipped_total"]
+    tiers = {}
+    for tier in _cascade_order():
+        hits, attempts = results.get(tier, 0), results.get(tier, 0) + misses.get(tier, 0)
+        tiers[tier] = {"attempts": int(attempts), "hits": int(hits),
+                       "hit_ratio": round(hits / attempts, 3) if attempts else None,
+                       "skipped": int(skipped.get(tier, 0))}
+    return {"rules_threshold": RULES_CONF_THRESHOLD, "ml_threshold": ML_CONF_THRESHOLD,
+            "order": _cascade_order(), "tiers": tiers,
+            "fallback": int(results.get("fallback", 0)), "cache": int(results.get("cache", 0))}
 
 def parse_nlp(text: str) -> Tuple[str, Dict]:
-    text = text.strip()
-    # 1) If haiku selected, try it first
-    if NLP_MODE == "haiku":
-        lbl = _haiku_intent(text)
+    with STAGE_SECONDS.time("parse_nlp"):
+        text = text.strip()
+        key = _nlp_cache_key(text)
+        hit = _cache_lookup(key)
+        if hit:
+            NLP_RESULTS.inc("cache")
+            _parse_tier.set("cache")
+            return hit
+        result, degraded = _parse_nlp_uncached(text)
+        # a tier that could not run gave way to a weaker answer; don't pin it in the cache
+        return result if degraded else _cache_store(key, result)
+
+_SYNC_TIERS = {"ml": _ml_intent, "haiku": _haiku_intent}
+
+def _parse_nlp_uncached(text: str) -> Tuple[Tuple[str, Dict], bool]:
+    """(result, degraded): degraded when a model tier was unavailable."""
+    # one rule scan serves every tier: entities for ML/Haiku labels come from it too
+    sc = intent_rules.scan(text)
+    tiers = _escalation_tiers()
+    # 1) a confident rule match skips the model tiers
+    confident = _confident_rule(sc, tiers)
+    if confident:
+        return confident, False
+
+    # 2) a model tier already answered a near-identical query
+    hits, vectors = _semantic_match([text])
+    _semantic_record([text], hits, vectors, tiers)
+    if hits[0]:
+        return (hits[0].intent, intent_rules.extract_entities(hits[0].intent, sc)), False
+
+    # 3) escalate through the model tiers until one answers
+    degraded = False
+    for i, tier in enumerate(tiers):
+        with NLP_TIER_SECONDS.time(tier):
+            try:
+                lbl = _tier_result(tier, _SYNC_TIERS[tier](text))
+            except TierUnavailable as e:
+                logger.debug("{}; falling back to the next tier", e)
+                lbl, degraded = _tier_result(tier, None, "unavailable"), True
         if lbl:
-            _, entities = _rule_intent_and_entities(text)
-            return lbl, entities
+            _skipped(tiers[i + 1:])
+            _semantic_store([text], [lbl], vectors)
+            return (lbl, intent_rules.extract_entities(lbl, sc)), degraded
 
-    # 2) Local ml attempt
-    if ENABLE_ML:
-        lbl = _ml_intent(text)
+    # 4) fallback: the rule tier's best guess, however weak
+    return _rules_tier(sc), degraded
+
+def _rules_tier(sc) -> Tuple[str, Dict]:
+    intent = intent_rules.match_intent(sc)
+    NLP_RESULTS.inc("fallback")
+    _parse_tier.set("fallback")
+    return intent, intent_rules.extract_entities(intent, sc)
+
+async def parse_nlp_async(text: str) -> Tuple[str, Dict]:
+    """Event-loop friendly parse_nlp.
+
+    Same cascade as parse_nlp, but the blocking tiers run on the execution
+    stages (see core.execution) and concurrent ML classifications are coalesced
+    into batched pipeline calls. A tier that exceeds its stage timeout is
+    skipped, so a stalled model or API degrades to the next tier. Like an
+    unavailable tier, that answer is not cached.
+    """
+    with STAGE_SECONDS.time("parse_nlp"):
+        text = text.strip()
+        key = _nlp_cache_key(text)
+        hit = _cache_lookup(key)
+        if hit:
+            NLP_RESULTS.inc("cache")
+            _parse_tier.set("cache")
+            return hit
+        result, degraded = await _parse_nlp_uncached_async(text)
+        # a tier skipped on timeout or unavailability gave a degraded answer; don't pin it in the cache
+        return result if degraded else _cache_store(key, result)
+
+async def _parse_nlp_uncached_async(text: str) -> Tuple[Tuple[str, Dict], bool]:
+    sc = intent_rules.scan(text)
+    tiers = _escalation_tiers()
+    confident = _confident_rule(sc, tiers)
+    if confident:
+        return confident, False
+
+    hits, vectors = await _semantic_match_async([text])
+    _semantic_record([text], hits, vectors, tiers)
+    if hits[0]:
+        return (hits[0].intent, intent_rules.extract_entities(hits[0].intent, sc)), False
+
+    degraded = False
+    for i, tier in enumerate(tiers):
+        lbl, tier_degraded = await _tier_async(tier, text)
+        degraded = degraded or tier_degraded
         if lbl:
-            _, entities = _rule_intent_and_entities(text)
-            return lbl, entities
+            _skipped(tiers[i + 1:])
+            _semantic_store([text], [lbl], vectors)
+            return (lbl, intent_rules.extract_entities(lbl, sc)), degraded
+
+    return _rules_tier(sc), degraded
+
+async def _tier_async(tier: str, text: str) -> Tuple[Optional[str], bool]:
+    """(label, degraded): degraded when the tier timed out or could not run."""
+    with NLP_TIER_SECONDS.time(tier):
+        try:
+            if tier == "haiku":
+                lbl = await get_stage("haiku").run(_haiku_intent, text)
+            elif _active_model().backing_off:
+                # fail here rather than as a whole micro-batch
+                raise TierUnavailable("ml", f"{_active_model().name} model load backing off")
+            elif ML_BATCHING:
+                lbl = await get_stage("classify").guard(lambda: _get_ml_batcher().submit(text))
+            else:
+                lbl = await get_stage("classify").run(_ml_intent, text)
+        except StageTimeout as e:
+            logger.warning("{}; falling back to the next tier", e)
+            return _tier_result(tier, None, "timeout"), True
+        except TierUnavailable as e:
+            logger.debug("{}; falling back to the next tier", e)
+            return _tier_result(tier, None, "unavailable"), True
+    return _tier_result(tier, lbl), False
+
+async def parse_nlp_batch_async(texts: List[str]) -> List[Tuple[str, Dict]]:
+    """parse_nlp_async for many queries at once, results in input order.
+
+    Identical queries (after whitespace normalization) are parsed once, cache
+    hits and confident rule matches skip the model tiers, and the remaining
+    queries go to the ML tier as a single batched model call rather than one
+    call per query.
+    """
+    with STAGE_SECONDS.time("parse_nlp_batch"):
+        texts = [t.strip() for t in texts]
+        keys = [_nlp_cache_key(t) for t in texts]
+        parsed: Dict[str, Tuple[str, Dict]] = {}
+        pending: Dict[str, str] = {}  # cache key -> text, first occurrence wins
+        for key, text in zip(keys, texts):
+            if key in parsed or key in pending:
+                continue
+            hit = _cache_lookup(key)
+            if hit:
+                NLP_RESULTS.inc("cache")
+                parsed[key] = hit
+            else:
+                pending[key] = text
+        tiers = _escalation_tiers()
+        scans = {}
+        for key, text in pending.items():
+            sc = intent_rules.scan(text)
+            confident = _confident_rule(sc, tiers)
+            if confident:
+                parsed[key] = _cache_store(key, confident)
+            else:
+                scans[key] = sc
+        if scans:
+            labels, degraded = await _batch_labels([sc.text for sc in scans.values()], tiers)
+            for (key, sc), lbl, item_degraded in zip(scans.items(), labels, degraded):
+                result = (lbl, intent_rules.extract_entities(lbl, sc)) if lbl else _rules_tier(sc)
+                parsed[key] = result if item_degraded else _cache_store(key, result)
+        # each position gets its own entities dict; duplicates must not share one
+        return [(parsed[k][0], copy.deepcopy(parsed[k][1])) for k in keys]
 
-    # 3) fallback rules
-    intent, entities = _rule_intent_and_entities(text)
-    return intent, entities
+async def _batch_labels(texts: List[str], tiers: List[str]) -> Tuple[List[Optional[str]], List[bool]]:
+    # one encoder pass for the whole batch; semantic hits skip the model tiers
+    hits, vectors = await _semantic_match_async(texts)
+    _semantic_record(texts, hits, vectors, tiers)
+    labels: List[Optional[str]] = [hit.intent if hit else None for hit in hits]
+    degraded = [False] * len(texts)  # per item: a tier it reached timed out or could not run
+    for pos, tier in enumerate(tiers):
+        todo = [i for i, lbl in enumerate(labels) if not lbl]
+        if not todo:
+            break
+        if tier == "haiku":
+            # no batch endpoint: the haiku stage bounds how many run at once
+            haiku = get_stage("haiku")
+            outcomes = await asyncio.gather(*(haiku.run(_haiku_intent, texts[i]) for i in todo),
+                                            return_exceptions=True)
+            for i, out in zip(todo, outcomes):
+                reason = "no_label"
+                if isinstance(out, StageTimeout):
+                    reason = "timeout"
+                elif isinstance(out, TierUnavailable):
+                    reason = "unavailable"
+                elif isinstance(out, BaseException):
+                    raise out
+                degraded[i] = degraded[i] or reason != "no_label"
+                labels[i] = _tier_result("haiku", out if isinstance(out, str) else None, reason)
+        else:
+            reason = "no_label"
+            with NLP_TIER_SECONDS.time("ml"):
+                try:
+                    batch = await get_stage("classify").run(_ml_intent_batch, [texts[i] for i in todo])
+                except StageTimeout as e:
+                    logger.warning("{}; batch falls back to the next tier", e)
+                    batch, reason = [None] * len(todo), "timeout"
+                except TierUnavailable as e:
+                    logger.debug("{}; batch falls back to the next tier", e)
+                    batch, reason = [None] * len(todo), "unavailable"
+            for i, lbl in zip(todo, batch):
+                degraded[i] = degraded[i] or reason != "no_label"
+                labels[i] = _tier_result("ml", lbl, reason)
+        for i in todo:
+            if labels[i]:
+                _skipped(tiers[pos + 1:])
+    _semantic_store(texts, [None if hit else lbl for hit, lbl in zip(hits, labels)], vectors)
+    return labels, degraded
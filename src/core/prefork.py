@@ -0,0 +1,232 @@
+# src/core/prefork.py
+"""Pre-fork multi-worker HTTP serving.
+
+With `HTTP_WORKERS` > 1 (or `--workers N`) the parent process loads and warms
+the classifier once. It then binds the listening socket and forks the workers.
+Each worker runs uvicorn on the inherited socket, and the kernel spreads
+connections across them. Model weights allocated before the fork are shared
+copy-on-write. `gc.freeze()` moves the parent's objects out of the collector's
+reach, so a worker's garbage collection doesn't write to (and so copy) their
+pages.
+
+Each worker gets `torch_threads` intra-op threads, by default cores / workers,
+so N workers don't oversubscribe the CPU. The parent warms the model with a
+single thread because an OpenMP pool started before fork() is unusable in the
+children.
+
+The parent only supervises:
+- a worker that exits is replaced;
+- SIGHUP replaces the workers one at a time, and each old worker finishes its
+  in-flight requests (up to `graceful_timeout`) before exiting;
+- SIGINT / SIGTERM stop them all.
+
+POSIX only; elsewhere the caller serves from a single process.
+"""
+import gc
+import os
+import signal
+import socket
+import sys
+import time
+from typing import Callable, Dict, Optional, Tuple
+
+from loguru import logger
+
+from config.settings import CONFIG
+
+_cfg = CONFIG.get("http", {})
+HTTP_WORKERS = int(os.getenv("HTTP_WORKERS", _cfg.get("workers", 1)))
+# 0 = cpu_count() // workers
+TORCH_THREADS = int(os.getenv("HTTP_TORCH_THREADS", _cfg.get("torch_threads", 0)))
+GRACEFUL_TIMEOUT = float(os.getenv("HTTP_GRACEFUL_TIMEOUT", _cfg.get("graceful_timeout", 30)))
+
+# a worker that dies sooner than this after starting is respawned with a delay
+_MIN_UPTIME = 1.0
+
+
+def prefork_supported() -> bool:
+    return hasattr(os, "fork")
+
+
+def torch_threads_per_worker(workers: int) -> int:
+    return TORCH_THREADS or max(1, (os.cpu_count() or 1) // max(1, workers))
+
+
+def set_torch_threads(n: int):
+    # only when the model stack is already loaded; importing torch here would cost ~1 s
+    torch = sys.modules.get("torch")
+    if torch is not None:
+        torch.set_num_threads(n)
+
+
+def bind_socket(host: str, port: int, backlog: int = 2048) -> socket.socket:
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+class PreforkServer:
+    """Supervisor for `workers` forked uvicorn processes sharing one socket.
+
+    `preload()` runs in the parent before forking (load and warm the model).
+    `on_worker_start(slot)` runs in each worker after the fork. Threads don't
+    survive fork(), so background refreshers belong there. `slot` is a small
+    stable index: a replacement worker takes the lowest slot no live worker
+    holds, so per-worker files keyed on it don't pile up across restarts. `on_worker_exit()` runs in
+    the worker once uvicorn has stopped. The worker then leaves with os._exit,
+    which skips atexit (the handlers there are the parent's), so flushing and
+    saving belong in this hook.
+    """
+
+    def __init__(self, app, host: str = "127.0.0.1", port: int = 8000, workers: int = HTTP_WORKERS,
+                 preload: Optional[Callable[[], None]] = None,
+                 on_worker_start: Optional[Callable[[int], None]] = None,
+                 on_worker_exit: Optional[Callable[[], None]] = None,
+                 torch_threads: Optional[int] = None, graceful_timeout: float = GRACEFUL_TIMEOUT):
+        self.app, self.host, self.port = app, host, port
+        self.workers = max(1, workers)
+        self.preload, self.on_worker_start, self.on_worker_exit = preload, on_worker_start, on_worker_exit
+        self.torch_threads = torch_threads or torch_threads_per_worker(self.workers)
+        self.graceful_timeout = graceful_timeout
+        self.sock: Optional[socket.socket] = None
+        self._children: Dict[int, Tuple[float, int]] = {}  # pid -> (start time, slot)
+        self._stopping = self._reload = False
+        self.restarts = 0
+
+    # ---- parent ----
+
+    def run(self):
+        if self.preload is not None:
+            set_torch_threads(1)
+            self.preload()
+        self.sock = bind_socket(self.host, self.port)
+        # everything allocated so far is shared with the workers; keep the GC off it
+        gc.collect()
+        gc.freeze()
+        signal.signal(signal.SIGTERM, self._on_stop)
+        signal.signal(signal.SIGINT, self._on_stop)
+        signal.signal(signal.SIGHUP, self._on_reload)
+        logger.info("Pre-fork server on {}:{}: {} workers, {} torch threads each",
+                    self.host, self.port, self.workers, self.torch_threads)
+        for _ in range(self.workers):
+            self._spawn()
+        try:
+            while not self._stopping:
+                self._reap()
+                if self._reload:
+                    self._reload = False
+                    self._rolling_restart()
+                time.sleep(0.2)
+        finally:
+            self._stop_all()
+            self.sock.close()
+
+    def _on_stop(self, signum, frame):
+        self._stopping = True
+
+    def _on_reload(self, signum, frame):
+        self._reload = True
+
+    def _reap(self):
+        while self._children:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if pid == 0:
+                return
+            child = self._children.pop(pid, None)
+            if child is None or self._stopping:
+                continue
+            started, _ = child
+            logger.warning("Worker {} exited with status {}; replacing it", pid, os.waitstatus_to_exitcode(status))
+            if time.monotonic() - started < _MIN_UPTIME:
+                time.sleep(_MIN_UPTIME)  # don't spin on a worker that crashes at startup
+            self.restarts += 1
+            self._spawn()
+
+    def _rolling_restart(self):
+        logger.info("Restarting {} workers", len(self._children))
+        for old in list(self._children):
+            if self._stopping:
+                return
+            # the replacement accepts on the shared socket before the old worker stops
+            self._spawn()
+            self._children.pop(old, None)
+            self._terminate([old])
+            self.restarts += 1
+
+    def _stop_all(self):
+        pids, self._children = list(self._children), {}
+        self._terminate(pids)
+
+    def _terminate(self, pids):
+        """SIGTERM (uvicorn drains in-flight requests), then SIGKILL after graceful_timeout."""
+        for pid in pids:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+        deadline = time.monotonic() + self.graceful_timeout
+        pending = set(pids)
+        while pending and time.monotonic() < deadline:
+            for pid in list(pending):
+                try:
+                    done, _ = os.waitpid(pid, os.WNOHANG)
+                except ChildProcessError:
+                    done = pid
+                if done:
+                    pending.discard(pid)
+            time.sleep(0.05)
+        for pid in pending:
+            logger.warning("Worker {} did not stop within {:g}s; killing it", pid, self.graceful_timeout)
+            try:
+                os.kill(pid, signal.SIGKILL)
+                os.waitpid(pid, 0)
+            except (ProcessLookupError, ChildProcessError):
+                pass
+
+    def _free_slot(self) -> int:
+        # during a rolling restart the replacement runs next to the old worker, so it takes slot `workers`
+        taken = {slot for _, slot in self._children.values()}
+        return next(i for i in range(len(taken) + 1) if i not in taken)
+
+    def _spawn(self):
+        slot = self._free_slot()
+        pid = os.fork()
+        if pid:
+            self._children[pid] = (time.monotonic(), slot)
+            return
+        code = 0
+        try:
+            self._worker(slot)
+        except BaseException:
+            logger.exception("Worker {} failed", os.getpid())
+            code = 1
+        finally:
+            if self.on_worker_exit is not None:
+                try:
+                    self.on_worker_exit()
+                except BaseException:
+                    logger.exception("Worker {} exit hook failed", os.getpid())
+                    code = 1
+            os._exit(code)
+
+    # ---- worker ----
+
+    def _worker(self, slot: int):
+        for sig in (signal.SIGTERM, signal.SIGINT, signal.SIGHUP):
+            signal.signal(sig, signal.SIG_DFL)
+        set_torch_threads(self.torch_threads)
+        if self.on_worker_start is not None:
+            self.on_worker_start(slot)
+        import uvicorn
+        config = uvicorn.Config(self.app, timeout_graceful_shutdown=int(self.graceful_timeout))
+        # uvicorn re-raises the stop signal once it has drained; absorb it so the exit handlers still run
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            signal.signal(sig, lambda signum, frame: None)
+        uvicorn.Server(config).run(sockets=[self.sock])
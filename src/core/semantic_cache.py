@@ -0,0 +1,243 @@
+# src/core/semantic_cache.py
+"""Nearest-neighbour intent cache in front of the model tiers.
+
+The exact-text parse cache only helps when a query repeats word for word. A
+query that reaches a model tier is also embedded with a small local sentence
+encoder. The embedding and the intent the tier answered are stored here. A
+later query whose cosine similarity to a stored one reaches `threshold` reuses
+that intent without calling the model. Entities still come from the rule
+extractor, so "list buckets in us-west-2" borrowing the intent of "show my
+buckets" keeps its own region.
+
+- Storage: one preallocated (maxsize, dim) float32 matrix of unit vectors, so
+  a lookup is a single matrix product. When it is full, the least recently
+  used row is overwritten.
+- Audits: a fraction `audit_rate` of hits is re-classified by the model tier
+  off the request path. A disagreement is a false hit, and the query is then
+  stored with the tier's intent. `false_hit_rate` is false hits / audited hits.
+- Persistence: with `path` set, the index is loaded at start and saved at exit
+  if it changed (.npz, replaced atomically). Pre-forked workers each save their
+  own copy, and the last one to exit wins. A file written for another encoder or
+  label set is ignored.
+
+Settings live under `cache.semantic` (env `SEMANTIC_CACHE_<KEY>`).
+"""
+import atexit
+import os
+import random
+import threading
+from typing import Callable, Dict, List, NamedTuple, Optional, Sequence
+
+import numpy as np
+from loguru import logger
+
+from core.cache import cache_config, register_cache
+
+_cfg = cache_config("semantic")
+SEMANTIC_CACHE_SIZE = int(os.getenv("SEMANTIC_CACHE_SIZE", _cfg.get("maxsize", 4096)))
+SEMANTIC_CACHE_THRESHOLD = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", _cfg.get("threshold", 0.92)))
+SEMANTIC_CACHE_AUDIT_RATE = float(os.getenv("SEMANTIC_CACHE_AUDIT_RATE", _cfg.get("audit_rate", 0.05)))
+SEMANTIC_CACHE_PATH = os.getenv("SEMANTIC_CACHE_PATH") or _cfg.get("path")
+
+
+class Hit(NamedTuple):
+    intent: str
+    similarity: float
+    neighbour: str      # the stored query that matched
+
+
+def _text_key(text: str) -> str:
+    return " ".join(text.split())
+
+
+class SemanticCache:
+    backend = "vector"
+
+    def __init__(self, name: str, encode: Callable[[List[str]], Optional[np.ndarray]],
+                 maxsize: int = SEMANTIC_CACHE_SIZE, threshold: float = SEMANTIC_CACHE_THRESHOLD,
+                 audit_rate: float = SEMANTIC_CACHE_AUDIT_RATE, path: Optional[str] = SEMANTIC_CACHE_PATH,
+                 fingerprint: str = ""):
+        self.name = name
+        self._encode = encode
+        self.maxsize = max(1, int(maxsize))
+        self.threshold = threshold
+        self.audit_rate = audit_rate
+        self.path = path
+        self.fingerprint = fingerprint
+        self._vectors: Optional[np.ndarray] = None  # allocated on the first insert, once the dimension is known
+        self._intents: List[Optional[str]] = [None] * self.maxsize
+        self._texts: List[Optional[str]] = [None] * self.maxsize
+        self._used = np.zeros(self.maxsize, dtype=np.int64)  # LRU clock per row
+        self._clock = 0
+        self._rows: Dict[str, int] = {}  # normalized text -> row
+        self.size = 0
+        self._dirty = False  # entries changed since the last load or save
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.evictions = self.audited = self.false_hits = self.errors = 0
+        if path:
+            self.load(path)
+
+    def encode(self, texts: Sequence[str]) -> Optional[np.ndarray]:
+        """Unit-length embeddings, or None while the encoder is unavailable."""
+        try:
+            m = self._encode(list(texts))
+        except Exception as e:
+            self.errors += 1
+            logger.warning("Semantic cache encoder failed: {}", e)
+            return None
+        if m is None:
+            return None
+        m = np.asarray(m, dtype=np.float32)
+        return m / np.maximum(np.linalg.norm(m, axis=1, keepdims=True), 1e-12)
+
+    def lookup(self, vectors: np.ndarray) -> List[Optional[Hit]]:
+        """The nearest stored intent per row of `vectors`, or None below the threshold."""
+        with self._lock:
+            if self.size == 0 or self._vectors is None or vectors.shape[1] != self._vectors.shape[1]:
+                self.misses += len(vectors)
+                return [None] * len(vectors)
+            sims = vectors @ self._vectors[:self.size].T
+            best = sims.argmax(axis=1)
+            out: List[Optional[Hit]] = []
+            for i, row in enumerate(best):
+                similarity = float(sims[i, row])
+                if similarity >= self.threshold:
+                    self._touch(row)
+                    self.hits += 1
+                    out.append(Hit(self._intents[row], similarity, self._texts[row]))
+                else:
+                    self.misses += 1
+                    out.append(None)
+            return out
+
+    def add(self, text: str, intent: str, vector: np.ndarray):
+        key = _text_key(text)
+        with self._lock:
+            if self._vectors is None:
+                self._vectors = np.zeros((self.maxsize, vector.shape[0]), dtype=np.float32)
+            elif vector.shape[0] != self._vectors.shape[1]:
+                return
+            row = self._rows.get(key)
+            if row is None:
+                if self.size < self.maxsize:
+                    row = self.size
+                    self.size += 1
+                else:
+                    row = int(self._used.argmin())
+                    self._rows.pop(self._texts[row], None)
+                    self.evictions += 1
+                self._rows[key] = row
+            self._vectors[row] = vector
+            self._intents[row], self._texts[row] = intent, key
+            self._touch(row)
+            self._dirty = True
+
+    def _touch(self, row):
+        self._clock += 1
+        self._used[row] = self._clock
+
+    def should_audit(self) -> bool:
+        return self.audit_rate > 0 and random.random() < self.audit_rate
+
+    def record_audit(self, hit: Hit, text: str, vector: np.ndarray, actual: Optional[str]) -> Optional[bool]:
+        """Score an audited hit against the tier's own answer: True if they agree,
+        False for a false hit, None when the tier gave no answer."""
+        if not actual:
+            return None
+        agreed = actual == hit.intent
+        with self._lock:
+            self.audited += 1
+            if not agreed:
+                self.false_hits += 1
+        if not agreed:
+            # the neighbour stays (it was right for itself); this query now matches itself first
+            self.add(text, actual, vector)
+        return agreed
+
+    def clear(self):
+        with self._lock:
+            self._vectors = None
+            self._intents = [None] * self.maxsize
+            self._texts = [None] * self.maxsize
+            self._used[:] = 0
+            self._rows.clear()
+            self.size = 0
+
+    def __len__(self):
+        return self.size
+
+    def save(self, path: Optional[str] = None):
+        """Write the index if it changed. A pre-fork parent saves before forking,
+        so at exit only processes that learned something overwrite the file."""
+        path = path or self.path
+        with self._lock:
+            if not path or self._vectors is None or not self._dirty:
+                return
+            self._dirty = False
+            n = self.size
+            vectors, used = self._vectors[:n].copy(), self._used[:n].copy()
+            intents, texts = self._intents[:n], self._texts[:n]
+        try:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            tmp = f"{path}.{os.getpid()}.tmp"
+            with open(tmp, "wb") as f:
+                np.savez(f, vectors=vectors, used=used, intents=np.array(intents, dtype=str),
+                         texts=np.array(texts, dtype=str), fingerprint=np.array(self.fingerprint))
+            os.replace(tmp, path)
+            logger.info("Saved {} semantic cache entries to {}", n, path)
+        except OSError as e:
+            self._dirty = True
+            logger.warning("Could not persist the semantic cache to {}: {}", path, e)
+
+    def load(self, path: str):
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                if str(data["fingerprint"]) != self.fingerprint:
+                    logger.info("Ignoring semantic cache {}: written for another encoder or label set", path)
+                    return
+                vectors, used = data["vectors"], data["used"]
+                intents, texts = data["intents"].tolist(), data["texts"].tolist()
+        except FileNotFoundError:
+            return
+        except Exception as e:
+            logger.warning("Ignoring unreadable semantic cache {}: {}", path, e)
+            return
+        # most recently used first, in case the file holds more than maxsize
+        order = np.argsort(-used, kind="stable")[:self.maxsize]
+        with self._lock:
+            if len(order):
+                self._vectors = np.zeros((self.maxsize, vectors.shape[1]), dtype=np.float32)
+            for row, i in enumerate(order):
+                self._vectors[row] = vectors[i]
+                self._intents[row], self._texts[row] = intents[i], texts[i]
+                self._used[row] = used[i]
+                self._rows[texts[i]] = row
+            self.size = len(order)
+            self._clock = int(used.max()) if len(used) else 0
+        logger.info("Loaded {} semantic cache entries from {}", self.size, path)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "backend": self.backend,
+            "size": self.size,
+            "maxsize": self.maxsize,
+            "threshold": self.threshold,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "audited": self.audited,
+            "false_hits": self.false_hits,
+            "false_hit_rate": round(self.false_hits / self.audited, 4) if self.audited else None,
+            "errors": self.errors,
+        }
+
+
+def create_semantic_cache(encode: Callable[[List[str]], Optional[np.ndarray]], fingerprint: str) -> SemanticCache:
+    """The configured cache, registered for cache_stats and saved at exit when it has a path."""
+    cache = SemanticCache("semantic", encode, fingerprint=fingerprint)
+    register_cache("semantic", cache)
+    if cache.path:
+        atexit.register(cache.save)
+    return cache
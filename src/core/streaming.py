@@ -0,0 +1,76 @@
+# src/core/streaming.py
+"""Staged generation: results are emitted as soon as each stage finishes.
+
+`generate_events` yields three events for one query, in order:
+
+- `parsed`: intent and entities (after NLP, usually milliseconds);
+- `command`: the CLI command and explanation;
+- `validation`: the AWS validation result, which may take as long as the
+  slowest API call.
+
+If a stage raises, an `error` event is yielded instead and the stream ends.
+Pass a dict as `timings` to get each stage's duration in milliseconds.
+The HTTP adapter serializes events as NDJSON or Server-Sent Events; the MCP
+tool turns them into progress notifications. Both log the answered query with
+`log_response`.
+"""
+import json
+import time
+from typing import AsyncIterator, Dict, Optional
+
+from loguru import logger
+
+from core.aws_validator import validate_command_safe_async
+from core.command_generator import generate_command
+from core.metrics import STAGE_SECONDS
+from core.nlp_utils import last_parse_tier, parse_nlp_async
+from core.telemetry import redact_query, telemetry_log_event
+
+STAGES = ("parsed", "command", "validation")
+
+
+async def generate_events(query: str, limit: Optional[int] = None, next_token: Optional[str] = None,
+                          filters: Optional[dict] = None,
+                          timings: Optional[Dict[str, float]] = None) -> AsyncIterator[dict]:
+    stage = "parsed"
+    timings = {} if timings is None else timings
+    try:
+        with STAGE_SECONDS.time("request"):
+            t0 = time.perf_counter()
+            intent, entities = await parse_nlp_async(query)
+            timings["parse_nlp"] = _ms_since(t0)
+            yield {"event": "parsed", "data": {"intent": intent, "entities": entities}}
+            stage = "command"
+            t0 = time.perf_counter()
+            command, explanation = generate_command(intent, entities, limit, next_token)
+            timings["generate_command"] = _ms_since(t0)
+            yield {"event": "command", "data": {"command": command, "explanation": explanation}}
+            stage = "validation"
+            t0 = time.perf_counter()
+            validation = await validate_command_safe_async(intent, entities, limit, next_token, filters)
+            timings["validate"] = _ms_since(t0)
+            yield {"event": "validation", "data": validation}
+    except Exception as e:
+        logger.exception("Streaming generation failed at {}: {}", stage, e)
+        yield {"event": "error", "data": {"stage": stage, "error": str(e)}}
+
+
+def log_response(query: str, intent: str, validation: dict, timings: Dict[str, float], **extra):
+    """The `response.emitted` telemetry event for one answered query. Call it in
+    the context that ran the parse, so the answering tier is known."""
+    telemetry_log_event("response.emitted", {
+        **redact_query(query), **extra, "result_summary": {"intent": intent, "status": validation.get("status")},
+        "tier": last_parse_tier(), "stages_ms": timings,
+    })
+
+
+def _ms_since(t0: float) -> float:
+    return round((time.perf_counter() - t0) * 1000, 3)
+
+
+def to_ndjson(event: dict) -> str:
+    return json.dumps(event, default=str) + "\n"
+
+
+def to_sse(event: dict) -> str:
+    return f"event: {event['event']}\ndata: {json.dumps(event['data'], default=str)}\n\n"
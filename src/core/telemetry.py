@@ -1,12 +1,324 @@
 # src/core/telemetry.py
-from loguru import logger
+"""Non-blocking telemetry pipeline.
+
+`telemetry_log_event` only appends a small dict to a bounded in-memory buffer;
+a background writer thread drains it in batches (up to `batch_size` records or
+every `flush_interval_ms`) and hands each batch to the configured sinks. JSON
+serialization and I/O never run on the request path.
+
+When the buffer is full the `overflow` policy applies: `drop_oldest` (default)
+evicts the oldest record, `drop_newest` discards the new one, and `block` waits
+up to `block_timeout_ms` for space before dropping. Pending records are flushed
+at interpreter exit.
+
+Sinks (`telemetry.sinks` in defaults.json or TELEMETRY_SINKS=file,dynamodb):
+- `file`: JSON lines at `log_path`, rotated at `max_bytes`. A pre-forked
+  worker writes `<log_path>.worker-<slot>` instead (see telemetry_after_fork),
+  so no two processes append to or rotate the same file.
+- `dynamodb`: BatchWriteItem into the TelemetryTable (`dynamodb_table`); set
+  AWS_ENDPOINT_URL_DYNAMODB to point it at DynamoDB Local or moto.
+- `loguru`: one logger.info per record (the previous behaviour).
+"""
+import atexit
+import hashlib
+import json
+import os
+import threading
 import time
+import uuid
+from collections import deque
+from typing import Dict, List, Optional
+
+from loguru import logger
+
+from config.settings import CONFIG, DEFAULT_REGION
+
+_cfg = CONFIG.get("telemetry", {})
+
+
+def _setting(key: str, default):
+    return os.getenv(f"TELEMETRY_{key.upper()}", _cfg.get(key, default))
+
+
+TELEMETRY_ENABLED = str(_setting("enabled", True)).lower() in ("1", "true", "yes")
+# how request queries are recorded: hash | truncate | full | none
+QUERY_LOGGING = str(_setting("query_logging", "hash")).lower()
+QUERY_TRUNCATE = 64
+
+
+def redact_query(query: str) -> dict:
+    """The query as it should appear in telemetry, per TELEMETRY_QUERY_LOGGING."""
+    if QUERY_LOGGING == "full":
+        return {"query": query}
+    out = {"query_len": len(query)}
+    if QUERY_LOGGING == "truncate":
+        out["query"] = query[:QUERY_TRUNCATE]
+    elif QUERY_LOGGING == "hash":
+        # whitespace-normalized like the parse cache key, so spacing variants share a hash
+        normalized = " ".join(query.split())
+        out["query_sha256"] = hashlib.sha256(normalized.encode("utf-8")).hexdigest()[:16]
+    return out
+
+
+class TelemetrySink:
+    name = "sink"
+
+    def write_batch(self, records: List[dict]):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class JsonlFileSink(TelemetrySink):
+    name = "file"
+
+    def __init__(self, path: str, max_bytes: int = 10 * 1024 * 1024, backups: int = 5):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backups = backups
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._fh = open(path, "a", encoding="utf-8")
+
+    def write_batch(self, records: List[dict]):
+        self._fh.write("".join(json.dumps(r, default=str) + "\n" for r in records))
+        self._fh.flush()
+        if self.max_bytes and self._fh.tell() >= self.max_bytes:
+            self._rotate()
+
+    def _rotate(self):
+        # telemetry.log -> telemetry.log.1 -> ... -> telemetry.log.<backups>
+        self._fh.close()
+        for i in range(self.backups - 1, 0, -1):
+            src = f"{self.path}.{i}"
+            if os.path.exists(src):
+                os.replace(src, f"{self.path}.{i + 1}")
+        if self.backups:
+            os.replace(self.path, f"{self.path}.1")
+        self._fh = open(self.path, "w" if not self.backups else "a", encoding="utf-8")
+
+    def close(self):
+        self._fh.close()
+
+
+class LoguruSink(TelemetrySink):
+    name = "loguru"
+
+    def write_batch(self, records: List[dict]):
+        for r in records:
+            logger.info(r)
+
+
+class DynamoDBSink(TelemetrySink):
+    """BatchWriteItem into the TelemetryTable (tenantId hash key, eventId range key)."""
+
+    name = "dynamodb"
+    MAX_BATCH = 25  # BatchWriteItem limit
+
+    def __init__(self, table: str, region: str = DEFAULT_REGION, tenant: str = "default",
+                 client=None, max_attempts: int = 5):
+        self.table = table
+        self.tenant = tenant
+        self.max_attempts = max_attempts
+        if client is None:
+            from core.aws_clients import get_client
+            client = get_client("dynamodb", region)
+        self.client = client
+
+    def _item(self, r: dict) -> dict:
+        return {
+            "tenantId": {"S": self.tenant},
+            "eventId": {"S": f"{r['timestamp']:013d}#{uuid.uuid4().hex[:12]}"},
+            "event": {"S": r["event"]},
+            "timestamp": {"N": str(r["timestamp"])},
+            "details": {"S": json.dumps(r.get("details", {}), default=str)},
+        }
+
+    def write_batch(self, records: List[dict]):
+        for i in range(0, len(records), self.MAX_BATCH):
+            requests = [{"PutRequest": {"Item": self._item(r)}} for r in records[i:i + self.MAX_BATCH]]
+            self._write(requests)
+
+    def _write(self, requests: List[dict]):
+        for attempt in range(self.max_attempts):
+            resp = self.client.batch_write_item(RequestItems={self.table: requests})
+            requests = resp.get("UnprocessedItems", {}).get(self.table, [])
+            if not requests:
+                return
+            time.sleep(min(1.0, 0.05 * 2 ** attempt))
+        raise RuntimeError(f"{len(requests)} telemetry items unprocessed after {self.max_attempts} attempts")
+
+
+class TelemetryPipeline:
+    def __init__(self, sinks: List[TelemetrySink], buffer_size: int = 10000, batch_size: int = 100,
+                 flush_interval_ms: float = 500, overflow: str = "drop_oldest", block_timeout_ms: float = 50):
+        self.sinks = sinks
+        self.buffer_size = max(1, int(buffer_size))
+        self.batch_size = max(1, int(batch_size))
+        self.flush_interval = max(10.0, float(flush_interval_ms)) / 1000.0
+        self.overflow = overflow
+        self.block_timeout = max(0.0, float(block_timeout_ms)) / 1000.0
+        self._buf: deque = deque()
+        self._cond = threading.Condition()
+        self._write_lock = threading.Lock()  # sinks see one batch at a time
+        self._writer: Optional[threading.Thread] = None
+        self._pid: Optional[int] = None
+        self._closed = False
+        self._stats = {"emitted": 0, "written": 0, "dropped": 0, "batches": 0, "sink_errors": 0}
+
+    def _ensure_writer(self):
+        # threads do not survive fork; a forked worker starts its own writer
+        if self._writer is None or self._pid != os.getpid() or not self._writer.is_alive():
+            self._pid = os.getpid()
+            self._writer = threading.Thread(target=self._run, name="telemetry-writer", daemon=True)
+            self._writer.start()
+
+    def emit(self, record: dict) -> bool:
+        with self._cond:
+            if self._closed:
+                return False
+            self._ensure_writer()
+            self._stats["emitted"] += 1
+            if len(self._buf) >= self.buffer_size:
+                if self.overflow == "drop_newest":
+                    self._stats["dropped"] += 1
+                    return False
+                if self.overflow == "block":
+                    self._cond.notify_all()
+                    self._cond.wait_for(lambda: len(self._buf) < self.buffer_size, self.block_timeout)
+                    if len(self._buf) >= self.buffer_size:
+                        self._stats["dropped"] += 1
+                        return False
+                else:
+                    self._buf.popleft()
+                    self._stats["dropped"] += 1
+            self._buf.append(record)
+            if len(self._buf) >= self.batch_size:
+                self._cond.notify_all()
+            return True
+
+    def _take_batch(self) -> List[dict]:
+        n = min(self.batch_size, len(self._buf))
+        batch = [self._buf.popleft() for _ in range(n)]
+        self._cond.notify_all()  # wake producers blocked on a full buffer
+        return batch
+
+    def _run(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._closed or len(self._buf) >= self.batch_size, self.flush_interval)
+                batch = self._take_batch()
+                closing = self._closed and not self._buf
+            if batch:
+                self._write(batch)
+            if closing:
+                return
+
+    def _write(self, batch: List[dict]):
+        with self._write_lock:
+            self._stats["batches"] += 1
+            for sink in self.sinks:
+                try:
+                    sink.write_batch(batch)
+                except Exception as e:
+                    self._stats["sink_errors"] += 1
+                    logger.warning("telemetry sink {} failed for {} records: {}", sink.name, len(batch), e)
+            self._stats["written"] += len(batch)
+
+    def flush(self, timeout: float = 5.0):
+        """Write everything buffered so far (from the calling thread)."""
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            with self._cond:
+                batch = self._take_batch()
+            if not batch:
+                return
+            self._write(batch)
+
+    def shutdown(self, timeout: float = 5.0):
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.notify_all()
+        writer = self._writer
+        if writer is not None and writer.is_alive() and self._pid == os.getpid():
+            writer.join(timeout)
+        self.flush(timeout)
+        for sink in self.sinks:
+            try:
+                sink.close()
+            except Exception:
+                pass
+
+    def stats(self) -> dict:
+        return {**self._stats, "buffered": len(self._buf), "buffer_size": self.buffer_size,
+                "overflow": self.overflow, "sinks": [s.name for s in self.sinks]}
+
+
+def _build_sink(name: str) -> TelemetrySink:
+    if name == "file":
+        return JsonlFileSink(_setting("log_path", "telemetry/telemetry.log") + _log_suffix,
+                             max_bytes=int(_setting("max_bytes", 10 * 1024 * 1024)),
+                             backups=int(_setting("backups", 5)))
+    if name == "dynamodb":
+        return DynamoDBSink(_setting("dynamodb_table", "mcp-telemetry-v2"), tenant=_setting("tenant", "default"))
+    if name == "loguru":
+        return LoguruSink()
+    raise ValueError(f"Unknown telemetry sink: {name}")
+
+
+_pipeline: Optional[TelemetryPipeline] = None
+_pipeline_lock = threading.Lock()
+_log_suffix = ""  # set in pre-forked workers
+
+
+def get_pipeline() -> Optional[TelemetryPipeline]:
+    global _pipeline
+    if _pipeline is None and TELEMETRY_ENABLED:
+        with _pipeline_lock:
+            if _pipeline is None:
+                sinks = _setting("sinks", ["file"])
+                if isinstance(sinks, str):
+                    sinks = [s.strip() for s in sinks.split(",") if s.strip()]
+                _pipeline = TelemetryPipeline(
+                    [_build_sink(s) for s in sinks],
+                    buffer_size=int(_setting("buffer_size", 10000)),
+                    batch_size=int(_setting("batch_size", 100)),
+                    flush_interval_ms=float(_setting("flush_interval_ms", 500)),
+                    overflow=str(_setting("overflow", "drop_oldest")),
+                    block_timeout_ms=float(_setting("block_timeout_ms", 50)),
+                )
+                atexit.register(_pipeline.shutdown)
+    return _pipeline
+
 
 def telemetry_log_event(event_name: str, details: dict):
-    payload = {
+    pipeline = get_pipeline()
+    if pipeline is None:
+        return
+    pipeline.emit({
         "timestamp": int(time.time() * 1000),
         "event": event_name,
-        "details": details
-    }
-    # log as JSON (loguru will serialize)
-    logger.info(payload)
+        "details": details,
+    })
+
+
+def telemetry_after_fork(slot: int):
+    """In a forked worker: drop the pipeline inherited from the parent (its
+    buffer is the parent's to flush, its writer thread didn't survive the fork)
+    and log to the file of this worker's slot. The slot outlives the worker, so
+    its replacement appends to the same file."""
+    global _pipeline, _pipeline_lock, _log_suffix
+    _pipeline, _pipeline_lock = None, threading.Lock()
+    _log_suffix = f".worker-{slot}"
+
+
+def telemetry_shutdown():
+    """Flush and close the pipeline now, for exits that skip atexit (os._exit)."""
+    if _pipeline is not None:
+        _pipeline.shutdown()
+
+
+def telemetry_stats() -> Dict:
+    return _pipeline.stats() if _pipeline is not None else {"enabled": TELEMETRY_ENABLED, "emitted": 0}
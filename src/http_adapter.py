@@ -1,32 +1,114 @@
 # src/http_adapter.py
-import uvicorn
-from fastapi import FastAPI, HTTPException
+import json
+from typing import List, Optional
+
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from pydantic import BaseModel
-from core.nlp_utils import parse_nlp
-from core.command_generator import generate_command, list_supported_services
-from core.validator import validate_command_safe
-from core.telemetry import telemetry_log_event
+from core.nlp_utils import model_status, parse_nlp_async
+from core.command_generator import list_supported_services
+from core.aws_listings import iter_resources
+from core.telemetry import redact_query, telemetry_log_event
+from core.metrics import render_prometheus
+from core.batch_generation import generate_batch
+from core.streaming import generate_events, log_response, to_ndjson, to_sse
 
 app = FastAPI(title="MCP AWS CLI Adapter")
 
 class GenerateRequest(BaseModel):
     query: str
+    # listing controls for list_* intents
+    limit: Optional[int] = None
+    next_token: Optional[str] = None
+    filters: Optional[dict] = None
+    # opt-in staged output for /generate: "ndjson" or "sse" (Accept: text/event-stream also selects sse)
+    stream: Optional[str] = None
+
+_STREAM_FORMATS = {"ndjson": (to_ndjson, "application/x-ndjson"), "sse": (to_sse, "text/event-stream")}
 
 @app.post("/generate")
-async def generate(req: GenerateRequest):
-    telemetry_log_event("http.request", {"path": "/generate", "query": req.query})
-    intent, entities = parse_nlp(req.query)
-    command, explanation = generate_command(intent, entities)
-    validation = validate_command_safe(intent, entities)
-    return {"command": command, "explanation": explanation, "validation": validation}
+async def generate(req: GenerateRequest, request: Request):
+    telemetry_log_event("http.request", {"path": "/generate", **redact_query(req.query)})
+    stream = req.stream or ("sse" if "text/event-stream" in request.headers.get("accept", "") else None)
+    if stream:
+        if stream not in _STREAM_FORMATS:
+            raise HTTPException(status_code=400, detail=f"Unknown stream format: {stream}")
+        return _stream_generate(req, *_STREAM_FORMATS[stream])
+    results, timings = {}, {}
+    async for event in generate_events(req.query, req.limit, req.next_token, req.filters, timings):
+        if event["event"] == "error":
+            raise HTTPException(status_code=500, detail=f"{event['data']['stage']} failed: {event['data']['error']}")
+        results[event["event"]] = event["data"]
+    validation = results["validation"]
+    log_response(req.query, results["parsed"]["intent"], validation, timings, path="/generate")
+    return {**results["command"], "validation": validation}
+
+class BatchGenerateRequest(BaseModel):
+    queries: List[str]
+    # applied to every list_* intent in the batch
+    limit: Optional[int] = None
+    filters: Optional[dict] = None
+
+@app.post("/generate/batch")
+async def generate_batch_route(req: BatchGenerateRequest):
+    telemetry_log_event("http.request", {"path": "/generate/batch", "batch_size": len(req.queries)})
+    try:
+        items = await generate_batch(req.queries, req.limit, req.filters)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"results": items}
+
+def _stream_generate(req: GenerateRequest, encode, media_type: str) -> StreamingResponse:
+    """parsed -> command -> validation events, each flushed as soon as it is ready."""
+    async def body():
+        intent, timings = None, {}
+        async for event in generate_events(req.query, req.limit, req.next_token, req.filters, timings):
+            yield encode(event)
+            if event["event"] == "parsed":
+                intent = event["data"]["intent"]
+            elif event["event"] == "validation":
+                log_response(req.query, intent, event["data"], timings, path="/generate", stream=True)
+
+    # X-Accel-Buffering: keep reverse proxies from holding back the early events
+    return StreamingResponse(body(), media_type=media_type,
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+@app.post("/resources")
+async def resources(req: GenerateRequest):
+    """Stream a listing as NDJSON: one {"item": ...} line per resource, then a
+    final {"next_token": ...} line (or {"error": ...} if the listing fails)."""
+    telemetry_log_event("http.request", {"path": "/resources", **redact_query(req.query)})
+    intent, entities = await parse_nlp_async(req.query)
+    try:
+        listing = iter_resources(intent, entities, limit=req.limit, next_token=req.next_token, filters=req.filters)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    # a sync generator: Starlette pulls it from a worker thread, so paging never blocks the loop
+    def ndjson():
+        try:
+            for item in listing:
+                yield json.dumps({"item": item}) + "\n"
+            yield json.dumps({"next_token": listing.next_token}) + "\n"
+        except Exception as e:
+            yield json.dumps({"error": str(e)}) + "\n"
+
+    return StreamingResponse(ndjson(), media_type="application/x-ndjson")
 
 @app.get("/health")
 async def health():
-    return {"status": "ok"}
+    # "ok" while the process serves; "ready" once the ML engine is loaded
+    model = model_status()
+    return {"status": "ok", "ready": model["ready"], "model": model}
+
+@app.get("/metrics")
+async def metrics():
+    return PlainTextResponse(render_prometheus(), media_type="text/plain; version=0.0.4")
 
 @app.get("/services")
 async def services():
     return {"services": list_supported_services()}
 
 def run_http_app(app: FastAPI, host: str="127.0.0.1", port: int=8000):
+    import uvicorn
     uvicorn.run(app, host=host, port=port)
@@ -0,0 +1,94 @@
+# src/lambda_function.py
+"""AWS Lambda entry point (`lambda_function.handler` in deployment/template.yaml).
+
+Accepts an API Gateway proxy event whose JSON body matches the HTTP adapter's
+GenerateRequest (`query`, optional `limit` / `next_token` / `filters`), or a
+direct invocation with those keys at the top level.
+
+Everything expensive lives at module scope and survives across warm
+invocations: NLP and validation caches, pooled boto3 clients, the classifier.
+boto3 and the ML stack are imported on first use, so the init phase only pays
+for what a request actually needs. With MODEL_WARMUP=true the classifier is
+loaded during init (which runs with boosted CPU) instead of on the first
+request. Buffered telemetry is flushed before each response, since the
+environment is frozen between invocations.
+"""
+import base64
+import binascii
+import json
+import time
+
+_init_started = time.perf_counter()
+
+from loguru import logger
+
+from core.command_generator import generate_command
+from core.model_loader import MODEL_WARMUP
+from core.nlp_utils import last_parse_tier, parse_nlp, warm_up
+from core.aws_validator import validate_command_safe
+from core.telemetry import get_pipeline, redact_query, telemetry_log_event
+
+if MODEL_WARMUP:
+    warm_up(background=False)
+
+INIT_SECONDS = time.perf_counter() - _init_started
+_cold = True
+
+
+def _request(event: dict) -> dict:
+    """The request object; ValueError with a client-facing message for a bad body."""
+    body = event.get("body")
+    if body is None:
+        return event
+    if isinstance(body, str):
+        if event.get("isBase64Encoded"):
+            # API Gateway and Function URLs base64-encode some content types
+            try:
+                body = base64.b64decode(body, validate=True).decode("utf-8")
+            except (binascii.Error, UnicodeDecodeError):
+                raise ValueError("Request body is not valid base64-encoded UTF-8") from None
+        try:
+            body = json.loads(body or "{}")
+        except json.JSONDecodeError:
+            raise ValueError("Request body is not valid JSON") from None
+    if not isinstance(body, dict):
+        raise ValueError("Request body must be a JSON object")
+    return body
+
+
+def _response(status: int, payload: dict) -> dict:
+    return {"statusCode": status, "headers": {"Content-Type": "application/json"},
+            "body": json.dumps(payload, default=str)}
+
+
+def handler(event, context=None):
+    global _cold
+    cold, _cold = _cold, False
+    try:
+        req = _request(event or {})
+    except ValueError as e:
+        return _response(400, {"error": str(e)})
+    query = req.get("query")
+    if not query:
+        return _response(400, {"error": "query is required"})
+
+    t0 = time.perf_counter()
+    try:
+        intent, entities = parse_nlp(query)
+        command, explanation = generate_command(intent, entities, req.get("limit"), req.get("next_token"))
+        validation = validate_command_safe(intent, entities, req.get("limit"), req.get("next_token"),
+                                           req.get("filters"))
+    except Exception as e:
+        logger.exception("Lambda request failed: {}", e)
+        return _response(500, {"error": str(e)})
+
+    telemetry_log_event("lambda.invoke", {
+        **redact_query(query), "intent": intent, "status": validation.get("status"), "tier": last_parse_tier(),
+        "cold_start": cold,
+        "init_ms": round(INIT_SECONDS * 1000, 1) if cold else None,
+        "duration_ms": round((time.perf_counter() - t0) * 1000, 1),
+    })
+    pipeline = get_pipeline()
+    if pipeline is not None:
+        pipeline.flush()
+    return _response(200, {"command": command, "explanation": explanation, "validation": validation})
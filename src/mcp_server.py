@@ -3,8 +3,8 @@ import argparse
 import asyncio
 import os
 import sys
+from typing import List, Optional
 from loguru import logger
-import json
 
 USE_HAIKU = bool(os.getenv("USE_HAIKU", "false").lower() in ["true", "1", "yes"])
 
@@ -12,64 +12,143 @@ USE_HAIKU = bool(os.getenv("USE_HAIKU", "false").lower() in ["true", "1", "yes"]
 # ensure src on path (if running from repo root)
 sys.path.insert(0, os.path.dirname(__file__))
 
-from fastmcp import FastMCP
-
-from core.nlp_utils import parse_nlp, nlp_mode_summary
-from core.command_generator import generate_command, list_supported_services
-from core.aws_validator import validate_command_safe
-from core.telemetry import telemetry_log_event
-
-# ensure logs go to stderr and file (telemetry.log)
-logger.remove()
-logger.add(sys.stderr, level="INFO")
-logger.add("telemetry/telemetry.log", rotation="10 MB", serialize=True, retention="30 days", level="INFO")
+from fastmcp import Context, FastMCP
+
+from core.nlp_utils import (after_fork, nlp_mode_summary, batch_stats, cascade_stats, haiku_stats, model_status,
+                            prewarm_cache, save_semantic_cache, warm_up)
+from core.model_loader import MODEL_WARMUP
+from core.intent_registry import SUPPORTED_SERVICES
+from core.telemetry import telemetry_after_fork, telemetry_log_event, telemetry_shutdown, telemetry_stats
+from core.cache import cache_stats
+from core.aws_clients import client_stats
+from core.inventory import get_inventory, inventory_stats
+from core.prefork import HTTP_WORKERS, PreforkServer, prefork_supported
+from core.execution import execution_stats, reset_stages
+from core.metrics import metrics_summary
+from core.batch_generation import generate_batch
+from core.streaming import STAGES, generate_events, log_response
+
+def configure_logging():
+    # application logs go to stderr and server.log (written off-thread via enqueue);
+    # telemetry events have their own batched pipeline (core.telemetry -> telemetry.log).
+    # Called from main() so importing this module doesn't start a log writer.
+    logger.remove()
+    logger.add(sys.stderr, level="INFO")
+    logger.add("telemetry/server.log", rotation="10 MB", serialize=True, retention="30 days", level="INFO",
+               enqueue=True)
 
 mcp = FastMCP("aws-cli-generator")
 
 # Tool: generate aws cli
 @mcp.tool()
-async def generate_aws_cli(query: str):
-    from core.nlp_utils import parse_nlp
-    from core.command_generator import generate_command
-    # parse_nlp is a synchronous helper that returns (intent, entities)
-    intent, entities = parse_nlp(query)
+async def generate_aws_cli(query: str, limit: Optional[int] = None, next_token: Optional[str] = None,
+                           filters: Optional[dict] = None, ctx: Context = None):
+    # Stages are reported as progress notifications as they finish (parsed ->
+    # command -> validation), so a client can show the command before AWS
+    # validation returns. Blocking stages run off the loop; concurrent calls share
+    # batched ML classification. limit / next_token / filters only apply to list intents.
+    results, timings = {}, {}
+    async for event in generate_events(query, limit, next_token, filters, timings):
+        if event["event"] == "error":
+            raise RuntimeError(f"{event['data']['stage']} failed: {event['data']['error']}")
+        results[event["event"]] = event["data"]
+        if ctx is not None:
+            await ctx.report_progress(len(results), len(STAGES))
+            # not ctx.info(): fastmcp 0.3.1's Context.log never awaits the send, so nothing would go out
+            await ctx.request_context.session.send_log_message(level="info", data=event)
+
+    validation = results["validation"]
+    log_response(query, results["parsed"]["intent"], validation, timings)
+    return {**results["command"], "validation": validation}
 
-    # generate_command is synchronous and returns (command, explanation)
-    command, explanation = generate_command(intent, entities)
-    validation = validate_command_safe(intent, entities)
-
-    response = {"command": command, "explanation": explanation, "validation": validation}
-    telemetry_log_event("response.emitted", {"result_summary": {"intent": intent, "status": validation.get("status")}})
-    return response
+@mcp.tool()
+async def generate_aws_cli_batch(queries: List[str], limit: Optional[int] = None, filters: Optional[dict] = None):
+    # one batched classification and shared listings; results follow the order of `queries`
+    items = await generate_batch(queries, limit, filters)
+    telemetry_log_event("response.emitted", {"batch_size": len(queries), "result_summary": [
+        {"intent": i["intent"], "status": i["validation"]["status"] if "validation" in i else "error"} for i in items]})
+    return items
 
 @mcp.tool()
 async def health_check():
-    return {"status": "ok", "model": "haiku" if USE_HAIKU else "local-transformer"}
+    return {
+        "status": "ok",
+        "model": "haiku" if USE_HAIKU else "local-transformer",
+        "model_status": model_status(),
+        "batching": batch_stats(),
+        "haiku": haiku_stats(),
+        "cascade": cascade_stats(),
+        "cache": cache_stats(),
+        "aws_clients": client_stats(),
+        "inventory": inventory_stats(),
+        "execution": execution_stats(),
+        "telemetry": telemetry_stats(),
+        "metrics": metrics_summary(),
+    }
 
 @mcp.tool()
 async def list_supported_services():
-    return ["s3", "dynamodb", "ec2", "lambda", "iam"]
+    return list(SUPPORTED_SERVICES)
+
+def start_warmup():
+    # background load so the server accepts requests while the model warms up
+    if MODEL_WARMUP:
+        warm_up(background=True)
+    # hot queries exported by scripts/telemetry_report.py --export-hot
+    prewarm_cache()
+    # starts the inventory refresher for INVENTORY_REGIONS when enabled
+    get_inventory()
+
+def preload_for_fork():
+    # synchronous, so the forked workers share the warm model and parse cache copy-on-write
+    warm_up(background=False)
+    prewarm_cache(background=False)
+    # what the prewarm added is on disk; from here on only workers that learn more save
+    save_semantic_cache()
+
+def start_worker(slot: int):
+    after_fork()
+    reset_stages()
+    telemetry_after_fork(slot)
+    # threads don't survive fork(), so each worker starts its own inventory refresher
+    get_inventory()
+
+def stop_worker():
+    # a worker leaves with os._exit, so what atexit would do for a normal exit happens here
+    telemetry_shutdown()
+    save_semantic_cache()
 
 async def run_stdio():
     logger.info("Starting MCP stdio server")
+    start_warmup()
     await mcp.run_stdio_async()
 
-def run_http():
+def run_http(workers: int = HTTP_WORKERS, host: str = "127.0.0.1", port: int = 8000):
     # lazy import to avoid bringing FastAPI when running stdio-only
     from http_adapter import app, run_http_app
-    run_http_app(app)
+    if workers > 1 and prefork_supported():
+        PreforkServer(app, host, port, workers, preload=preload_for_fork, on_worker_start=start_worker,
+                      on_worker_exit=stop_worker).run()
+        return
+    if workers > 1:
+        logger.warning("Pre-fork workers need os.fork(); serving from a single process")
+    start_warmup()
+    run_http_app(app, host, port)
 
 def main():
     parser = argparse.ArgumentParser()
     parser.add_argument("--http", action="store_true", help="Start HTTP adapter instead of stdio")
+    parser.add_argument("--workers", type=int, default=HTTP_WORKERS,
+                        help="HTTP worker processes forked after the model is loaded (default: HTTP_WORKERS)")
     args = parser.parse_args()
+    configure_logging()
 
     if args.http:
-        run_http()
+        run_http(args.workers)
     else:
         asyncio.run(run_stdio())
 
 if __name__ == "__main__":
     main()
-    __all__ = ["generate_aws_cli", "list_supported_services", "health_check"]
+    __all__ = ["generate_aws_cli", "generate_aws_cli_batch", "list_supported_services", "health_check"]
 
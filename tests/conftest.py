@@ -0,0 +1,9 @@
+# tests/conftest.py
+import os
+import sys
+
+# modules import as `core.x` / `config.x`, as they do when the server runs from src/
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+# no telemetry files from test runs
+os.environ.setdefault("TELEMETRY_ENABLED", "false")
@@ -0,0 +1,64 @@
+# tests/test_aws_clients.py
+import pytest
+
+pytest.importorskip("boto3")
+
+from core.aws_clients import ClientRegistry
+
+
+@pytest.fixture(autouse=True)
+def credentials(monkeypatch):
+    monkeypatch.delenv("AWS_PROFILE", raising=False)
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "testing")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "testing")
+
+
+def test_same_service_and_region_reuse_one_client():
+    registry = ClientRegistry()
+    first = registry.get("dynamodb", "us-west-1")
+    assert registry.get("dynamodb", "us-west-1") is first
+    assert registry.stats()["created"] == 1 and registry.stats()["hits"] == 1
+    # the pool setting reaches the client
+    assert first.meta.config.max_pool_connections == registry.max_pool_connections
+
+
+def test_other_region_or_service_gets_its_own_client():
+    registry = ClientRegistry()
+    east = registry.get("dynamodb", "us-east-1")
+    assert registry.get("dynamodb", "eu-west-1") is not east
+    assert registry.get("sqs", "us-east-1") is not east
+    assert registry.stats()["clients"] == 3
+
+
+def test_profiles_are_separate_keys(tmp_path, monkeypatch):
+    creds = tmp_path / "credentials"
+    creds.write_text("[ops]\naws_access_key_id = ops\naws_secret_access_key = ops\n")
+    monkeypatch.setenv("AWS_SHARED_CREDENTIALS_FILE", str(creds))
+    registry = ClientRegistry()
+    default = registry.get("sqs", "us-east-1")
+    assert registry.get("sqs", "us-east-1", profile="ops") is not default
+    assert registry.get("sqs", "us-east-1", profile="ops") is registry.get("sqs", "us-east-1", profile="ops")
+
+
+def test_expired_credentials_rebuild_the_client():
+    registry = ClientRegistry()
+    first = registry.get("sqs", "us-east-1")
+    registry._expiry_hook(("sqs", "us-east-1", None))(parsed={"Error": {"Code": "ExpiredToken"}})
+    second = registry.get("sqs", "us-east-1")
+    assert second is not first and registry.get("sqs", "us-east-1") is second
+    assert registry.stats()["refreshed"] == 1
+
+
+def test_max_age_retires_clients():
+    registry = ClientRegistry(max_age=60)
+    first = registry.get("sqs", "us-east-1")
+    registry._clients[("sqs", "us-east-1", None)].created -= 61
+    assert registry.get("sqs", "us-east-1") is not first
+
+
+def test_evict():
+    registry = ClientRegistry()
+    registry.get("sqs", "us-east-1")
+    registry.get("sns", "us-east-1")
+    registry.evict(service="sqs")
+    assert registry.stats()["clients"] == 1 and registry.stats()["evictions"] == 1
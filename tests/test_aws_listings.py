@@ -0,0 +1,71 @@
+# tests/test_aws_listings.py
+import pytest
+
+pytest.importorskip("boto3")
+
+import boto3
+from botocore.stub import Stubber
+
+from core import aws_listings
+from core.aws_listings import iter_resources
+
+
+@pytest.fixture
+def dynamodb(monkeypatch):
+    """A stubbed DynamoDB client behind aws_listings.get_client."""
+    client = boto3.client("dynamodb", region_name="us-west-1", aws_access_key_id="testing",
+                          aws_secret_access_key="testing")
+    monkeypatch.setattr(aws_listings, "get_client", lambda service, region: client)
+    with Stubber(client) as stubber:
+        yield stubber
+        stubber.assert_no_pending_responses()
+
+
+def page(names, last=None):
+    return {"TableNames": names, **({"LastEvaluatedTableName": last} if last else {})}
+
+
+def test_walks_every_page_without_a_limit(dynamodb):
+    dynamodb.add_response("list_tables", page(["tba", "tbb"], last="tbb"))
+    dynamodb.add_response("list_tables", page(["tbc"]), {"ExclusiveStartTableName": "tbb"})
+    listing = iter_resources("list_dynamodb_tables", {})
+    assert list(listing) == ["tba", "tbb", "tbc"]
+    assert listing.next_token is None
+
+
+def test_stops_at_the_limit_and_resumes_from_next_token(dynamodb):
+    dynamodb.add_response("list_tables", page(["tba", "tbb", "tbc"], last="tbc"))
+    dynamodb.add_response("list_tables", page(["tbd", "tbe"], last="tbe"))
+    listing = iter_resources("list_dynamodb_tables", {}, limit=4)
+    assert list(listing) == ["tba", "tbb", "tbc", "tbd"]
+    assert listing.next_token  # a third page was never requested
+    # the token picks up mid-page, right after the last item returned
+    dynamodb.add_response("list_tables", page(["tbd", "tbe"]), {"ExclusiveStartTableName": "tbc"})
+    resumed = iter_resources("list_dynamodb_tables", {}, limit=4, next_token=listing.next_token)
+    assert list(resumed) == ["tbe"]
+    assert resumed.next_token is None
+
+
+def test_limit_inside_the_first_page(dynamodb):
+    dynamodb.add_response("list_tables", page(["tba", "tbb", "tbc"]))
+    listing = iter_resources("list_dynamodb_tables", {}, limit=2)
+    assert list(listing) == ["tba", "tbb"]
+    assert listing.next_token
+
+
+def test_filters_map_to_api_parameters():
+    spec = aws_listings.LISTINGS["list_sqs_queues"]
+    assert aws_listings._api_filters(spec, {"prefix": "jobs-"}) == {"QueueNamePrefix": "jobs-"}
+    with pytest.raises(ValueError, match="Unsupported filters"):
+        aws_listings._api_filters(spec, {"tag": "x"})
+
+
+def test_ec2_entities_become_filters():
+    listing = iter_resources("describe_ec2_instances", {"tag": {"env": "prod"}, "state": "running"})
+    assert listing.params == {"Filters": [{"Name": "tag:env", "Values": ["prod"]},
+                                          {"Name": "instance-state-name", "Values": ["running"]}]}
+
+
+def test_not_a_listing_intent():
+    with pytest.raises(ValueError, match="not a listing intent"):
+        iter_resources("create_s3_bucket", {})
@@ -0,0 +1,97 @@
+# tests/test_aws_validator.py
+import time
+
+import pytest
+
+from core import aws_validator
+from core.inventory import Lookup
+
+
+class StubInventory:
+    def __init__(self, names, value=None):
+        self.names, self.value = set(names), value
+
+    def lookup(self, listing, region, name):
+        return Lookup(name in self.names, self.value if name in self.names else None, 12.0)
+
+
+def answer(intent, entities, inventory, monkeypatch):
+    monkeypatch.setattr(aws_validator, "get_inventory", lambda: inventory)
+    result = {"intent": intent, "region": "us-west-1", "status": None, "reason": None, "detail": {}}
+    return aws_validator._from_inventory(intent, entities, "us-west-1", result), result
+
+
+@pytest.mark.parametrize("intent, entity, status", [
+    ("create_s3_bucket", "bucket", "invalid"),
+    ("create_dynamodb_table", "table", "invalid"),
+    ("create_iam_user", "user", "invalid"),
+    ("invoke_lambda", "function", "valid"),
+])
+def test_listed_name_is_answered_from_the_index(monkeypatch, intent, entity, status):
+    answered, result = answer(intent, {entity: "orders"}, StubInventory(["orders"]), monkeypatch)
+    assert answered
+    assert result["status"] == status and "orders" in result["reason"]
+    assert result["detail"] == {"source": "inventory", "inventory_age_seconds": 12.0}
+
+
+@pytest.mark.parametrize("intent, entity", [
+    ("create_s3_bucket", "bucket"),
+    ("create_dynamodb_table", "table"),
+    ("create_iam_user", "user"),
+    ("invoke_lambda", "function"),
+    ("start_ec2_instance", "instance_id"),
+])
+def test_miss_goes_to_the_api(monkeypatch, intent, entity):
+    # the index may be behind; only the API can say a name is free (or a function is gone)
+    answered, result = answer(intent, {entity: "orders"}, StubInventory(["other"]), monkeypatch)
+    assert not answered and result["status"] is None
+
+
+def test_instance_state_comes_from_the_index(monkeypatch):
+    answered, result = answer("stop_ec2_instance", {"instance_id": "i-0abc1234"},
+                              StubInventory(["i-0abc1234"], value="running"), monkeypatch)
+    assert answered
+    assert result["reason"] == "Instance i-0abc1234 exists and is running"
+    assert result["detail"]["state"] == "running"
+
+
+def test_qualified_names_and_disabled_inventory_go_to_the_api(monkeypatch):
+    arn = "arn:aws:lambda:us-west-1:123456789012:function:orders"
+    assert not answer("invoke_lambda", {"function": arn}, StubInventory([arn]), monkeypatch)[0]
+    assert not answer("invoke_lambda", {"function": "orders"}, None, monkeypatch)[0]
+
+
+@pytest.fixture
+def fanout(monkeypatch):
+    """One fan-out worker and a 0.2s per-region timeout; `delays` sets how long each region's listing takes."""
+    delays = {}
+
+    def list_region(intent, entities, region, limit, filters):
+        time.sleep(delays.get(region, 0.0))
+        return {"items": [f"fn-{region}"], "next_token": None}
+    monkeypatch.setattr(aws_validator, "_list_region", list_region)
+    monkeypatch.setattr(aws_validator, "FANOUT_WORKERS", 1)
+    monkeypatch.setattr(aws_validator, "FANOUT_TIMEOUT", 0.2)
+    monkeypatch.setattr(aws_validator, "_fanout_pool", None)
+    yield delays
+    aws_validator._fanout_pool.shutdown(wait=True)
+
+
+def test_fanout_timeout_is_per_region(fanout):
+    # three regions queue on one worker; together they take longer than one timeout, each one doesn't
+    fanout.update({"us-east-1": 0.12, "us-west-2": 0.12, "eu-west-1": 0.12})
+    result = aws_validator._validate_regions("list_lambda_functions", {}, ["us-east-1", "us-west-2", "eu-west-1"])
+    assert result["status"] == "valid" and not result["detail"]["partial"]
+    assert result["region"] == "us-east-1,us-west-2,eu-west-1"
+    assert result["detail"]["regions"] == ["us-east-1", "us-west-2", "eu-west-1"]
+    assert [i["Region"] for i in result["detail"]["functions"]] == result["detail"]["regions"]
+
+
+def test_fanout_reports_timeouts_only_for_started_regions(fanout):
+    fanout["us-east-1"] = 0.6  # holds the only worker past the deadline
+    result = aws_validator._validate_regions("list_lambda_functions", {}, ["us-east-1", "eu-west-1"])
+    status = result["detail"]["region_status"]
+    assert status["us-east-1"]["status"] == "timeout"
+    assert status["eu-west-1"]["status"] == "skipped"
+    assert result["status"] == "error" and result["detail"]["partial"]
+    assert isinstance(result["region"], str)
@@ -0,0 +1,111 @@
+# tests/test_batching.py
+import asyncio
+import threading
+import time
+
+import pytest
+
+from core.batching import MicroBatcher
+
+
+class Recorder:
+    """batch_fn that records each batch and upper-cases its items."""
+
+    def __init__(self, delay=0.0, error=None):
+        self.batches, self.delay, self.error = [], delay, error
+        self.started = threading.Event()
+
+    def __call__(self, items):
+        self.batches.append(list(items))
+        self.started.set()
+        time.sleep(self.delay)
+        if self.error:
+            raise self.error
+        return [i.upper() for i in items]
+
+
+def test_flushes_when_the_batch_is_full():
+    fn = Recorder()
+    batcher = MicroBatcher(fn, max_batch_size=3, max_wait_ms=10_000)
+
+    async def run():
+        return await asyncio.wait_for(asyncio.gather(*(batcher.submit(x) for x in "abc")), 2)
+
+    t0 = time.perf_counter()
+    assert asyncio.run(run()) == ["A", "B", "C"]
+    assert time.perf_counter() - t0 < 1  # didn't wait out max_wait
+    assert fn.batches == [["a", "b", "c"]]
+
+
+def test_flushes_after_max_wait():
+    fn = Recorder()
+    batcher = MicroBatcher(fn, max_batch_size=100, max_wait_ms=50)
+
+    async def run():
+        first = asyncio.ensure_future(batcher.submit("a"))
+        await asyncio.sleep(0.01)
+        second = asyncio.ensure_future(batcher.submit("b"))
+        return await asyncio.gather(first, second)
+
+    t0 = time.perf_counter()
+    assert asyncio.run(run()) == ["A", "B"]
+    assert 0.04 <= time.perf_counter() - t0 < 1
+    assert fn.batches == [["a", "b"]]
+    assert batcher.stats()["batch_size_histogram"] == {2: 1}
+
+
+def test_items_past_the_limit_go_in_the_next_batch():
+    fn = Recorder()
+    batcher = MicroBatcher(fn, max_batch_size=2, max_wait_ms=20)
+
+    async def run():
+        return await asyncio.gather(*(batcher.submit(x) for x in "abcde"))
+
+    assert asyncio.run(run()) == list("ABCDE")
+    assert fn.batches == [["a", "b"], ["c", "d"], ["e"]]
+
+
+def test_error_reaches_every_waiter():
+    fn = Recorder(error=ValueError("model exploded"))
+    batcher = MicroBatcher(fn, max_batch_size=3, max_wait_ms=20)
+
+    async def run():
+        return await asyncio.gather(*(batcher.submit(x) for x in "abc"), return_exceptions=True)
+
+    results = asyncio.run(run())
+    assert all(isinstance(r, ValueError) and str(r) == "model exploded" for r in results)
+    assert batcher.stats()["errors"] == 1
+
+
+def test_wrong_result_count_is_an_error():
+    batcher = MicroBatcher(lambda items: items[:1], max_batch_size=2, max_wait_ms=20)
+
+    async def run():
+        return await asyncio.gather(batcher.submit("a"), batcher.submit("b"), return_exceptions=True)
+
+    assert all(isinstance(r, RuntimeError) for r in asyncio.run(run()))
+
+
+def test_cancelled_waiter_leaves_the_batch_intact():
+    fn = Recorder(delay=0.1)
+    batcher = MicroBatcher(fn, max_batch_size=3, max_wait_ms=10)
+
+    async def run():
+        waiters = [asyncio.ensure_future(batcher.submit(x)) for x in "abc"]
+        await asyncio.get_running_loop().run_in_executor(None, fn.started.wait, 1)
+        waiters[1].cancel()  # mid-batch: the model call is already running
+        results = await asyncio.gather(*waiters, return_exceptions=True)
+        # the worker is still alive for the next caller
+        return results, await batcher.submit("d")
+
+    results, after = asyncio.run(run())
+    assert results[0] == "A" and results[2] == "C"
+    assert isinstance(results[1], asyncio.CancelledError)
+    assert after == "D"
+    assert fn.batches == [["a", "b", "c"], ["d"]]
+
+
+@pytest.mark.parametrize("size, wait", [(0, -5), (-3, 0)])
+def test_bad_settings_are_clamped(size, wait):
+    batcher = MicroBatcher(Recorder(), max_batch_size=size, max_wait_ms=wait)
+    assert batcher.max_batch_size == 1 and batcher.max_wait == 0.0
@@ -0,0 +1,168 @@
+# tests/test_cache.py
+import pytest
+
+from core import cache as cache_mod
+from core.cache import RedisCache, SqliteCache, TTLCache
+
+VALUE = {"intent": "list_s3_buckets", "entities": {"region": None}, "tier": "rules"}
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Wall and monotonic time frozen at now[0]; advance it by assigning."""
+    now = [1_000_000.0]
+    monkeypatch.setattr(cache_mod.time, "time", lambda: now[0])
+    monkeypatch.setattr(cache_mod.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_memory_round_trip_ttl_and_lru(clock):
+    c = TTLCache("nlp", maxsize=2, ttl=10)
+    c.set("a", VALUE)
+    assert c.get("a") == VALUE
+    clock[0] += 11
+    assert c.get("a") is None
+    c.set("a", 1)
+    c.set("b", 2)
+    c.get("a")
+    c.set("c", 3)  # evicts b, the least recently used
+    assert (c.get("a"), c.get("b"), c.get("c")) == (1, None, 3)
+    assert c.stats()["expirations"] == 1 and c.stats()["evictions"] == 1
+
+
+# ---- sqlite ----
+
+@pytest.fixture
+def sqlite_path(tmp_path):
+    return str(tmp_path / "cache.sqlite")
+
+
+def test_sqlite_round_trip(sqlite_path):
+    c = SqliteCache("nlp", sqlite_path, namespace="rules:v1")
+    assert c.get("q") is None
+    c.set("q", VALUE)
+    assert c.get("q") == VALUE
+    # another process (or worker) opening the same file sees the entry
+    assert SqliteCache("nlp", sqlite_path, namespace="rules:v1").get("q") == VALUE
+    assert c.stats()["hits"] == 1 and c.stats()["misses"] == 1
+
+
+def test_sqlite_namespaces_and_clear(sqlite_path):
+    v1 = SqliteCache("nlp", sqlite_path, namespace="v1")
+    v2 = SqliteCache("nlp", sqlite_path, namespace="v2")
+    v1.set("q", "one")
+    v2.set("q", "two")
+    assert (v1.get("q"), v2.get("q")) == ("one", "two")
+    v1.clear()
+    assert (v1.get("q"), v2.get("q")) == (None, "two")
+    assert v2.stats()["size"] == 1
+
+
+def test_sqlite_ttl(sqlite_path, clock):
+    c = SqliteCache("nlp", sqlite_path, ttl=60)
+    c.set("default", 1)
+    c.set("short", 2, ttl=5)
+    c.set("skipped", 3, ttl=0)
+    clock[0] += 10
+    assert (c.get("default"), c.get("short"), c.get("skipped")) == (1, None, None)
+    clock[0] += 60
+    assert c.get("default") is None
+
+
+def test_sqlite_prunes_expired_and_oldest(sqlite_path, clock, monkeypatch):
+    monkeypatch.setattr(SqliteCache, "PRUNE_EVERY", 4)
+    c = SqliteCache("nlp", sqlite_path, maxsize=2)
+    c.set("expired", 0, ttl=1)
+    clock[0] += 2
+    for i in range(3):
+        clock[0] += 1
+        c.set(f"k{i}", i)  # the 4th set sweeps
+    assert c.stats()["size"] == 2
+    assert (c.get("k0"), c.get("k1"), c.get("k2")) == (None, 1, 2)
+
+
+def test_sqlite_error_is_a_miss(sqlite_path):
+    c = SqliteCache("nlp", sqlite_path)
+    c.set("q", VALUE)
+    c._conn().execute("DROP TABLE cache")
+    assert c.get("q") is None
+    c.set("q", VALUE)  # does not raise
+    stats = c.stats()
+    assert stats["misses"] == 1 and stats["errors"] == 2 and stats["size"] is None
+
+
+# ---- redis ----
+
+@pytest.fixture
+def redis_server():
+    fakeredis = pytest.importorskip("fakeredis")
+    return fakeredis.FakeServer()
+
+
+def redis_cache(server, **kwargs):
+    import fakeredis
+    return RedisCache("validation", client=fakeredis.FakeRedis(server=server), **kwargs)
+
+
+def test_redis_round_trip(redis_server):
+    c = redis_cache(redis_server, namespace="acct-1")
+    assert c.get("k") is None
+    c.set("k", VALUE)
+    assert c.get("k") == VALUE
+    assert redis_cache(redis_server, namespace="acct-1").get("k") == VALUE
+    assert redis_cache(redis_server, namespace="acct-2").get("k") is None
+    assert c.stats()["hits"] == 1 and c.stats()["misses"] == 1
+
+
+def test_redis_ttl_is_set_on_the_server(redis_server):
+    c = redis_cache(redis_server, ttl=30)
+    c.set("default", 1)
+    c.set("short", 2, ttl=0.5)
+    c.set("forever", 3, ttl=None)
+    c.set("skipped", 4, ttl=0)
+    assert 29000 < c.client.pttl(c.prefix + "default") <= 30000
+    assert 0 < c.client.pttl(c.prefix + "short") <= 500
+    assert c.client.pttl(c.prefix + "skipped") == -2  # never written
+    assert c.get("skipped") is None
+
+
+def test_redis_no_ttl(redis_server):
+    c = redis_cache(redis_server)
+    c.set("k", 1)
+    assert c.client.pttl(c.prefix + "k") == -1
+
+
+def test_redis_clear_only_own_prefix(redis_server):
+    mine, other = redis_cache(redis_server, namespace="a"), redis_cache(redis_server, namespace="b")
+    for i in range(3):
+        mine.set(f"k{i}", i)
+    other.set("k0", "kept")
+    mine.clear()
+    assert [mine.get(f"k{i}") for i in range(3)] == [None, None, None]
+    assert other.get("k0") == "kept"
+
+
+def test_redis_error_is_a_miss(redis_server):
+    c = redis_cache(redis_server)
+    c.set("k", VALUE)
+    redis_server.connected = False
+    assert c.get("k") is None
+    c.set("k", VALUE)  # does not raise
+    assert c.stats()["errors"] == 2 and c.stats()["misses"] == 1
+    redis_server.connected = True
+    assert c.get("k") == VALUE
+
+
+def test_create_cache_backends(monkeypatch, tmp_path):
+    monkeypatch.setattr(cache_mod, "_REGISTRY", {})
+    monkeypatch.setenv("CACHE_SQLITE_PATH", str(tmp_path / "shared.sqlite"))
+    monkeypatch.setenv("TESTCACHE_CACHE_BACKEND", "sqlite")
+    c = cache_mod.create_cache("testcache", "TESTCACHE_ENABLED", 10, 60, namespace="ns")
+    assert isinstance(c, SqliteCache) and c.prefix == "mcp:testcache:ns:" and c.ttl == 60
+    assert cache_mod.cache_stats()["testcache"]["backend"] == "sqlite"
+    monkeypatch.setenv("TESTCACHE_ENABLED", "false")
+    assert cache_mod.create_cache("testcache", "TESTCACHE_ENABLED", 10, 60) is None
+    monkeypatch.setenv("TESTCACHE_ENABLED", "true")
+    monkeypatch.setenv("TESTCACHE_CACHE_BACKEND", "memcached")
+    with pytest.raises(ValueError, match="Unknown cache backend"):
+        cache_mod.create_cache("testcache", "TESTCACHE_ENABLED", 10, 60)
@@ -0,0 +1,145 @@
+# tests/test_command_generator.py
+import pytest
+
+from core.command_generator import EC2_INSTANCE_QUERY, generate_command
+from core.intent_registry import REGISTRY
+
+
+# one row per IntentSpec: entities as the parser gives them -> command, explanation
+CASES = [
+    ("create_s3_bucket", {"bucket": "logs", "region": "us-east-2"},
+     "aws s3 mb s3://logs --region us-east-2", "Creates an S3 bucket named 'logs' in us-east-2."),
+    ("list_s3_buckets", {"region": None}, "aws s3 ls", "Lists S3 buckets in your account."),
+    ("create_dynamodb_table", {"table": "Orders", "region": None},
+     "aws dynamodb create-table --table-name Orders --attribute-definitions AttributeName=Id,AttributeType=S "
+     "--key-schema AttributeName=Id,KeyType=HASH --billing-mode PAY_PER_REQUEST --region us-west-1",
+     "Creates a DynamoDB table named 'Orders' in us-west-1 with on-demand billing."),
+    ("list_dynamodb_tables", {"region": None, "regions": None}, "aws dynamodb list-tables", "Lists DynamoDB tables."),
+    ("start_ec2_instance", {"instance_id": "i-0abc1234", "region": "eu-west-1"},
+     "aws ec2 start-instances --instance-ids i-0abc1234 --region eu-west-1",
+     "Starts EC2 instance i-0abc1234 in eu-west-1."),
+    ("stop_ec2_instance", {"instance_id": "i-0abc1234", "region": None},
+     "aws ec2 stop-instances --instance-ids i-0abc1234 --region us-west-1",
+     "Stops EC2 instance i-0abc1234 in us-west-1."),
+    ("list_ec2_instances", {"region": "us-east-1"},
+     "aws ec2 describe-instances --region us-east-1", "Describes EC2 instances in us-east-1."),
+    ("describe_ec2_instances", {"region": None},
+     "aws ec2 describe-instances --region us-west-1", "Describes EC2 instances in us-west-1."),
+    ("create_iam_user", {"user": "alice"}, "aws iam create-user --user-name alice", "Creates IAM user alice."),
+    ("list_iam_users", {}, "aws iam list-users", "Lists IAM users in the account."),
+    ("invoke_lambda", {"function": "orders", "region": None},
+     "aws lambda invoke --function-name orders out.json --cli-binary-format raw-in-base64-out",
+     "Invokes Lambda function 'orders'."),
+    ("list_lambda_functions", {"region": None, "regions": None},
+     "aws lambda list-functions --region us-west-1", "Lists Lambda functions in us-west-1."),
+    ("create_sns_topic", {"topic": "alerts", "region": None},
+     "aws sns create-topic --name alerts --region us-west-1", "Creates SNS topic 'alerts' in us-west-1."),
+    ("list_sns_topics", {"region": "ap-south-1"},
+     "aws sns list-topics --region ap-south-1", "Lists SNS topics in ap-south-1."),
+    ("create_sqs_queue", {"queue": "jobs", "region": None},
+     "aws sqs create-queue --queue-name jobs --region us-west-1", "Creates SQS queue 'jobs' in us-west-1."),
+    ("list_sqs_queues", {"region": None}, "aws sqs list-queues --region us-west-1", "Lists SQS queues in us-west-1."),
+    ("list_cloudwatch_alarms", {"region": None},
+     "aws cloudwatch describe-alarms --region us-west-1", "Lists CloudWatch alarms in us-west-1."),
+    ("list_ecs_clusters", {"region": None},
+     "aws ecs list-clusters --region us-west-1", "Lists ECS clusters in us-west-1."),
+    ("list_glue_jobs", {"region": None}, "aws glue list-jobs --region us-west-1", "Lists Glue jobs in us-west-1."),
+]
+
+
+@pytest.fixture(autouse=True)
+def default_region(monkeypatch):
+    from core import command_generator
+    monkeypatch.setattr(command_generator, "DEFAULT_REGION", "us-west-1")
+
+
+def test_every_spec_has_a_case():
+    assert sorted(intent for intent, *_ in CASES) == sorted(REGISTRY)
+
+
+@pytest.mark.parametrize("intent, entities, command, explanation", CASES)
+def test_generate_command(intent, entities, command, explanation):
+    assert generate_command(intent, entities) == (command, explanation)
+
+
+@pytest.mark.parametrize("intent, entities, command", [
+    ("create_s3_bucket", {"bucket": None, "region": None}, "aws s3 mb s3://my-bucket --region us-west-1"),
+    ("create_iam_user", {"user": None}, "aws iam create-user --user-name NewUser"),
+    ("start_ec2_instance", {"instance_id": None, "region": None},
+     "aws ec2 start-instances --instance-ids <instance-id> --region us-west-1"),
+])
+def test_missing_entities_use_the_spec_defaults(intent, entities, command):
+    assert generate_command(intent, entities)[0] == command
+
+
+def test_defaults_are_not_modified_by_a_request():
+    generate_command("create_s3_bucket", {"bucket": "logs", "region": None})
+    assert dict(REGISTRY["create_s3_bucket"].defaults) == {"bucket": "my-bucket"}
+
+
+def test_unsupported_intent():
+    assert generate_command("delete_everything", {})[0] == "echo 'Unsupported intent'"
+
+
+@pytest.mark.parametrize("entities, command, explanation", [
+    ({"region": "us-east-1", "tag": {"env": "prod"}},
+     f'aws ec2 describe-instances --filters "Name=tag:env,Values=prod" --query "{EC2_INSTANCE_QUERY}" '
+     "--region us-east-1",
+     "Describes EC2 instances matching tag:env=prod in us-east-1."),
+    ({"region": "us-east-1", "tag": {"env": "prod"}, "state": "running"},
+     'aws ec2 describe-instances --filters "Name=tag:env,Values=prod" "Name=instance-state-name,Values=running" '
+     f'--query "{EC2_INSTANCE_QUERY}" --region us-east-1',
+     "Describes EC2 instances matching tag:env=prod, instance-state-name=running in us-east-1."),
+    ({"region": None, "instance_id": "i-0abc1234"},
+     "aws ec2 describe-instances --instance-ids i-0abc1234 --region us-west-1",
+     "Describes EC2 instance i-0abc1234 in us-west-1."),
+    ({"region": None, "instance_id": "i-0abc1234", "state": "stopped"},
+     'aws ec2 describe-instances --instance-ids i-0abc1234 --filters "Name=instance-state-name,Values=stopped" '
+     f'--query "{EC2_INSTANCE_QUERY}" --region us-west-1',
+     "Describes EC2 instance i-0abc1234 matching instance-state-name=stopped in us-west-1."),
+])
+def test_ec2_filters_and_tags(entities, command, explanation):
+    assert generate_command("describe_ec2_instances", entities) == (command, explanation)
+
+
+@pytest.mark.parametrize("intent, regions, command, explanation", [
+    ("list_lambda_functions", ["us-east-1", "eu-west-1"],
+     "for r in us-east-1 eu-west-1; do aws lambda list-functions --region $r; done",
+     "Lists Lambda functions in us-east-1, eu-west-1."),
+    ("list_dynamodb_tables", ["us-east-1", "eu-west-1"],
+     "for r in us-east-1 eu-west-1; do aws dynamodb list-tables --region $r; done",
+     "Lists DynamoDB tables in us-east-1, eu-west-1."),
+    ("list_sqs_queues", "all",
+     'for r in $(aws ec2 describe-regions --query "Regions[].RegionName" --output text); '
+     "do aws sqs list-queues --region $r; done",
+     "Lists SQS queues in every enabled region."),
+])
+def test_multi_region_loops(intent, regions, command, explanation):
+    assert generate_command(intent, {"region": None, "regions": regions}) == (command, explanation)
+
+
+@pytest.mark.parametrize("intent, entities, limit, token, command, explanation", [
+    ("list_lambda_functions", {"region": None}, 50, None,
+     "aws lambda list-functions --region us-west-1 --max-items 50",
+     "Lists Lambda functions in us-west-1, at most 50."),
+    ("list_dynamodb_tables", {"region": None}, 10, "eyJ0b2tlbiI6IDF9",
+     "aws dynamodb list-tables --max-items 10 --starting-token eyJ0b2tlbiI6IDF9",
+     "Lists DynamoDB tables, at most 10, continuing from the given token."),
+    ("describe_ec2_instances", {"region": None, "state": "running"}, 5, None,
+     'aws ec2 describe-instances --filters "Name=instance-state-name,Values=running" '
+     f'--query "{EC2_INSTANCE_QUERY}" --region us-west-1 --max-items 5',
+     "Describes EC2 instances matching instance-state-name=running in us-west-1, at most 5."),
+    # `aws s3 ls` doesn't page; non-list intents ignore paging
+    ("list_s3_buckets", {"region": None}, 10, "tok", "aws s3 ls", "Lists S3 buckets in your account."),
+    ("create_sqs_queue", {"queue": "jobs", "region": None}, 10, None,
+     "aws sqs create-queue --queue-name jobs --region us-west-1", "Creates SQS queue 'jobs' in us-west-1."),
+])
+def test_limit_and_next_token_flags(intent, entities, limit, token, command, explanation):
+    assert generate_command(intent, entities, limit, token) == (command, explanation)
+
+
+def test_multi_region_loop_takes_the_limit_but_not_the_token():
+    cmd, explanation = generate_command("list_glue_jobs", {"region": None, "regions": ["us-east-1", "us-east-2"]},
+                                        limit=20, next_token="tok")
+    assert cmd == "for r in us-east-1 us-east-2; do aws glue list-jobs --region $r --max-items 20; done"
+    assert explanation == "Lists Glue jobs in us-east-1, us-east-2, at most 20."
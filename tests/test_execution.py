@@ -0,0 +1,80 @@
+# tests/test_execution.py
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from core import aws_validator, execution, nlp_utils
+from core.exceptions import StageTimeout
+from core.execution import Stage
+
+
+@pytest.fixture
+def pool():
+    executor = ThreadPoolExecutor(2)
+    yield executor
+    executor.shutdown(wait=True)
+
+
+def test_stage_times_out(pool):
+    stage = Stage("slow", pool, max_concurrency=2, timeout=0.05)
+    with pytest.raises(StageTimeout, match="slow"):
+        asyncio.run(stage.run(time.sleep, 0.3))
+    stats = stage.stats()
+    assert stats["calls"] == 1 and stats["timeouts"] == 1 and stats["errors"] == 0
+
+
+def test_queueing_counts_against_the_timeout(pool):
+    # one slot: the second call spends its whole budget waiting for the first
+    stage = Stage("narrow", pool, max_concurrency=1, timeout=0.15)
+
+    async def run():
+        return await asyncio.gather(stage.run(time.sleep, 0.1), stage.run(time.sleep, 0.1),
+                                    return_exceptions=True)
+
+    first, second = asyncio.run(run())
+    assert first is None and isinstance(second, StageTimeout)
+
+
+def test_errors_are_counted_and_raised(pool):
+    stage = Stage("broken", pool, max_concurrency=2, timeout=1)
+    with pytest.raises(ZeroDivisionError):
+        asyncio.run(stage.run(lambda: 1 / 0))
+    assert stage.stats()["errors"] == 1
+
+
+@pytest.fixture
+def slow_stage(monkeypatch, pool):
+    """Install a stage with a 50ms budget under `name`."""
+    def install(name):
+        monkeypatch.setitem(execution._stages, name, Stage(name, pool, max_concurrency=4, timeout=0.05))
+    return install
+
+
+def test_validation_timeout_is_unknown_and_not_cached(monkeypatch, slow_stage):
+    slow_stage("validation")
+    calls = []
+
+    def validate(intent, entities, *args):
+        calls.append(intent)
+        time.sleep(0.3)
+        return {"intent": intent, "region": "us-west-1", "status": "valid", "reason": "slow", "detail": {}}
+    monkeypatch.setattr(aws_validator, "_validate", validate)
+    entities = {"table": "timeout-test", "region": "us-west-1"}
+    for _ in range(2):
+        result = asyncio.run(aws_validator.validate_command_safe_async("create_dynamodb_table", entities))
+        assert result["status"] == "unknown" and "timed out" in result["reason"]
+    assert len(calls) == 2  # the timed-out answer wasn't served from cache
+
+
+def test_classify_timeout_falls_back_and_is_degraded(monkeypatch, slow_stage):
+    slow_stage("classify")
+    monkeypatch.setattr(nlp_utils, "ENABLE_ML", True)
+    monkeypatch.setattr(nlp_utils, "NLP_MODE", "local")
+    monkeypatch.setattr(nlp_utils, "CASCADE_ORDER", ["ml"])
+    monkeypatch.setattr(nlp_utils, "ML_BATCHING", False)
+    monkeypatch.setattr(nlp_utils, "SEMANTIC_CACHE_ENABLED", False)
+    monkeypatch.setattr(nlp_utils, "_ml_intent", lambda text: time.sleep(0.3) or "list_dynamodb_tables")
+    label, degraded = asyncio.run(nlp_utils._tier_async("ml", "list buckets and tables"))
+    assert label is None and degraded
@@ -0,0 +1,173 @@
+# tests/test_haiku_client.py
+import json
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from core import haiku_client
+from core.exceptions import TierUnavailable
+from core.haiku_client import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, HaikuClassifier
+
+LABELS = ["list_s3_buckets", "list_dynamodb_tables", "unknown"]
+
+
+class MockMessages(BaseHTTPRequestHandler):
+    """POST /v1/messages: replies with the next scripted status (200 once the script runs out)."""
+
+    script: deque = deque()
+    url = ""
+    calls = 0
+    latency = 0.0
+    lock = threading.Lock()
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        with self.lock:
+            type(self).calls += 1
+            status = self.script.popleft() if self.script else 200
+        time.sleep(self.latency)
+        if status != 200:
+            return self._send(status, {"type": "error", "error": {"type": "api_error", "message": f"HTTP {status}"}})
+        text = body["messages"][0]["content"].lower()
+        label = "list_s3_buckets" if "bucket" in text else "list_dynamodb_tables" if "table" in text else "no idea"
+        self._send(200, {"id": "msg_mock", "type": "message", "role": "assistant", "model": body["model"],
+                         "content": [{"type": "text", "text": label}], "stop_reason": "end_turn",
+                         "stop_sequence": None, "usage": {"input_tokens": 1, "output_tokens": 1}})
+
+    def _send(self, status, payload):
+        raw = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(raw)))
+        self.end_headers()
+        self.wfile.write(raw)
+
+
+@pytest.fixture
+def server():
+    pytest.importorskip("anthropic")
+    MockMessages.script, MockMessages.calls, MockMessages.latency = deque(), 0, 0.0
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), MockMessages)
+    httpd.daemon_threads = True
+    threading.Thread(target=httpd.serve_forever, args=(0.05,), daemon=True).start()
+    MockMessages.url = f"http://127.0.0.1:{httpd.server_address[1]}"
+    yield MockMessages
+    httpd.shutdown()
+    httpd.server_close()
+
+
+@pytest.fixture
+def classifier(server, monkeypatch):
+    monkeypatch.setattr(haiku_client, "BACKOFF_BASE", 0.001)
+    monkeypatch.setattr(haiku_client, "BACKOFF_MAX", 0.01)
+    monkeypatch.setattr(haiku_client, "MAX_RETRIES", 2)
+    c = HaikuClassifier(LABELS, api_key="test", base_url=server.url)
+    c.breaker = CircuitBreaker(failures=2, cooldown=0.2)
+    return c
+
+
+def test_answers_a_label(classifier, server):
+    assert classifier.classify("list my buckets") == "list_s3_buckets"
+    assert server.calls == 1
+
+
+def test_reply_outside_the_label_set_is_no_label(classifier, server):
+    assert classifier.classify("hello") is None
+    assert classifier.breaker.state == CLOSED  # a successful call, just not a label
+
+
+@pytest.mark.parametrize("status", [429, 500, 529])
+def test_retries_retryable_statuses(classifier, server, status):
+    server.script.extend([status, status])
+    assert classifier.classify("list my tables") == "list_dynamodb_tables"
+    assert server.calls == 3
+    assert classifier.stats()["retries"] == 2
+
+
+@pytest.mark.parametrize("status", [400, 401, 404])
+def test_does_not_retry_client_errors(classifier, server, status):
+    server.script.append(status)
+    with pytest.raises(TierUnavailable):
+        classifier.classify("list my tables")
+    assert server.calls == 1
+    assert classifier.stats()["retries"] == 0
+
+
+def test_gives_up_after_max_retries(classifier, server):
+    server.script.extend([503] * 5)
+    with pytest.raises(TierUnavailable):
+        classifier.classify("list my tables")
+    assert server.calls == 3
+    assert classifier.stats()["failures"] == 1
+
+
+def test_breaker_opens_half_opens_and_closes(classifier, server):
+    server.script.extend([400, 400])
+    for _ in range(2):
+        with pytest.raises(TierUnavailable):
+            classifier.classify("list my tables")
+    assert classifier.breaker.state == OPEN
+    # open: rejected without an upstream call
+    with pytest.raises(TierUnavailable, match="circuit open"):
+        classifier.classify("list my tables")
+    assert server.calls == 2 and classifier.stats()["rejected"] == 1
+    time.sleep(0.25)
+    # the cooldown lets one trial through; it succeeds and closes the breaker
+    assert classifier.classify("list my tables") == "list_dynamodb_tables"
+    assert classifier.breaker.state == CLOSED
+    assert server.calls == 3
+
+
+def test_failed_trial_reopens_the_breaker(classifier, server):
+    server.script.extend([400, 400, 400])
+    for _ in range(2):
+        with pytest.raises(TierUnavailable):
+            classifier.classify("list my tables")
+    time.sleep(0.25)
+    with pytest.raises(TierUnavailable):
+        classifier.classify("list my tables")  # the half-open trial fails
+    assert classifier.breaker.state == OPEN
+    with pytest.raises(TierUnavailable, match="circuit open"):
+        classifier.classify("list my tables")
+    assert server.calls == 3
+
+
+def test_single_flight_coalesces_identical_queries(classifier, server):
+    server.latency = 0.2
+    with ThreadPoolExecutor(8) as pool:
+        labels = list(pool.map(classifier.classify, ["list my buckets"] * 4 + ["List  my buckets"] * 4))
+    assert labels == ["list_s3_buckets"] * 8
+    assert server.calls == 1
+    assert classifier.stats()["coalesced"] == 7
+
+
+def test_single_flight_shares_failures(classifier, server):
+    server.latency = 0.2
+    server.script.append(400)
+    with ThreadPoolExecutor(4) as pool:
+        futures = [pool.submit(classifier.classify, "list my buckets") for _ in range(4)]
+    assert all(isinstance(f.exception(), TierUnavailable) for f in futures)
+    assert server.calls == 1
+
+
+def test_breaker_state_machine():
+    breaker = CircuitBreaker(failures=3, cooldown=0.05)
+    for _ in range(2):
+        breaker.record(False)
+    assert breaker.state == CLOSED and breaker.allow()
+    breaker.record(True)  # a success resets the count
+    for _ in range(3):
+        breaker.record(False)
+    assert breaker.state == OPEN and not breaker.allow()
+    time.sleep(0.06)
+    assert breaker.allow() and breaker.state == HALF_OPEN
+    assert not breaker.allow()  # exactly one trial
+    breaker.record(True)
+    assert breaker.state == CLOSED
@@ -0,0 +1,55 @@
+# tests/test_http_adapter.py
+import asyncio
+
+import pytest
+
+pytest.importorskip("fastapi")
+
+from starlette.requests import Request
+
+import http_adapter
+from core import aws_validator, streaming
+
+
+@pytest.fixture
+def events(monkeypatch):
+    recorded = []
+    monkeypatch.setattr(streaming, "telemetry_log_event", lambda name, details: recorded.append((name, details)))
+    monkeypatch.setattr(http_adapter, "telemetry_log_event", lambda name, details: recorded.append((name, details)))
+
+    def validate(intent, entities, *args, **kwargs):
+        return {"intent": intent, "region": "us-west-1", "status": "valid", "reason": "stub", "detail": {}}
+    monkeypatch.setattr(aws_validator, "_validate", validate)
+    return recorded
+
+
+def request(accept=""):
+    return Request({"type": "http", "method": "POST", "path": "/generate",
+                    "headers": [(b"accept", accept.encode())]})
+
+
+def test_generate_logs_response_emitted(events):
+    req = http_adapter.GenerateRequest(query="list s3 buckets")
+    resp = asyncio.run(http_adapter.generate(req, request()))
+    assert resp["command"].startswith("aws s3") and resp["validation"]["status"] == "valid"
+    names = [name for name, _ in events]
+    assert names == ["http.request", "response.emitted"]
+    details = events[1][1]
+    assert details["path"] == "/generate"
+    assert details["result_summary"] == {"intent": "list_s3_buckets", "status": "valid"}
+    assert details["tier"] in ("rules", "cache")
+    assert set(details["stages_ms"]) == {"parse_nlp", "generate_command", "validate"}
+
+
+def test_streamed_generate_logs_response_emitted(events):
+    req = http_adapter.GenerateRequest(query="list s3 buckets", stream="ndjson")
+
+    async def drain():
+        resp = await http_adapter.generate(req, request())
+        return [chunk async for chunk in resp.body_iterator]
+
+    lines = asyncio.run(drain())
+    assert len(lines) == 3
+    emitted = [details for name, details in events if name == "response.emitted"]
+    assert len(emitted) == 1 and emitted[0]["stream"] is True
+    assert emitted[0]["result_summary"]["intent"] == "list_s3_buckets"
@@ -0,0 +1,40 @@
+# tests/test_intent_registry.py
+# everything that enumerates intents must agree with REGISTRY; a missing spec would only show up at runtime
+import pytest
+
+from core import aws_validator, intent_rules, nlp_utils
+from core.aws_listings import LISTINGS
+from core.intent_registry import REGISTRY
+
+# list_ec2_instances is what a model tier may answer; the rules say describe_ec2_instances
+NO_RULE = {"list_ec2_instances"}
+# nothing to check before creating a topic: create-topic is idempotent
+NOT_VALIDATED = {"create_sns_topic"}
+
+
+def test_rules_and_registry_cover_each_other():
+    rule_intents = {r.intent for r in intent_rules.INTENT_RULES}
+    assert rule_intents <= set(REGISTRY)
+    assert set(REGISTRY) - rule_intents == NO_RULE
+    assert set(intent_rules.INTENT_ENTITIES) == set(REGISTRY)
+
+
+def test_label_set_is_the_registry():
+    assert nlp_utils.INTENTS == list(REGISTRY) + ["unknown"]
+
+
+def test_validator_covers_the_registry():
+    validated = set(LISTINGS) | set(aws_validator._CHECKS)
+    assert validated <= set(REGISTRY)
+    assert set(REGISTRY) - validated == NOT_VALIDATED
+
+
+@pytest.mark.parametrize("table", ["_MEMBERSHIP", "_INVENTORY_CHECKS"])
+def test_membership_checks_match_their_specs(table):
+    for intent, check in getattr(aws_validator, table).items():
+        spec = REGISTRY[intent]
+        assert intent in aws_validator._CHECKS, intent
+        assert check.entity in spec.required, intent
+        assert check.listing in LISTINGS and check.listing in REGISTRY, intent
+        assert REGISTRY[check.listing].service == spec.service, intent
+
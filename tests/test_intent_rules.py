@@ -0,0 +1,93 @@
+# tests/test_intent_rules.py
+import json
+from pathlib import Path
+
+import pytest
+
+from core import intent_rules
+
+CORPUS = Path(__file__).resolve().parents[1] / "scripts" / "data" / "queries.jsonl"
+
+
+def ec2(region=None, tag=None, state=None, instance_id=None):
+    return {"region": region, "regions": None, "tag": tag, "state": state, "instance_id": instance_id}
+
+
+# the "Usage examples" in README.md
+README_EXAMPLES = [
+    ("Describe EC2 instances in us-west-2", "describe_ec2_instances", ec2(region="us-west-2")),
+    ("Describe instance i-0abc1234 in us-east-1",
+     "describe_ec2_instances", ec2(region="us-east-1", instance_id="i-0abc1234")),
+    ("Show running instances with tag env=prod in us-east-1",
+     "describe_ec2_instances", ec2(region="us-east-1", tag={"env": "prod"}, state="running")),
+    ("Start instance i-0abc1234", "start_ec2_instance", {"instance_id": "i-0abc1234", "region": None}),
+    ("List S3 buckets", "list_s3_buckets", {"region": None}),
+]
+
+# scripts/data/queries.jsonl, in file order
+CORPUS_EXPECTED = [
+    ("create an S3 bucket named phase3-test-bucket in us-west-1",
+     "create_s3_bucket", {"bucket": "phase3-test-bucket", "region": "us-west-1"}),
+    ("make a new s3 bucket called analytics-raw-2024",
+     "create_s3_bucket", {"bucket": "analytics-raw-2024", "region": None}),
+    ("create bucket my-logs-bucket in us-east-2",
+     "create_s3_bucket", {"bucket": "my-logs-bucket", "region": "us-east-2"}),
+    ("please create an s3 bucket for backups named nightly-backups",
+     "create_s3_bucket", {"bucket": "nightly-backups", "region": None}),
+    ("list all s3 buckets", "list_s3_buckets", {"region": None}),
+    ("show my s3 buckets", "list_s3_buckets", {"region": None}),
+    ("list buckets", "list_s3_buckets", {"region": None}),
+    ("show me the buckets in my account", "list_s3_buckets", {"region": None}),
+    ("create a dynamodb table named Orders in us-west-2",
+     "create_dynamodb_table", {"table": "Orders", "region": "us-west-2"}),
+    ("make a dynamo table called sessions", "create_dynamodb_table", {"table": "sessions", "region": None}),
+    ("create table CustomerEvents", "create_dynamodb_table", {"table": "CustomerEvents", "region": None}),
+    ("list dynamodb tables", "list_dynamodb_tables", {"region": None, "regions": None}),
+    ("show all dynamo tables in eu-west-1", "list_dynamodb_tables", {"region": "eu-west-1", "regions": None}),
+    ("list my tables", "list_dynamodb_tables", {"region": None, "regions": None}),
+    ("start ec2 instance i-0abc1234def567890",
+     "start_ec2_instance", {"instance_id": "i-0abc1234def567890", "region": None}),
+    ("run the instance i-0123456789abcdef0 in us-west-1",
+     "start_ec2_instance", {"instance_id": "i-0123456789abcdef0", "region": "us-west-1"}),
+    ("please start instance i-0fedcba987654321",
+     "start_ec2_instance", {"instance_id": "i-0fedcba987654321", "region": None}),
+    ("stop ec2 instance i-0abc1234def567890",
+     "stop_ec2_instance", {"instance_id": "i-0abc1234def567890", "region": None}),
+    ("terminate instance i-0123456789abcdef0 in us-east-1",
+     "stop_ec2_instance", {"instance_id": "i-0123456789abcdef0", "region": "us-east-1"}),
+    ("stop the instance i-0aaaabbbbccccdddd",
+     "stop_ec2_instance", {"instance_id": "i-0aaaabbbbccccdddd", "region": None}),
+    ("list ec2 instances in us-west-1", "describe_ec2_instances", ec2(region="us-west-1")),
+    ("describe ec2 instances in us-west-2", "describe_ec2_instances", ec2(region="us-west-2")),
+    ("show instances with tag env=prod", "describe_ec2_instances", ec2(tag={"env": "prod"})),
+    ("list all ec2 instances tag team=platform in us-east-1",
+     "describe_ec2_instances", ec2(region="us-east-1", tag={"team": "platform"})),
+    ("describe my ec2 fleet", "describe_ec2_instances", ec2()),
+    ("create iam user named alice", "create_iam_user", {"user": "alice"}),
+    ("add a new user bob-dev", "create_iam_user", {"user": "bob-dev"}),
+    ("create an iam user called ci_deployer", "create_iam_user", {"user": "ci_deployer"}),
+    ("list iam users", "list_iam_users", {}),
+    ("show all users", "list_iam_users", {}),
+    ("list the iam users in this account", "list_iam_users", {}),
+    ("invoke lambda function named process-orders", "invoke_lambda", {"function": "process-orders", "region": None}),
+    ("call the lambda function resize_images in us-west-2",
+     "invoke_lambda", {"function": "resize_images", "region": "us-west-2"}),
+    # as before the rewrite, the name must follow "function" or "named"
+    ("invoke lambda nightly-report", "invoke_lambda", {"function": None, "region": None}),
+    ("list lambda functions in us-west-1", "list_lambda_functions", {"region": "us-west-1", "regions": None}),
+    ("show my lambda functions", "list_lambda_functions", {"region": None, "regions": None}),
+    ("list functions", "list_lambda_functions", {"region": None, "regions": None}),
+    ("what is the weather today", "unknown", {}),
+    ("delete everything", "unknown", {}),
+    ("how much did I spend last month", "unknown", {}),
+]
+
+
+@pytest.mark.parametrize("query,intent,entities", README_EXAMPLES + CORPUS_EXPECTED)
+def test_classify(query, intent, entities):
+    assert intent_rules.classify(query) == (intent, entities)
+
+
+def test_table_matches_corpus_labels():
+    rows = [json.loads(line) for line in CORPUS.read_text(encoding="utf-8").splitlines() if line.strip()]
+    assert [(r["query"], r["intent"]) for r in rows] == [(q, i) for q, i, _ in CORPUS_EXPECTED]
@@ -0,0 +1,51 @@
+# tests/test_label_embeddings.py
+import numpy as np
+import pytest
+
+from core.label_embeddings import LabelEmbeddingClassifier, hypothesis
+
+LABELS = ["list_s3_buckets", "list_dynamodb_tables", "list_sqs_queues"]
+
+
+class StubEncoder:
+    """Each label's hypothesis is a unit axis; queries encode to the vector given by name."""
+
+    def __init__(self, queries):
+        self.vectors = {hypothesis(label): np.eye(3)[i] for i, label in enumerate(LABELS)}
+        self.vectors.update(queries)
+
+    def encode(self, texts):
+        return np.array([self.vectors[t] for t in texts], dtype=np.float32)
+
+
+def classify(vector):
+    c = LabelEmbeddingClassifier(LABELS, encoder=StubEncoder({"q": vector}), cache_dir=None,
+                                 min_similarity=0.5, min_margin=0.1)
+    return c.classify(["q"])[0], c.predict(["q"])[0]
+
+
+@pytest.mark.parametrize("vector, label", [
+    ([0.9, 0.3, 0.1], "list_s3_buckets"),   # cosine 0.94, 0.63 ahead
+    ([0.3, 0.1, 0.0], "list_s3_buckets"),   # only the direction counts
+    ([0.1, 0.2, 0.9], "list_sqs_queues"),
+    ([0.6, 0.55, 0.55], None),              # cosine 0.61, only 0.05 ahead
+    ([0.45, -0.5, -0.74], None),            # far ahead, but cosine 0.45
+])
+def test_accepts_on_similarity_and_margin(vector, label):
+    assert classify(vector)[1] == label
+
+
+def test_classify_reports_similarity_and_margin():
+    (label, sim, margin), _ = classify([0.62, 0.55, 0.0])
+    norm = np.linalg.norm([0.62, 0.55])
+    assert label == "list_s3_buckets"
+    assert sim == pytest.approx(0.62 / norm, abs=1e-6)
+    assert margin == pytest.approx((0.62 - 0.55) / norm, abs=1e-6)
+
+
+def test_small_lead_abstains_where_a_softmax_would_be_confident():
+    # a softmax over cosine / 0.05 turns this 0.08 lead into ~0.84, past ML_CONF_THRESHOLD's 0.7
+    (_, sim, margin), label = classify([0.62, 0.55, 0.0])
+    logits = np.array([0.62, 0.55, 0.0]) / np.linalg.norm([0.62, 0.55]) / 0.05
+    assert np.exp(logits[0]) / np.exp(logits).sum() > 0.7
+    assert margin < 0.1 and label is None
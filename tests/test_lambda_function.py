@@ -0,0 +1,47 @@
+# tests/test_lambda_function.py
+import base64
+import json
+
+import pytest
+
+import lambda_function
+from core import aws_validator
+
+
+@pytest.fixture(autouse=True)
+def stub_validation(monkeypatch):
+    def validate(intent, entities, *args, **kwargs):
+        return {"intent": intent, "region": "us-west-1", "status": "valid", "reason": "stub", "detail": {}}
+    monkeypatch.setattr(aws_validator, "_validate", validate)
+
+
+def invoke(event):
+    resp = lambda_function.handler(event)
+    return resp["statusCode"], json.loads(resp["body"])
+
+
+@pytest.mark.parametrize("event", [
+    {"query": "list s3 buckets"},
+    {"body": json.dumps({"query": "list s3 buckets"})},
+    {"body": base64.b64encode(json.dumps({"query": "list s3 buckets"}).encode()).decode(), "isBase64Encoded": True},
+])
+def test_request_shapes(event):
+    status, body = invoke(event)
+    assert status == 200 and body["command"].startswith("aws s3")
+
+
+@pytest.mark.parametrize("body, error", [
+    ("{not json", "not valid JSON"),
+    ("[]", "must be a JSON object"),
+    ('"x"', "must be a JSON object"),
+    ("1", "must be a JSON object"),
+    ("{}", "query is required"),
+])
+def test_bad_bodies_are_400s(body, error):
+    status, payload = invoke({"body": body})
+    assert status == 400 and error in payload["error"]
+
+
+def test_bad_base64_is_a_400():
+    status, payload = invoke({"body": "not base64!", "isBase64Encoded": True})
+    assert status == 400 and "base64" in payload["error"]
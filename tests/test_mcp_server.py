@@ -0,0 +1,57 @@
+# tests/test_mcp_server.py
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("fastmcp")
+
+import mcp_server
+from core import aws_validator
+
+
+class StubSession:
+    def __init__(self):
+        self.logs = []
+
+    async def send_log_message(self, level, data, logger=None):
+        self.logs.append((level, data))
+
+
+class StubContext:
+    """What the tool uses of fastmcp's Context: progress and the request's session."""
+
+    def __init__(self):
+        self.progress = []
+        self.request_context = SimpleNamespace(session=StubSession(), meta=None)
+
+    async def report_progress(self, progress, total=None):
+        self.progress.append((progress, total))
+
+
+@pytest.fixture(autouse=True)
+def stub_validation(monkeypatch):
+    def validate(intent, entities, *args, **kwargs):
+        return {"intent": intent, "region": "us-west-1", "status": "valid", "reason": "stub", "detail": {}}
+    monkeypatch.setattr(aws_validator, "_validate", validate)
+
+
+def tool(fn):
+    # fastmcp versions differ on whether @mcp.tool() returns the function or a wrapper
+    return getattr(fn, "fn", fn)
+
+
+def test_stage_events_reach_the_session():
+    ctx = StubContext()
+    resp = asyncio.run(tool(mcp_server.generate_aws_cli)("list s3 buckets", ctx=ctx))
+    assert resp["command"].startswith("aws s3") and resp["validation"]["status"] == "valid"
+    assert ctx.progress == [(1, 3), (2, 3), (3, 3)]
+    logs = ctx.request_context.session.logs
+    assert [data["event"] for _, data in logs] == ["parsed", "command", "validation"]
+    assert all(level == "info" for level, _ in logs)
+    assert logs[0][1]["data"]["intent"] == "list_s3_buckets"
+
+
+def test_no_context_still_answers():
+    resp = asyncio.run(tool(mcp_server.generate_aws_cli)("list s3 buckets"))
+    assert resp["validation"]["status"] == "valid"
@@ -0,0 +1,80 @@
+# tests/test_model_loader.py
+import threading
+import time
+
+from core import model_loader
+from core.model_loader import FAILED, READY, ModelLoader
+
+
+class Factory:
+    """Fails `failures` times, then returns a model."""
+
+    def __init__(self, failures=0, delay=0.0):
+        self.failures, self.delay, self.calls = failures, delay, 0
+
+    def __call__(self):
+        self.calls += 1
+        time.sleep(self.delay)
+        if self.calls <= self.failures:
+            raise ImportError("No module named 'torch'")
+        return object()
+
+
+class Clock:
+    """Stands in for the time module in core.model_loader."""
+
+    perf_counter = staticmethod(time.perf_counter)
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+def test_backoff_blocks_reloads_then_allows_a_retry(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(model_loader, "time", clock)
+    factory = Factory(failures=1)
+    loader = ModelLoader("test", factory, retry_backoff=30, max_backoff=600)
+    assert loader.get() is None
+    assert loader.backing_off and loader.stats()["state"] == FAILED
+    clock.now += 29
+    assert loader.get() is None and factory.calls == 1  # still inside the window: no reload
+    clock.now += 2
+    assert not loader.backing_off
+    assert loader.get() is not None and factory.calls == 2
+    assert loader.stats()["state"] == READY
+
+
+def test_backoff_doubles_up_to_the_cap(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(model_loader, "time", clock)
+    loader = ModelLoader("test", Factory(failures=10), retry_backoff=10, max_backoff=35)
+    windows = []
+    for _ in range(4):
+        loader.get()
+        windows.append(loader.stats()["retry_in_seconds"])
+        clock.now += windows[-1]
+    assert windows == [10, 20, 35, 35]
+    assert loader.stats()["failures"] == 4
+
+
+def test_concurrent_first_requests_load_once():
+    factory = Factory(delay=0.1)
+    loader = ModelLoader("test", factory)
+    models = []
+    threads = [threading.Thread(target=lambda: models.append(loader.get())) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert factory.calls == 1
+    assert len({id(m) for m in models}) == 1
+
+
+def test_reset_clears_the_backoff():
+    loader = ModelLoader("test", Factory(failures=1), retry_backoff=60)
+    assert loader.get() is None and loader.backing_off
+    loader.reset()
+    assert loader.get() is not None
@@ -0,0 +1,212 @@
+# tests/test_nlp_utils.py
+import asyncio
+
+import pytest
+
+from core import execution, nlp_utils
+from core.exceptions import TierUnavailable
+from core.model_loader import ModelLoader
+
+WEAK = "list buckets and tables"  # rule confidence 0.5: escalates to the model tiers
+
+
+class StubZeroShot:
+    """Answers every query with `label` at a confident score."""
+
+    def __init__(self, label="list_dynamodb_tables"):
+        self.label = label
+        self.calls = 0
+
+    def __call__(self, sequences, candidate_labels, multi_label=False):
+        self.calls += 1
+        seqs = [sequences] if isinstance(sequences, str) else list(sequences)
+        out = [{"sequence": s, "labels": [self.label], "scores": [0.99]} for s in seqs]
+        return out[0] if isinstance(sequences, str) else out
+
+
+def failing_loader(name="zero-shot"):
+    def factory():
+        raise ImportError("No module named 'torch'")
+    loader = ModelLoader(name, factory, retry_backoff=60)
+    loader.get()  # fails once and starts backing off
+    return loader
+
+
+@pytest.fixture(autouse=True)
+def fresh(monkeypatch):
+    monkeypatch.setattr(nlp_utils, "ENABLE_ML", True)
+    monkeypatch.setattr(nlp_utils, "NLP_MODE", "local")
+    monkeypatch.setattr(nlp_utils, "CASCADE_ORDER", ["ml", "haiku"])
+    monkeypatch.setattr(nlp_utils, "SEMANTIC_CACHE_ENABLED", False)
+    monkeypatch.setattr(nlp_utils, "_zero_shot_model", ModelLoader("zero-shot", StubZeroShot))
+    monkeypatch.setattr(nlp_utils, "_haiku_model", ModelLoader("haiku", lambda: None))
+    nlp_utils._nlp_cache.clear()
+    yield
+    nlp_utils._nlp_cache.clear()
+
+
+def cached(text):
+    return nlp_utils._cache_lookup(nlp_utils._nlp_cache_key(text))
+
+
+def parse_sync(text):
+    return nlp_utils.parse_nlp(text)
+
+
+def parse_async(text):
+    return asyncio.run(nlp_utils.parse_nlp_async(text))
+
+
+def parse_batch(text):
+    return asyncio.run(nlp_utils.parse_nlp_batch_async([text]))[0]
+
+
+PATHS = [parse_sync, parse_async, parse_batch]
+
+
+@pytest.mark.parametrize("parse", PATHS)
+def test_model_answer_is_cached(parse):
+    intent, _ = parse(WEAK)
+    assert intent == "list_dynamodb_tables"
+    assert nlp_utils.last_parse_tier() in ("ml", None)  # the batch path runs in another context
+    assert cached(WEAK)[0] == "list_dynamodb_tables"
+
+
+@pytest.mark.parametrize("parse", PATHS)
+def test_no_confident_label_caches_the_fallback(parse, monkeypatch):
+    monkeypatch.setattr(nlp_utils, "ML_CONF_THRESHOLD", 1.5)  # nothing is confident
+    intent, _ = parse(WEAK)
+    assert intent == "list_s3_buckets"
+    assert cached(WEAK)[0] == "list_s3_buckets"
+
+
+@pytest.mark.parametrize("parse", PATHS)
+def test_model_backing_off_is_not_cached(parse, monkeypatch):
+    monkeypatch.setattr(nlp_utils, "_zero_shot_model", failing_loader())
+    intent, _ = parse(WEAK)
+    assert intent == "list_s3_buckets"  # the rule tier's weak guess
+    assert cached(WEAK) is None
+    # once the model is back, the same query gets (and caches) its answer
+    nlp_utils._zero_shot_model.set(StubZeroShot())
+    assert parse(WEAK)[0] == "list_dynamodb_tables"
+    assert cached(WEAK)[0] == "list_dynamodb_tables"
+
+
+@pytest.mark.parametrize("parse", PATHS)
+def test_inference_error_is_not_cached(parse, monkeypatch):
+    def broken(*args, **kwargs):
+        raise RuntimeError("CUDA out of memory")
+    nlp_utils._zero_shot_model.set(broken)
+    assert parse(WEAK)[0] == "list_s3_buckets"
+    assert cached(WEAK) is None
+
+
+class StubHaiku:
+    def __init__(self, label=None, error=None):
+        self.label, self.error = label, error
+
+    def classify(self, text):
+        if self.error:
+            raise self.error
+        return self.label
+
+
+@pytest.mark.parametrize("parse", PATHS)
+def test_haiku_breaker_open_is_not_cached(parse, monkeypatch):
+    monkeypatch.setattr(nlp_utils, "NLP_MODE", "haiku")
+    monkeypatch.setattr(nlp_utils, "CASCADE_ORDER", ["haiku"])
+    nlp_utils._haiku_model.set(StubHaiku(error=TierUnavailable("haiku", "circuit open")))
+    assert parse(WEAK)[0] == "list_s3_buckets"
+    assert cached(WEAK) is None
+
+
+@pytest.mark.parametrize("parse", PATHS)
+def test_haiku_abstention_is_cached(parse, monkeypatch):
+    monkeypatch.setattr(nlp_utils, "NLP_MODE", "haiku")
+    monkeypatch.setattr(nlp_utils, "CASCADE_ORDER", ["haiku"])
+    nlp_utils._haiku_model.set(StubHaiku(label=None))
+    assert parse(WEAK)[0] == "list_s3_buckets"
+    assert cached(WEAK)[0] == "list_s3_buckets"
+
+
+@pytest.mark.parametrize("parse", PATHS)
+def test_unavailable_tier_falls_through_to_the_next(parse, monkeypatch):
+    monkeypatch.setattr(nlp_utils, "NLP_MODE", "haiku")
+    monkeypatch.setattr(nlp_utils, "_zero_shot_model", failing_loader())
+    nlp_utils._haiku_model.set(StubHaiku(label="list_dynamodb_tables"))
+    assert parse(WEAK)[0] == "list_dynamodb_tables"
+    # Haiku answered, but only because the cheaper tier was down: retry the cascade next time
+    assert cached(WEAK) is None
+
+
+def test_confident_rule_skips_the_models():
+    stub = nlp_utils._zero_shot_model.get()
+    assert parse_sync("list s3 buckets")[0] == "list_s3_buckets"
+    assert stub.calls == 0
+    assert cached("list s3 buckets")[0] == "list_s3_buckets"
+
+
+def test_haiku_mode_still_warms_and_reports_the_ml_tier(monkeypatch):
+    monkeypatch.setattr(nlp_utils, "NLP_MODE", "haiku")
+    status = nlp_utils.model_status()
+    assert status["tiers"] == ["ml", "haiku"]
+    assert status["engine"] == "zero-shot" and status["ready"] is False
+    nlp_utils.warm_up(background=False)
+    assert nlp_utils.model_status()["ready"] is True
+    assert nlp_utils._zero_shot_model.get().calls == 1  # the throwaway classification
+
+
+@pytest.mark.parametrize("mode, order, engine", [("haiku", ["haiku"], "haiku"), ("local", ["haiku"], "rules")])
+def test_no_ml_tier_has_nothing_to_warm(monkeypatch, mode, order, engine):
+    monkeypatch.setattr(nlp_utils, "NLP_MODE", mode)
+    monkeypatch.setattr(nlp_utils, "CASCADE_ORDER", order)
+    assert nlp_utils.warm_up(background=False) is None
+    assert not nlp_utils._zero_shot_model.ready
+    assert nlp_utils.model_status() == {"engine": engine, "tiers": order if mode == "haiku" else [], "ready": True}
+
+
+def test_prewarm_does_not_audit(tmp_path, monkeypatch):
+    # the pre-fork parent prewarms; an audit would queue work on an executor the workers can't use
+    hot = tmp_path / "hot.jsonl"
+    hot.write_text('{"query": "list my buckets"}\n{"query": "list my tables"}\n')
+    seen = []
+    monkeypatch.setattr(nlp_utils, "parse_nlp", lambda query: seen.append(nlp_utils._auditing.get()))
+    nlp_utils.prewarm_cache(str(hot), background=False)
+    assert seen == [False, False]
+    assert nlp_utils._auditing.get() is True
+
+
+def test_worker_classifies_after_the_fork(monkeypatch):
+    # what start_worker does in a forked worker; the parent's pool is shut down to stand in for its lost threads
+    monkeypatch.setattr(nlp_utils, "ML_BATCHING", True)
+    assert parse_async(WEAK)[0] == "list_dynamodb_tables"
+    parent_batcher = nlp_utils._ml_batcher
+    parent_stage = execution.get_stage("classify")
+    nlp_utils.after_fork()
+    execution.reset_stages()
+    parent_stage.executor.shutdown()
+    nlp_utils._nlp_cache.clear()
+    assert parse_async(WEAK)[0] == "list_dynamodb_tables"
+    assert nlp_utils._ml_batcher is not parent_batcher
+    assert execution.get_stage("classify") is not parent_stage
+
+
+class PerQueryHaiku:
+    """Unavailable for queries mentioning "tables", answers the others."""
+
+    def classify(self, text):
+        if "tables" in text:
+            raise TierUnavailable("haiku", "HTTP 529")
+        return "list_sqs_queues"
+
+
+def test_batch_caches_the_items_that_were_not_degraded(monkeypatch):
+    monkeypatch.setattr(nlp_utils, "NLP_MODE", "haiku")
+    monkeypatch.setattr(nlp_utils, "CASCADE_ORDER", ["haiku"])
+    nlp_utils._haiku_model.set(PerQueryHaiku())
+    ok, failed, confident = "list queues and buckets", WEAK, "list s3 buckets"
+    results = asyncio.run(nlp_utils.parse_nlp_batch_async([ok, failed, confident]))
+    assert [intent for intent, _ in results] == ["list_sqs_queues", "list_s3_buckets", "list_s3_buckets"]
+    assert cached(ok)[0] == "list_sqs_queues"
+    assert cached(confident)[0] == "list_s3_buckets"
+    assert cached(failed) is None
@@ -0,0 +1,20 @@
+# tests/test_prefork.py
+from core.prefork import PreforkServer
+
+
+def test_replacements_reuse_the_lowest_free_slot():
+    server = PreforkServer(app=None, workers=3)
+    slots = []
+    for pid in (101, 102, 103):
+        slots.append(server._free_slot())
+        server._children[pid] = (0.0, slots[-1])
+    assert slots == [0, 1, 2]
+    # a crashed worker's replacement takes its slot
+    del server._children[102]
+    assert server._free_slot() == 1
+    server._children[104] = (0.0, 1)
+    # a rolling restart runs the replacement next to the old worker: one extra slot, never more
+    assert server._free_slot() == 3
+    server._children[105] = (0.0, 3)
+    del server._children[101]
+    assert server._free_slot() == 0
@@ -0,0 +1,171 @@
+# tests/test_telemetry.py
+import json
+import time
+
+import pytest
+
+from core import telemetry
+from core.telemetry import DynamoDBSink, JsonlFileSink, TelemetryPipeline, TelemetrySink
+
+
+class ListSink(TelemetrySink):
+    name = "list"
+
+    def __init__(self):
+        self.records = []
+
+    def write_batch(self, records):
+        self.records.extend(records)
+
+
+def record(i):
+    return {"timestamp": 1700000000000 + i, "event": "test", "details": {"i": i}}
+
+
+def idle_pipeline(sink, overflow, **kwargs):
+    # the writer only wakes for a full batch or after a minute, so the buffer fills up
+    return TelemetryPipeline([sink], buffer_size=2, batch_size=100, flush_interval_ms=60000,
+                             overflow=overflow, **kwargs)
+
+
+@pytest.mark.parametrize("overflow, kept", [("drop_oldest", [1, 2]), ("drop_newest", [0, 1])])
+def test_overflow_drops(overflow, kept):
+    sink = ListSink()
+    pipeline = idle_pipeline(sink, overflow)
+    accepted = [pipeline.emit(record(i)) for i in range(3)]
+    pipeline.shutdown()
+    assert accepted == [True, True, overflow == "drop_oldest"]
+    assert [r["details"]["i"] for r in sink.records] == kept
+    assert pipeline.stats()["dropped"] == 1
+
+
+def test_overflow_block_waits_then_drops():
+    sink = ListSink()
+    pipeline = idle_pipeline(sink, "block", block_timeout_ms=50)
+    pipeline.emit(record(0))
+    pipeline.emit(record(1))
+    t0 = time.monotonic()
+    assert pipeline.emit(record(2)) is False
+    assert time.monotonic() - t0 >= 0.04
+    pipeline.shutdown()
+    assert [r["details"]["i"] for r in sink.records] == [0, 1]
+
+
+def test_overflow_block_gets_space_from_writer():
+    sink = ListSink()
+    pipeline = TelemetryPipeline([sink], buffer_size=1, batch_size=1, flush_interval_ms=60000,
+                                 overflow="block", block_timeout_ms=2000)
+    assert all(pipeline.emit(record(i)) for i in range(5))
+    pipeline.shutdown()
+    assert [r["details"]["i"] for r in sink.records] == [0, 1, 2, 3, 4]
+    assert pipeline.stats()["dropped"] == 0
+
+
+def test_shutdown_flushes_and_rejects_late_events():
+    sink = ListSink()
+    pipeline = idle_pipeline(sink, "drop_oldest")
+    pipeline.emit(record(0))
+    pipeline.shutdown()
+    assert len(sink.records) == 1
+    assert pipeline.emit(record(1)) is False
+
+
+def test_file_sink_rotates(tmp_path):
+    path = tmp_path / "telemetry.log"
+    sink = JsonlFileSink(str(path), max_bytes=200, backups=2)
+    for i in range(12):
+        sink.write_batch([record(i)])
+    sink.close()
+    assert (tmp_path / "telemetry.log.1").exists()
+    assert (tmp_path / "telemetry.log.2").exists()
+    assert not (tmp_path / "telemetry.log.3").exists()
+    # oldest to newest, the kept files hold an unbroken run of records ending with the last one
+    kept = []
+    for name in ("telemetry.log.2", "telemetry.log.1", "telemetry.log"):
+        assert (tmp_path / name).stat().st_size < 200 + 100
+        kept += [json.loads(line)["details"]["i"] for line in (tmp_path / name).read_text().splitlines()]
+    assert kept == list(range(12 - len(kept), 12))
+    assert len(kept) < 12
+
+
+def test_file_sink_without_backups_truncates(tmp_path):
+    path = tmp_path / "telemetry.log"
+    sink = JsonlFileSink(str(path), max_bytes=200, backups=0)
+    for i in range(12):
+        sink.write_batch([record(i)])
+    sink.close()
+    assert [p.name for p in tmp_path.iterdir()] == ["telemetry.log"]
+    assert path.stat().st_size < 200
+
+
+class StubDynamoDB:
+    """batch_write_item that leaves the first `unprocessed` items of each of the first `failures` calls."""
+
+    def __init__(self, failures=0, unprocessed=1):
+        self.failures, self.unprocessed = failures, unprocessed
+        self.calls = []
+
+    def batch_write_item(self, RequestItems):
+        (table, requests), = RequestItems.items()
+        self.calls.append(requests)
+        if len(self.calls) <= self.failures:
+            return {"UnprocessedItems": {table: requests[:self.unprocessed]}}
+        return {"UnprocessedItems": {}}
+
+
+@pytest.fixture
+def no_sleep(monkeypatch):
+    monkeypatch.setattr(telemetry.time, "sleep", lambda s: None)
+
+
+def test_dynamodb_sink_items_and_chunks(no_sleep):
+    client = StubDynamoDB()
+    sink = DynamoDBSink("mcp-telemetry-v2", tenant="acme", client=client)
+    sink.write_batch([record(i) for i in range(30)])
+    assert [len(c) for c in client.calls] == [25, 5]
+    item = client.calls[0][0]["PutRequest"]["Item"]
+    assert item["tenantId"] == {"S": "acme"}
+    assert item["eventId"]["S"].startswith("1700000000000#")
+    assert json.loads(item["details"]["S"]) == {"i": 0}
+    event_ids = {c["PutRequest"]["Item"]["eventId"]["S"] for batch in client.calls for c in batch}
+    assert len(event_ids) == 30
+
+
+def test_dynamodb_sink_retries_unprocessed_items(no_sleep):
+    client = StubDynamoDB(failures=2, unprocessed=3)
+    DynamoDBSink("t", client=client).write_batch([record(i) for i in range(10)])
+    assert [len(c) for c in client.calls] == [10, 3, 3]
+    assert client.calls[2] == client.calls[0][:3]
+
+
+def test_dynamodb_sink_gives_up(no_sleep):
+    client = StubDynamoDB(failures=99)
+    with pytest.raises(RuntimeError, match="1 telemetry items unprocessed after 3 attempts"):
+        DynamoDBSink("t", client=client, max_attempts=3).write_batch([record(0)])
+    assert len(client.calls) == 3
+
+
+def test_sink_failure_is_counted_not_raised():
+    class Broken(TelemetrySink):
+        name = "broken"
+
+        def write_batch(self, records):
+            raise OSError("disk full")
+
+    sink = ListSink()
+    pipeline = TelemetryPipeline([Broken(), sink], flush_interval_ms=60000)
+    pipeline.emit(record(0))
+    pipeline.shutdown()
+    assert pipeline.stats()["sink_errors"] == 1
+    assert len(sink.records) == 1
+
+
+def test_forked_worker_logs_to_its_own_file(tmp_path, monkeypatch):
+    monkeypatch.setattr(telemetry, "_setting", lambda key, default: str(tmp_path / "telemetry.log")
+                        if key == "log_path" else default)
+    monkeypatch.setattr(telemetry, "_log_suffix", "")
+    monkeypatch.setattr(telemetry, "_pipeline", None)
+    telemetry.telemetry_after_fork(2)
+    sink = telemetry._build_sink("file")
+    sink.close()
+    assert sink.path == str(tmp_path / "telemetry.log") + ".worker-2"